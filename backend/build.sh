@@ -26,6 +26,9 @@ else
 fi
 echo ""
 
+# 각 Lambda 함수에 복사할 common 모듈 목록
+COMMON_MODULES="supabase_client.py rag_service.py slack_notifier.py embedding_cache.py segment_cache.py resources.py vector_index.py embedding_config.py card_renderer.py tracing.py region_snapshot.py region_index.py write_behind.py idempotency.py search_session.py lean_clients.py"
+
 # Prepare common modules for each Lambda function (Flat structure)
 echo "📦 Copying common modules to Lambda functions..."
 for func_dir in functions/*/; do
@@ -34,14 +37,41 @@ for func_dir in functions/*/; do
         echo "   📦 $func_name"
         
         # Copy common modules directly to function directory
-        cp common/supabase_client.py "${func_dir}supabase_client.py"
-        cp common/rag_service.py "${func_dir}rag_service.py"
-        cp common/slack_notifier.py "${func_dir}slack_notifier.py"
+        for module in $COMMON_MODULES; do
+            cp "common/${module}" "${func_dir}${module}"
+        done
     fi
 done
 echo "   ✅ Common modules copied to all functions"
 echo ""
 
+# 온보딩 지역 메뉴/검증용 행정구역 스냅샷
+echo "🗺️  Exporting region snapshot..."
+if python3 ../scripts/region_code/export_region_snapshot.py; then
+    echo "   ✅ Region snapshot ready"
+else
+    echo "   ⚠️  Export failed (SUPABASE 설정 확인) - 기본 시/도 목록 + DB 조회로 계속 진행"
+fi
+echo ""
+
+# 고정 발화 임베딩 사전 적재 (query_embedding_cache + Lambda 번들 시드 파일)
+echo "🌱 Seeding query embedding cache..."
+if python3 ../scripts/embeddings/seed_query_cache.py; then
+    echo "   ✅ Query embedding seed ready"
+else
+    echo "   ⚠️  Seeding failed (OPENAI_API_KEY/SUPABASE 설정 확인) - 시드 없이 계속 진행"
+fi
+echo ""
+
+# 로컬 벡터 검색용 스냅샷 (RAG_VECTOR_BACKEND=local)
+echo "🧭 Exporting vector snapshot..."
+if python3 ../scripts/embeddings/export_vector_snapshot.py; then
+    echo "   ✅ Vector snapshot ready"
+else
+    echo "   ⚠️  Export failed (SUPABASE 설정/numpy 확인) - 스냅샷 없이 계속 진행 (match_benefits 사용)"
+fi
+echo ""
+
 # Build SAM
 echo "🏗️  Building SAM application..."
 sam build "$@"
@@ -0,0 +1,75 @@
+"""
+임베딩 모델/차원 설정 (생성기, 스키마, 검색이 공유하는 단일 설정)
+
+text-embedding-3-small은 Matryoshka 방식으로 학습되어 앞쪽 N차원만 잘라
+L2 정규화해도 dimensions=N으로 요청한 임베딩과 같은 벡터가 됩니다.
+
+- 저장: 항상 전체 1536차원 (benefit_embeddings.embedding)
+- 축소: DB generated column embedding_256/512/768 = l2_normalize(subvector(embedding, 1, N))
+- 검색: EMBEDDING_DIMENSIONS 차원 컬럼/인덱스로 후보 검색 → (선택) 1536차원 재정렬
+- 파티션: benefit_embeddings는 region_key(시도명 | NATIONAL)로 나뉘어 사용자 시도 + 전국 파티션만 검색
+"""
+import os
+import math
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+FULL_EMBEDDING_DIMENSIONS = 1536
+# schema.sql의 embedding_<N> 컬럼/HNSW 인덱스와 일치해야 함
+SUPPORTED_DIMENSIONS = (256, 512, 768, FULL_EMBEDDING_DIMENSIONS)
+# 지역 제한 없는 혜택의 파티션 키 (schema.sql benefit_embeddings_national)
+NATIONAL_REGION_KEY = "NATIONAL"
+
+
+def get_search_dimensions() -> int:
+    """검색 차원 (EMBEDDING_DIMENSIONS, 지원하지 않는 값이면 1536)"""
+    value = os.getenv("EMBEDDING_DIMENSIONS", str(FULL_EMBEDDING_DIMENSIONS))
+    try:
+        dimensions = int(value)
+    except ValueError:
+        dimensions = -1
+    if dimensions not in SUPPORTED_DIMENSIONS:
+        logger.warning(f"⚠️ Unsupported EMBEDDING_DIMENSIONS={value} (supported: {SUPPORTED_DIMENSIONS}) - using {FULL_EMBEDDING_DIMENSIONS}")
+        return FULL_EMBEDDING_DIMENSIONS
+    return dimensions
+
+
+def truncate_embedding(embedding: List[float], dimensions: int) -> Optional[List[float]]:
+    """
+    앞쪽 N차원만 남기고 L2 정규화 (DB의 l2_normalize(subvector(...))와 동일)
+
+    Args:
+        embedding: 전체 차원 임베딩
+        dimensions: 남길 차원 수
+
+    Returns:
+        축소된 단위 벡터 (입력이 비어 있으면 None)
+    """
+    if not embedding:
+        return None
+    if dimensions >= len(embedding):
+        return list(embedding)
+    prefix = embedding[:dimensions]
+    norm = math.sqrt(sum(x * x for x in prefix))
+    if norm == 0:
+        return prefix
+    return [x / norm for x in prefix]
+
+
+def embedding_region_key(source_api: Optional[str], ctpv_nm: Optional[str]) -> str:
+    """
+    benefit_embeddings 파티션 키 (schema.sql의 embedding_region_key()와 동일)
+
+    Args:
+        source_api: benefits.source_api ('NATIONAL' | 'LOCAL')
+        ctpv_nm: benefits.ctpv_nm (시도명)
+
+    Returns:
+        중앙부처/시도 미지정 혜택은 NATIONAL_REGION_KEY, 그 외는 시도명
+    """
+    if source_api == NATIONAL_REGION_KEY or not ctpv_nm:
+        return NATIONAL_REGION_KEY
+    return ctpv_nm
@@ -2,34 +2,117 @@ import os
 import json
 import logging
 import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from supabase import create_client
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+
+try:
+    from embedding_cache import EmbeddingCache, normalize_query
+    from segment_cache import WhitelistCache, DataVersionWatcher, segment_key
+    from vector_index import load_vector_index
+    from embedding_config import EMBEDDING_MODEL, FULL_EMBEDDING_DIMENSIONS, SUPPORTED_DIMENSIONS, get_search_dimensions, truncate_embedding
+    from tracing import span, debug_enabled, set_property
+except ImportError:
+    from .embedding_cache import EmbeddingCache, normalize_query
+    from .segment_cache import WhitelistCache, DataVersionWatcher, segment_key
+    from .vector_index import load_vector_index
+    from .embedding_config import EMBEDDING_MODEL, FULL_EMBEDDING_DIMENSIONS, SUPPORTED_DIMENSIONS, get_search_dimensions, truncate_embedding
+    from .tracing import span, debug_enabled, set_property
 
 logger = logging.getLogger(__name__)
 
+# 컨테이너 공용 스레드 풀 (whitelist / embedding / vector 단계 동시 실행용)
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag")
+
+
+def _submit(fn, *args):
+    """현재 컨텍스트(요청 trace)를 유지한 채 스레드 풀에서 실행"""
+    return _EXECUTOR.submit(contextvars.copy_context().run, fn, *args)
+
 class RAGService:
-    def __init__(self):
+    def __init__(self, supabase=None, openai_client=None):
+        """
+        Args:
+            supabase: 재사용할 Supabase 클라이언트 (없으면 환경변수로 생성)
+            openai_client: 재사용할 OpenAI 클라이언트 (없으면 환경변수로 생성)
+        """
         # Initialize Supabase
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
+        if supabase is None:
+            supabase_url = os.getenv("SUPABASE_URL")
+            supabase_key = os.getenv("SUPABASE_SERVICE_KEY")
+            if not supabase_url or not supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
+            from supabase import create_client  # SDK는 직접 생성할 때만 import (Cold Start)
+            supabase = create_client(supabase_url, supabase_key)
+        self.supabase = supabase
 
         # Initialize OpenAI
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY must be set")
-        self.openai_client = OpenAI(api_key=openai_api_key)
+        if openai_client is None:
+            openai_api_key = os.getenv("OPENAI_API_KEY")
+            if not openai_api_key:
+                raise ValueError("OPENAI_API_KEY must be set")
+            from openai import OpenAI
+            openai_client = OpenAI(api_key=openai_api_key)
+        self.openai_client = openai_client
         
         # Models
-        self.embedding_model = "text-embedding-3-small"
-        self.embedding_dimensions = 1536  # OpenAI text-embedding-3-small 차원
+        self.embedding_model = EMBEDDING_MODEL
+        self.embedding_dimensions = FULL_EMBEDDING_DIMENSIONS  # 생성/캐시는 항상 전체 차원
+        
+        # 벡터 검색 차원 (EMBEDDING_DIMENSIONS: 256/512/768/1536)
+        # 1536 미만이면 match_benefits_reduced로 축소 차원 인덱스 검색 후 전체 차원으로 재정렬
+        self.search_dimensions = get_search_dimensions()
+        self.rerank_enabled = os.getenv("EMBEDDING_RERANK", "true").lower() in ("1", "true", "yes", "on")
+        self.rerank_candidates = int(os.getenv("EMBEDDING_RERANK_CANDIDATES", "150"))
+        
+        # 쿼리 임베딩 캐시 (LRU → /tmp → query_embedding_cache 테이블)
+        self.embedding_cache = None
+        if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on"):
+            self.embedding_cache = EmbeddingCache(
+                model=self.embedding_model,
+                dimensions=self.embedding_dimensions,
+                supabase=self.supabase
+            )
+        
+        # 프로필 세그먼트 단위 Whitelist 캐시 (benefits 데이터 버전으로 무효화)
+        self.whitelist_cache = None
+        if os.getenv("WHITELIST_CACHE_ENABLED", "true").lower() in ("1", "true", "yes", "on"):
+            self.whitelist_cache = WhitelistCache(supabase=self.supabase)
+        
+        # 동시 실행 경로 + 단계별 timeout (초)
+        self.parallel = os.getenv("RAG_PARALLEL", "true").lower() in ("1", "true", "yes", "on")
+        self.stage_timeouts = {
+            "whitelist": float(os.getenv("RAG_WHITELIST_TIMEOUT", "2.5")),
+            "embedding": float(os.getenv("RAG_EMBEDDING_TIMEOUT", "2.0")),
+            "vector": float(os.getenv("RAG_VECTOR_TIMEOUT", "2.0")),
+        }
+        
+        # 검색 모드
+        # - client: whitelist + match_benefits를 받아 Lambda에서 병합/정렬 (기존)
+        # - server: recommend_benefits RPC 한 번으로 DB에서 병합/정렬 후 top_k만 수신
+        self.search_mode = os.getenv("RAG_SEARCH_MODE", "client").lower()
+        
+        # 벡터 검색 백엔드 (client 모드에서 사용)
+        # - db: match_benefits RPC (기존)
+        # - local: Lambda 번들 스냅샷(vector_snapshot.bin)을 NumPy로 검색, 사용 불가 시 db로 대체
+        self.vector_backend = os.getenv("RAG_VECTOR_BACKEND", "db").lower()
+        # 스냅샷이 현재 benefits 데이터 버전보다 오래된 경우에도 사용할지 여부
+        self.allow_stale_snapshot = os.getenv("VECTOR_SNAPSHOT_ALLOW_STALE", "false").lower() in ("1", "true", "yes", "on")
+        
+        # 하이브리드 검색 (client 모드, db 백엔드): hybrid_match_benefits RPC로 전문검색/사업명 트라이그램/벡터를 RRF 결합
+        # 정확한 사업명 질의("기초연금")의 정밀도가 높아 match_count를 줄여 응답 크기를 줄임
+        self.hybrid_enabled = os.getenv("RAG_HYBRID", "false").lower() in ("1", "true", "yes", "on")
+        self.hybrid_match_count = int(os.getenv("RAG_HYBRID_MATCH_COUNT", "20"))
+        self.hybrid_weights = {
+            "vector_weight": float(os.getenv("RAG_HYBRID_VECTOR_WEIGHT", "1.0")),
+            "fulltext_weight": float(os.getenv("RAG_HYBRID_FULLTEXT_WEIGHT", "1.0")),
+            "trigram_weight": float(os.getenv("RAG_HYBRID_TRIGRAM_WEIGHT", "1.0")),
+        }
+        self._version_watcher = self.whitelist_cache.version_watcher if self.whitelist_cache is not None else None
         
         # 🔍 초기화 로그 (디버깅용)
-        logger.info(f"✅ RAGService initialized with OpenAI model: {self.embedding_model}, dimensions: {self.embedding_dimensions}")
+        logger.info(f"✅ RAGService initialized with OpenAI model: {self.embedding_model}, dimensions: {self.embedding_dimensions} (search: {self.search_dimensions})")
     
     @staticmethod
     def convert_birth_year_to_life_cycle(birth_year: int) -> List[str]:
@@ -69,10 +152,27 @@ class RAGService:
             return ['노년']
 
     def generate_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding using OpenAI text-embedding-3-small"""
+        """Generate embedding using OpenAI text-embedding-3-small (캐시 우선 조회)"""
         if not text:
             return None
-            
+        
+        if self.embedding_cache is None:
+            return self._create_embedding(text)
+        
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            logger.info(f"⚡ Embedding cache hit (stats={self.embedding_cache.stats})")
+            set_property("embedding_cache_hit", True)
+            return cached
+        
+        # 캐시 키와 실제 임베딩 입력을 일치시키기 위해 정규화된 발화로 생성
+        embedding = self._create_embedding(normalize_query(text))
+        if embedding:
+            self.embedding_cache.put(text, embedding)
+        return embedding
+
+    def _create_embedding(self, text: str) -> Optional[List[float]]:
+        """OpenAI Embeddings API 호출"""
         try:
             logger.info(f"🔍 Generating embedding with {self.embedding_model} (dim={self.embedding_dimensions})")
             response = self.openai_client.embeddings.create(
@@ -114,14 +214,250 @@ class RAGService:
             
             logger.info(f"Whitelist params: ctpv={params['p_ctpv']}, sgg={params['p_sgg']}, life={params['p_life_array']}, target={params['p_target_array']}")
             
+            cache_key = segment_key(params['p_ctpv'], params['p_sgg'], life_cycle, target_group)
+            if self.whitelist_cache is not None:
+                cached = self.whitelist_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"⚡ Whitelist cache hit: {len(cached)} items (stats={self.whitelist_cache.stats})")
+                    set_property("whitelist_cache_hit", True)
+                    return cached
+            
             # Call RPC (RPC 함수가 모든 컬럼 반환)
-            response = self.supabase.rpc("get_eligible_benefits", params).execute()
+            with span("whitelist_rpc"):
+                response = self.supabase.rpc("get_eligible_benefits", params).execute()
+            if self.whitelist_cache is not None:
+                self.whitelist_cache.put(cache_key, response.data)
             return response.data
             
         except Exception as e:
             logger.error(f"Whitelist fetch failed: {e}")
             return [] 
 
+    def _match_benefits(self, embedding: List[float], user_profile: Dict[str, Any], life_cycle: List[str], target_group: List[str], query_text: Optional[str] = None) -> List[Dict]:
+        """Vector Search RPC (match_benefits, RAG_HYBRID이면 query_text로 hybrid_match_benefits)"""
+        # Fetch broad candidates with REGIONAL PRE-FILTERING
+        # This ensures local benefits (like ID 7740) are ranked effectively even if national score > local score
+        params = {
+            "query_embedding": embedding,
+            # Threshold 가이드라인:
+            # - 0.40: 최고 품질 (결과 23% 감소)
+            # - 0.35: 최적 균형 (품질 우수 + 충분한 결과) ✅
+            # - 0.33: 더 많은 결과 (품질 약간 저하)
+            "match_threshold": 0.35,
+            "match_count": 50,
+            "p_ctpv": user_profile.get("ctpv_nm"),
+            "p_sgg": user_profile.get("sgg_nm"),
+            "p_life_array": life_cycle or [],
+            "p_target_array": target_group or []
+        }
+        
+        rpc_start = time.time()
+        with span("vector_rpc"):
+            vector_candidates = self._match_benefits_local(params) if self.vector_backend == "local" else None
+            if vector_candidates is None and self.hybrid_enabled and query_text:
+                vector_candidates = self._hybrid_match_benefits(params, query_text)
+            if vector_candidates is None and self.search_dimensions < self.embedding_dimensions:
+                vector_candidates = self._match_benefits_reduced(params)
+            if vector_candidates is None:
+                logger.info(f"Calling match_benefits (Filters: {params['p_ctpv']} {params['p_sgg']}, Life: {life_cycle}, Target: {target_group})...")
+                rpc_response = self.supabase.rpc("match_benefits", params).execute()
+                vector_candidates = rpc_response.data
+        logger.info(f"🔍 Vector Search: {len(vector_candidates)} items found (Time: {time.time() - rpc_start:.3f}s, Threshold: {params['match_threshold']})")
+        set_property("vector_hits", len(vector_candidates))
+        
+        # 🐛 디버그: 첫 번째 결과의 모든 필드 확인 (TRACE_DEBUG)
+        if vector_candidates and debug_enabled():
+            first_item = vector_candidates[0]
+            logger.info(f"🐛 DEBUG - First item keys: {list(first_item.keys())}")
+            logger.info(f"🐛 DEBUG - similarity value: {first_item.get('similarity', 'NOT_FOUND')}")
+        
+        if vector_candidates and debug_enabled():
+            # Top 5 결과 로그 (유사도 포함)
+            logger.info("📊 벡터 검색 결과 (Top 10):")
+            for i, match in enumerate(vector_candidates[:10], 1):
+                similarity = match.get('similarity', 'N/A')
+                serv_nm = match.get('serv_nm', '제목 없음')
+                benefit_id = match.get('id', 'N/A')
+                if isinstance(similarity, (int, float)):
+                    logger.info(f"  #{i} [유사도: {similarity:.3f}] ID={benefit_id} | '{serv_nm}'")
+                else:
+                    logger.info(f"  #{i} [유사도: N/A] ID={benefit_id} | '{serv_nm}'")
+        elif not vector_candidates:
+            logger.warning(f"⚠️ Vector Search returned 0 results! Check: 1) Embeddings exist? 2) Threshold too high?")
+        
+        return vector_candidates
+
+    def _match_benefits_reduced(self, params: Dict[str, Any]) -> Optional[List[Dict]]:
+        """
+        축소 차원 벡터 검색 RPC (match_benefits_reduced, 실패 시 None → match_benefits)
+        
+        rerank를 켜면 축소 차원으로 rerank_candidates개를 뽑은 뒤 전체 차원 유사도로 재정렬하며,
+        이때 similarity/threshold는 match_benefits와 같은 1536차원 기준입니다.
+        """
+        reduced_params = dict(params)
+        reduced_params["query_embedding"] = truncate_embedding(params["query_embedding"], self.search_dimensions)
+        reduced_params["rerank_embedding"] = params["query_embedding"] if self.rerank_enabled else None
+        reduced_params["candidate_count"] = max(self.rerank_candidates, params["match_count"]) if self.rerank_enabled else params["match_count"]
+        
+        try:
+            logger.info(f"Calling match_benefits_reduced (dim={self.search_dimensions}, rerank={self.rerank_enabled}, candidates={reduced_params['candidate_count']})...")
+            return self.supabase.rpc("match_benefits_reduced", reduced_params).execute().data
+        except Exception as e:
+            logger.error(f"match_benefits_reduced failed, falling back to match_benefits: {e}")
+            return None
+
+    def _hybrid_match_benefits(self, params: Dict[str, Any], query_text: str) -> Optional[List[Dict]]:
+        """
+        하이브리드 검색 RPC (hybrid_match_benefits, 실패 시 None → match_benefits)
+        
+        전문검색/트라이그램으로만 찾은 혜택은 similarity가 null이며, 순서는 rrf_score 기준입니다.
+        """
+        hybrid_params = dict(params)
+        hybrid_params["query_text"] = query_text
+        hybrid_params["match_count"] = self.hybrid_match_count
+        hybrid_params.update(self.hybrid_weights)
+        
+        try:
+            logger.info(f"Calling hybrid_match_benefits (match_count={self.hybrid_match_count}, weights={self.hybrid_weights})...")
+            return self.supabase.rpc("hybrid_match_benefits", hybrid_params).execute().data
+        except Exception as e:
+            logger.error(f"hybrid_match_benefits failed, falling back to match_benefits: {e}")
+            return None
+
+    def get_vector_index(self):
+        """사용 가능한 로컬 벡터 인덱스 (없거나 데이터 버전이 뒤처지면 None)"""
+        index = load_vector_index()
+        if index is None or index.dimensions not in SUPPORTED_DIMENSIONS or index.dimensions > self.embedding_dimensions:
+            return None
+        
+        if not self.allow_stale_snapshot:
+            if self._version_watcher is None:
+                self._version_watcher = DataVersionWatcher(self.supabase)
+            current_version = self._version_watcher.current()
+            if current_version is not None and index.data_version != current_version:
+                logger.warning(f"⚠️ Vector snapshot is stale (snapshot={index.data_version}, current={current_version}) - using match_benefits")
+                return None
+        return index
+
+    def _match_benefits_local(self, params: Dict[str, Any]) -> Optional[List[Dict]]:
+        """스냅샷 기반 로컬 벡터 검색 (match_benefits와 동일한 필터/정렬, 실패 시 None)"""
+        index = self.get_vector_index()
+        if index is None:
+            return None
+        try:
+            # 축소 차원으로 내보낸 스냅샷이면 쿼리도 같은 차원으로 잘라서 검색
+            results = index.search(
+                truncate_embedding(params["query_embedding"], index.dimensions),
+                match_threshold=params["match_threshold"],
+                match_count=params["match_count"],
+                ctpv=params["p_ctpv"],
+                sgg=params["p_sgg"],
+                life_cycle=params["p_life_array"],
+                target_group=params["p_target_array"],
+            )
+            logger.info(f"🧭 Local vector index searched ({index.dtype}, {index.count} vectors)")
+            return results
+        except Exception as e:
+            logger.error(f"Local vector search failed, falling back to match_benefits: {e}")
+            return None
+
+    def _embed_query(self, query_text: str) -> Optional[List[float]]:
+        logger.info(f"🔎 검색어: '{query_text}'")
+        start_embed = time.time()
+        with span("embedding"):
+            embedding = self.generate_embedding(query_text)
+        logger.info(f"Query Embedding Gen Time: {time.time() - start_embed:.3f}s")
+        if not embedding:
+            logger.error("Failed to generate embedding for query.")
+        return embedding
+
+    def _vector_search_sequential(self, query_text: str, user_profile: Dict[str, Any], life_cycle: List[str], target_group: List[str]) -> List[Dict]:
+        embedding = self._embed_query(query_text)
+        if not embedding:
+            return []
+        try:
+            return self._match_benefits(embedding, user_profile, life_cycle, target_group, query_text)
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            return []
+
+    def _search_concurrently(self, query_text: str, user_profile: Dict[str, Any], life_cycle: List[str], target_group: List[str]):
+        """
+        Whitelist RPC와 (임베딩 → match_benefits) 체인을 동시에 실행
+        
+        임계 경로: max(whitelist, embedding + vector) (순차 실행 시 세 단계 합)
+        단계별 timeout 초과 시 해당 단계는 빈 결과로 처리 (순차 경로의 실패 처리와 동일)
+        
+        Returns:
+            (whitelist_items, vector_candidates)
+        """
+        start = time.time()
+        whitelist_future = _submit(self._fetch_eligible_whitelist, user_profile)
+        
+        vector_candidates = []
+        if query_text:
+            embed_future = _submit(self._embed_query, query_text)
+            embedding = None
+            try:
+                embedding = embed_future.result(timeout=self.stage_timeouts["embedding"])
+            except FuturesTimeoutError:
+                logger.error(f"⏱️ Embedding stage timed out ({self.stage_timeouts['embedding']}s)")
+            except Exception as e:
+                logger.error(f"Embedding stage failed: {e}")
+            
+            if embedding:
+                vector_future = _submit(self._match_benefits, embedding, user_profile, life_cycle, target_group, query_text)
+                try:
+                    vector_candidates = vector_future.result(timeout=self.stage_timeouts["vector"])
+                except FuturesTimeoutError:
+                    logger.error(f"⏱️ Vector stage timed out ({self.stage_timeouts['vector']}s)")
+                except Exception as e:
+                    logger.error(f"Vector search failed: {e}")
+        
+        # Whitelist timeout은 검색 시작 시점 기준 (이미 벡터 체인과 겹쳐서 진행됨)
+        whitelist_items = []
+        remaining = max(0.0, self.stage_timeouts["whitelist"] - (time.time() - start))
+        try:
+            whitelist_items = whitelist_future.result(timeout=remaining)
+        except FuturesTimeoutError:
+            logger.error(f"⏱️ Whitelist stage timed out ({self.stage_timeouts['whitelist']}s)")
+        except Exception as e:
+            logger.error(f"Whitelist stage failed: {e}")
+        
+        logger.info(f"⚡ Concurrent search stages done in {time.time() - start:.3f}s")
+        return whitelist_items, vector_candidates
+
+    def _recommend_server_side(self, query_text: str, user_profile: Dict[str, Any], life_cycle: List[str], target_group: List[str], top_k: int) -> List[Dict[str, Any]]:
+        """
+        recommend_benefits RPC 한 번으로 VECTOR/RULES 병합 결과(top_k) 조회
+        
+        임베딩 생성에 실패하면 query_embedding=null로 호출하여 자격기반 결과만 받습니다.
+        """
+        embedding = self._embed_query(query_text) if query_text else None
+        
+        params = {
+            "query_embedding": embedding,
+            "p_ctpv": user_profile.get("ctpv_nm"),
+            "p_sgg": user_profile.get("sgg_nm"),
+            "p_life_array": life_cycle or [],
+            "p_target_array": target_group or [],
+            "match_threshold": 0.35,
+            "match_count": 50,
+            "top_k": top_k
+        }
+        
+        try:
+            rpc_start = time.time()
+            with span("recommend_rpc"):
+                results = self.supabase.rpc("recommend_benefits", params).execute().data or []
+        except Exception as e:
+            logger.error(f"recommend_benefits failed: {e}")
+            return []
+        
+        vector_count = sum(1 for item in results if item.get('source_type') == 'VECTOR')
+        logger.info(f"🗄️ recommend_benefits: {len(results)} items (VECTOR={vector_count}, RULES={len(results) - vector_count}, Time: {time.time() - rpc_start:.3f}s)")
+        return results
+
     def get_recommended_services(self, query_text: str, user_profile: Dict[str, Any], top_k: int = 10) -> List[Dict[str, Any]]:
         """
         Main Search Logic:
@@ -130,6 +466,9 @@ class RAGService:
         3. Intersect & Prioritize:
            - Top: Vector matches that are in Whitelist
            - Bottom: Remaining Whitelist items (Prioritized by Cash/In-kind)
+        
+        RAG_PARALLEL=true(기본)이면 1번과 2번을 동시에 실행합니다.
+        RAG_SEARCH_MODE=server이면 1~3번 전체를 recommend_benefits RPC가 DB에서 처리합니다.
         """
         # Extract life_cycle and target_group from user profile
         life_cycle = user_profile.get("life_cycle", [])
@@ -138,83 +477,43 @@ class RAGService:
         
         target_group = user_profile.get("target_group", [])
         
-        # 1. Fetch Eligible Whitelist
-        whitelist_items = self._fetch_eligible_whitelist(user_profile)
-        whitelist_map = {item['id']: item for item in whitelist_items}
-        whitelist_ids = set(whitelist_map.keys())
+        if self.search_mode == "server":
+            return self._recommend_server_side(query_text, user_profile, life_cycle, target_group, top_k)
+        
+        # 1 + 2. Fetch Eligible Whitelist & Vector Search
+        if self.parallel:
+            whitelist_items, vector_candidates = self._search_concurrently(query_text, user_profile, life_cycle, target_group)
+        else:
+            whitelist_items = self._fetch_eligible_whitelist(user_profile)
+            vector_candidates = []
+            if query_text:
+                vector_candidates = self._vector_search_sequential(query_text, user_profile, life_cycle, target_group)
         
         logger.info(f"User Eligible Universe (Whitelist): {len(whitelist_items)} items")
         
+        with span("ranking"):
+            return self._merge_results(query_text, user_profile, whitelist_items, vector_candidates, top_k)
+
+    def _merge_results(self, query_text: str, user_profile: Dict[str, Any], whitelist_items: List[Dict], vector_candidates: List[Dict], top_k: int) -> List[Dict[str, Any]]:
+        """
+        VECTOR 결과 우선 + 남은 자리를 Whitelist(RULES)로 채움
+        
+        RULES 정렬: 지역 구체성(시군구 > 시도 > 전국) → 현금/현물 우선
+        """
         final_results = []
         seen_ids = set()
 
-        # 2. Vector Search (If query exists)
+        # 3. Use Vector Results directly (already filtered by SQL, 혜택 단위 - seen_ids는 안전장치)
+        for vec_item in vector_candidates:
+            vec_id = vec_item['id']
+            if vec_id not in seen_ids:
+                # Mark as VECTOR source
+                vec_item['source_type'] = 'VECTOR'
+                final_results.append(vec_item)
+                seen_ids.add(vec_id)
+        
         if query_text:
-            logger.info(f"🔎 검색어: '{query_text}'")
-            start_embed = time.time()
-            embedding = self.generate_embedding(query_text)
-            logger.info(f"Query Embedding Gen Time: {time.time() - start_embed:.3f}s")
-            
-            if embedding:
-                try:
-                    # Fetch broad candidates with REGIONAL PRE-FILTERING
-                    # This ensures local benefits (like ID 7740) are ranked effectively even if national score > local score
-                    params = {
-                        "query_embedding": embedding,
-                        # Threshold 가이드라인:
-                        # - 0.40: 최고 품질 (결과 23% 감소)
-                        # - 0.35: 최적 균형 (품질 우수 + 충분한 결과) ✅
-                        # - 0.33: 더 많은 결과 (품질 약간 저하)
-                        "match_threshold": 0.35,
-                        "match_count": 50,
-                        "p_ctpv": user_profile.get("ctpv_nm"),
-                        "p_sgg": user_profile.get("sgg_nm"),
-                        "p_life_array": life_cycle or [],
-                        "p_target_array": target_group or []
-                    }
-                    
-                    logger.info(f"Calling match_benefits (Filters: {params['p_ctpv']} {params['p_sgg']}, Life: {life_cycle}, Target: {target_group})...")
-                    rpc_start = time.time()
-                    rpc_response = self.supabase.rpc("match_benefits", params).execute()
-                    
-                    vector_candidates = rpc_response.data
-                    logger.info(f"🔍 Vector Search: {len(vector_candidates)} items found (Time: {time.time() - rpc_start:.3f}s, Threshold: {params['match_threshold']})")
-                    
-                    # 🐛 디버그: 첫 번째 결과의 모든 필드 확인
-                    if vector_candidates and len(vector_candidates) > 0:
-                        first_item = vector_candidates[0]
-                        logger.info(f"🐛 DEBUG - First item keys: {list(first_item.keys())}")
-                        logger.info(f"🐛 DEBUG - similarity value: {first_item.get('similarity', 'NOT_FOUND')}")
-                    
-                    if vector_candidates:
-                        # Top 5 결과 로그 (유사도 포함)
-                        logger.info("📊 벡터 검색 결과 (Top 10):")
-                        for i, match in enumerate(vector_candidates[:10], 1):
-                            similarity = match.get('similarity', 'N/A')
-                            serv_nm = match.get('serv_nm', '제목 없음')
-                            benefit_id = match.get('id', 'N/A')
-                            if similarity != 'N/A':
-                                logger.info(f"  #{i} [유사도: {similarity:.3f}] ID={benefit_id} | '{serv_nm}'")
-                            else:
-                                logger.info(f"  #{i} [유사도: N/A] ID={benefit_id} | '{serv_nm}'")
-                    else:
-                        logger.warning(f"⚠️ Vector Search returned 0 results! Check: 1) Embeddings exist? 2) Threshold too high?")
-
-                    # 3. Use Vector Results directly (already filtered by SQL)
-                    for vec_item in vector_candidates:
-                        vec_id = vec_item['id']
-                        if vec_id not in seen_ids:
-                            # Mark as VECTOR source
-                            vec_item['source_type'] = 'VECTOR'
-                            final_results.append(vec_item)
-                            seen_ids.add(vec_id)
-                                
-                    logger.info(f"✅ VECTOR results: {len(final_results)} items")
-                    
-                except Exception as e:
-                    logger.error(f"Vector search failed: {e}")
-            else:
-                logger.error("Failed to generate embedding for query.")
+            logger.info(f"✅ VECTOR results: {len(final_results)} items")
 
         # 4. Fill remaining spots with Whitelist items (Priority 2)
         remaining_slots = top_k - len(final_results)
@@ -256,7 +555,9 @@ class RAGService:
             
             # Fill
             rules_added = 0
-            logger.info("📋 자격기반 결과 추가:")
+            verbose = debug_enabled()
+            if verbose:
+                logger.info("📋 자격기반 결과 추가:")
             for item in remaining_candidates:
                 # Mark as RULES source
                 item_copy = item.copy()
@@ -265,14 +566,14 @@ class RAGService:
                 seen_ids.add(item['id'])
                 rules_added += 1
                 
-                # 로그 출력 (Top 10만)
-                if rules_added <= 10:
+                # 로그 출력 (Top 10만, TRACE_DEBUG)
+                if verbose and rules_added <= 10:
                     logger.info(f"  #{rules_added} [자격기반] ID={item.get('id')} | '{item.get('serv_nm', '제목 없음')}'")
                 
                 if len(final_results) >= top_k:
                     break
             
-            if rules_added > 10:
+            if verbose and rules_added > 10:
                 logger.info(f"  ... 및 {rules_added - 10}개 더")
             logger.info(f"✅ RULES results: {rules_added} items added")
         
@@ -106,6 +106,8 @@ def lambda_handler(event, context):
                         "dept_name": dept_name,
                         "serv_dgst": serv_dgst,
                         "life_nm_array": life_array,
+                        # 일부 컬럼만 갱신하므로 기존 카드는 무효화 (render_benefit_cards.py가 다시 렌더링)
+                        "render_card": None,
                         "updated_at": datetime.now().isoformat()
                     }
                     
@@ -126,6 +128,19 @@ def lambda_handler(event, context):
         print(f"Job Failed: {e}")
         return {'statusCode': 500, 'body': str(e)}
 
+    # 데이터 버전 증가 (kakao_webhook Whitelist 캐시 무효화)
+    if inserted_count:
+        try:
+            SupabaseClient.get_client().rpc('bump_data_version', {'p_name': 'benefits'}).execute()
+        except Exception as e:
+            print(f"Data version bump failed: {e}")
+
+        # 세그먼트 자격 인덱스 갱신 (실패 시 조회 함수가 전체 조건 평가로 동작)
+        try:
+            SupabaseClient.get_client().rpc('refresh_segment_eligibility', {'p_full': False}).execute()
+        except Exception as e:
+            print(f"Segment eligibility refresh failed: {e}")
+
     return {
         'statusCode': 200,
         'body': json.dumps({
@@ -0,0 +1,273 @@
+"""
+행정구역 이름 인덱스 (자유 입력 → 표준 시/도·시/군/구·지역코드)
+
+region_snapshot의 시/도 → 시/군/구 → 읍/면/동 계층으로 별칭 사전을 만들어
+"강남", "분당", "성남 분당구", "경기 성남시 분당구", "역삼동" 같은 입력을
+(ctpv_nm, sgg_nm, region_code)로 해석합니다. 전부 메모리 dict 조회라 호출당 수십 μs 수준입니다.
+
+조회 순서 (점수가 높을수록 확실):
+    1. 별칭 정확 일치 - 전체 이름(1.0) / 여러 단계 조합(0.95) / 읍·면·동(0.85) / 일부 단계·'시군구' 생략(0.8)
+    2. 접두어 일치 (정렬된 별칭 목록 이분 탐색, 0.6)
+    3. 글자 유사도 (오타, 0.5 × 유사도) - 글자를 공유하는 시/군/구만 비교
+
+결과가 여러 개면 웹훅이 quick reply로 후보를 보여줍니다.
+"""
+import bisect
+import difflib
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+try:
+    from region_snapshot import load_region_snapshot, RegionSnapshot
+except ImportError:
+    from .region_snapshot import load_region_snapshot, RegionSnapshot
+
+logger = logging.getLogger(__name__)
+
+SCORE_FULL = 1.0
+SCORE_COMBINED = 0.95
+SCORE_EMD = 0.85
+SCORE_PART = 0.8
+SCORE_PREFIX = 0.6
+SCORE_FUZZY = 0.5
+FUZZY_MIN_SIMILARITY = 0.6
+CONFIDENT_SCORE = 0.8  # 이 점수 이상이고 단독 1위면 바로 확정
+
+SIDO_SUFFIXES = ("특별자치시", "특별자치도", "특별시", "광역시", "도")
+SGG_SUFFIXES = ("시", "군", "구")
+EMD_SUFFIXES = ("읍", "면", "동", "가", "리")
+
+# 도 이름 약칭 (충청북도 → 충북)
+SIDO_ABBREVIATIONS = {
+    "충청북도": "충북",
+    "충청남도": "충남",
+    "전라북도": "전북",
+    "전북특별자치도": "전북",
+    "전라남도": "전남",
+    "경상북도": "경북",
+    "경상남도": "경남",
+}
+
+
+def _compact(text: Optional[str]) -> str:
+    return "".join((text or "").split())
+
+
+def _stem(name: str, suffixes: Tuple[str, ...]) -> Optional[str]:
+    """행정구역 접미사 제거 (2글자 이상 남을 때만: '강남구' → '강남', '중구'는 제외)"""
+    for suffix in suffixes:
+        if name.endswith(suffix) and len(name) - len(suffix) >= 2:
+            return name[:-len(suffix)]
+    return None
+
+
+def _forms(name: str, suffixes: Tuple[str, ...]) -> List[str]:
+    stem = _stem(name, suffixes)
+    return [name, stem] if stem else [name]
+
+
+class RegionIndex:
+    """시/도·시/군/구 별칭 사전 + 접두어/글자 보조 인덱스"""
+
+    def __init__(self, snapshot: RegionSnapshot):
+        self.version = snapshot.version
+        self.entries: List[Dict[str, str]] = []
+        self._sido_alias: Dict[str, str] = {}
+        self._alias: Dict[str, Dict[int, float]] = {}
+        self._chars: Dict[str, Set[int]] = {}
+        self._compact_names: List[str] = []
+
+        for ctpv_nm in snapshot.city_names():
+            for alias in self._sido_aliases(ctpv_nm):
+                self._sido_alias.setdefault(alias, ctpv_nm)
+
+        for ctpv_nm, sgg_nm, region_code, emd_names in snapshot.iter_sgg():
+            idx = len(self.entries)
+            self.entries.append({"ctpv_nm": ctpv_nm, "sgg_nm": sgg_nm, "region_code": region_code})
+
+            # '성남시 분당구' → 단계별 형태 ['성남시','성남'] × ['분당구','분당']
+            parts = [_forms(part, SGG_SUFFIXES) for part in sgg_nm.split()]
+            self._add_alias(_compact(sgg_nm), idx, SCORE_FULL)
+            combos = [""]
+            for forms in parts:
+                combos = [prefix + form for prefix in combos for form in forms]
+                for form in forms:
+                    self._add_alias(form, idx, SCORE_PART)
+            for combo in combos:
+                self._add_alias(combo, idx, SCORE_COMBINED)
+            for emd in emd_names:
+                for form in _forms(_compact(emd), EMD_SUFFIXES):
+                    self._add_alias(form, idx, SCORE_EMD)
+
+            compact_name = _compact(sgg_nm)
+            self._compact_names.append(compact_name)
+            for ch in set(compact_name):
+                self._chars.setdefault(ch, set()).add(idx)
+
+        self._sorted_aliases = sorted(self._alias)
+        self._sido_prefixes = sorted(self._sido_alias, key=len, reverse=True)
+
+    @staticmethod
+    def _sido_aliases(ctpv_nm: str) -> List[str]:
+        aliases = [ctpv_nm]
+        for suffix in SIDO_SUFFIXES:
+            if ctpv_nm.endswith(suffix) and len(ctpv_nm) > len(suffix):
+                aliases.append(ctpv_nm[:-len(suffix)])
+                break
+        if ctpv_nm in SIDO_ABBREVIATIONS:
+            aliases.append(SIDO_ABBREVIATIONS[ctpv_nm])
+        return aliases
+
+    def _add_alias(self, alias: str, idx: int, score: float) -> None:
+        if not alias:
+            return
+        scores = self._alias.setdefault(alias, {})
+        scores[idx] = max(scores.get(idx, 0.0), score)
+
+    # ------------------------------------------------
+    # 조회
+    # ------------------------------------------------
+
+    def find_sido(self, text: Optional[str]) -> Optional[str]:
+        """발화에서 시/도 찾기 ('서울', '경기도', '충북', '서울 종로구' 등)"""
+        compact = _compact(text)
+        if compact in self._sido_alias:
+            return self._sido_alias[compact]
+        for token in (text or "").split():
+            if token in self._sido_alias:
+                return self._sido_alias[token]
+        for alias in self._sido_prefixes:
+            if len(alias) >= 2 and compact.startswith(alias):
+                return self._sido_alias[alias]
+        return None
+
+    def _split_sido(self, text: str) -> Tuple[Optional[str], List[str]]:
+        """입력 앞부분의 시/도를 분리 ('경기 성남 분당구' → ('경기도', ['성남', '분당구']))"""
+        tokens = text.split()
+        if tokens and tokens[0] in self._sido_alias:
+            return self._sido_alias[tokens[0]], tokens[1:]
+        # 붙여 쓴 입력 ('서울종로구'): 나머지가 별칭일 때만 분리 ('광주시'는 경기도 광주시)
+        compact = _compact(text)
+        for alias in self._sido_prefixes:
+            if len(alias) >= 2 and compact.startswith(alias) and compact[len(alias):] in self._alias:
+                return self._sido_alias[alias], [compact[len(alias):]]
+        return None, tokens
+
+    def _lookup(self, term: str) -> Dict[int, float]:
+        """단어 하나 → {entry idx: 점수} (정확 → 접두어 → 글자 유사도 순)"""
+        if term in self._alias:
+            return dict(self._alias[term])
+
+        hits: Dict[int, float] = {}
+        if len(term) >= 2:
+            pos = bisect.bisect_left(self._sorted_aliases, term)
+            while pos < len(self._sorted_aliases) and self._sorted_aliases[pos].startswith(term):
+                for idx in self._alias[self._sorted_aliases[pos]]:
+                    hits[idx] = SCORE_PREFIX
+                pos += 1
+        if hits:
+            return hits
+
+        # 오타: 입력 글자 중 (n-1)개 이상을 공유하는 시/군/구만 유사도 계산
+        chars = set(term)
+        shared: Dict[int, int] = {}
+        for ch in chars:
+            for idx in self._chars.get(ch, ()):
+                shared[idx] = shared.get(idx, 0) + 1
+        min_shared = max(1, len(chars) - 1)
+        for idx, count in shared.items():
+            if count < min_shared:
+                continue
+            similarity = difflib.SequenceMatcher(None, term, self._compact_names[idx]).ratio()
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                hits[idx] = SCORE_FUZZY * similarity
+        return hits
+
+    def resolve(self, text: Optional[str], ctpv_nm: Optional[str] = None, limit: Optional[int] = 5) -> List[Dict[str, Any]]:
+        """
+        자유 입력 → 시/군/구 후보 (점수 내림차순)
+
+        Args:
+            text: 사용자 입력 ('분당', '경기 성남시 분당구', '역삼동' 등)
+            ctpv_nm: 이미 선택한 시/도 (있으면 해당 시/도 안에서만 검색)
+            limit: 최대 후보 수 (None이면 전체)
+
+        Returns:
+            [{"ctpv_nm", "sgg_nm", "region_code", "score"}, ...]
+        """
+        text = " ".join((text or "").split())
+        if not text:
+            return []
+
+        sido, terms = self._split_sido(text)
+        if not terms or (ctpv_nm and sido and sido != ctpv_nm):
+            # '광주'만 입력(경기도 광주시) 또는 다른 시/도 이름과 겹치는 시/군/구
+            sido, terms = None, text.split()
+        ctpv_filter = ctpv_nm or sido
+
+        # 여러 단어 입력은 붙여 쓴 조합을 먼저 시도 ('성남 분당구' → '성남분당구')
+        scores = self._alias.get("".join(terms), {}) if len(terms) > 1 else {}
+        if not scores:
+            scores = self._lookup(terms[0])
+            for term in terms[1:]:
+                term_scores = self._lookup(term)
+                scores = {idx: min(score, term_scores[idx]) for idx, score in scores.items() if idx in term_scores}
+
+        results = []
+        for idx, score in scores.items():
+            entry = self.entries[idx]
+            if ctpv_filter and entry["ctpv_nm"] != ctpv_filter:
+                continue
+            results.append({**entry, "score": round(score, 3)})
+        results.sort(key=lambda r: (-r["score"], r["region_code"]))
+        return results[:limit] if limit else results
+
+    def match(self, text: Optional[str], ctpv_nm: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        확정 결과 + 후보 목록
+
+        Returns:
+            (확정된 후보 또는 None, 후보 목록) - 확정: 1위 점수가 CONFIDENT_SCORE 이상이고 동점 없음
+        """
+        results = self.resolve(text, ctpv_nm=ctpv_nm)
+        if results and results[0]["score"] >= CONFIDENT_SCORE:
+            if len(results) == 1 or results[1]["score"] < results[0]["score"]:
+                return results[0], results
+        return None, results
+
+    def sgg_candidates(self, text: Optional[str]) -> Dict[str, Dict[str, str]]:
+        """
+        시/도별 확정 시/군/구 (어느 시/도 사용자인지 모를 때, advance_onboarding 후보용)
+
+        Returns:
+            {ctpv_nm: {"sgg_nm", "region_code"}} - 해당 시/도 안에서 확정된 경우만
+        """
+        by_ctpv: Dict[str, List[Dict[str, Any]]] = {}
+        for result in self.resolve(text, limit=None):
+            by_ctpv.setdefault(result["ctpv_nm"], []).append(result)
+
+        candidates = {}
+        for ctpv_nm, results in by_ctpv.items():
+            best = results[0]
+            if best["score"] >= CONFIDENT_SCORE and (len(results) == 1 or results[1]["score"] < best["score"]):
+                candidates[ctpv_nm] = {"sgg_nm": best["sgg_nm"], "region_code": best["region_code"]}
+        return candidates
+
+
+_INDEX: Optional[RegionIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def load_region_index() -> RegionIndex:
+    """컨테이너당 한 번 인덱스 생성 (번들 행정구역 스냅샷 기준)"""
+    global _INDEX
+    if _INDEX is not None:
+        return _INDEX
+
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            snapshot = load_region_snapshot()
+            _INDEX = RegionIndex(snapshot)
+            logger.info(f"🗺️ Region index built: {len(_INDEX.entries)} sgg, {len(_INDEX._sorted_aliases)} aliases (version={_INDEX.version})")
+        return _INDEX
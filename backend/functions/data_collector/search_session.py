@@ -0,0 +1,290 @@
+"""
+유저별 검색 세션 (마지막 검색의 순위 결과 → "더보기" 페이지 이동)
+
+검색 1회에 최대 SEARCH_SESSION_MAX_RESULTS개를 순위대로 계산해 두고, 응답은 SEARCH_PAGE_SIZE개씩 보냅니다.
+"더보기" / "다른 혜택 알려줘" 같은 이동 발화는 임베딩 생성이나 벡터 검색 없이 다음 페이지를 꺼냅니다.
+
+저장 위치 (조회 순서):
+1. 컨테이너 LRU  - 결과 행 전체 (카드 조립에 바로 사용)
+2. search_sessions 테이블 (SEARCH_SESSION_TABLE_ENABLED, 기본 켜짐) - 다른 컨테이너로 간 요청용
+   순위 id + 출처 라벨만 저장하고 카드는 benefits에서 id로 다시 조회 (PK 조회 1회)
+   테이블을 쓰면 테이블 행이 기준 (다른 컨테이너에서 새로 검색했으면 컨테이너 세션은 버림)
+   테이블 쓰기는 응답 전에 동기로 실행 (Lambda는 응답 후 컨테이너를 멈추므로 백그라운드 쓰기는 늦거나 유실됨)
+   어느 세션이 최신인지는 DB가 매기는 session_seq로 판단 (컨테이너 시계는 비교하지 않음)
+
+세션은 SEARCH_SESSION_TTL_SECONDS(기본 1800초) 후 만료되고, 프로필(지역/생애주기/대상)이 바뀌면 무시합니다.
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from card_renderer import CAROUSEL_MAX_ITEMS
+except ImportError:
+    from .card_renderer import CAROUSEL_MAX_ITEMS
+
+logger = logging.getLogger(__name__)
+
+SESSION_TABLE = "search_sessions"
+SEARCH_PAGE_SIZE = min(int(os.getenv("SEARCH_PAGE_SIZE", "5")), CAROUSEL_MAX_ITEMS)  # carousel 한도 이내
+SEARCH_SESSION_MAX_RESULTS = int(os.getenv("SEARCH_SESSION_MAX_RESULTS", "30"))
+
+# 카드 렌더링에 필요한 benefits 컬럼 (card_renderer.render_card 입력 + 저장된 render_card)
+CARD_COLUMNS = "id, serv_nm, ctpv_nm, sgg_nm, trgter_indvdl_nm_array, life_nm_array, serv_dgst, enfc_end_ymd, serv_dtl_link, render_card"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def profile_key(user: Dict[str, Any]) -> str:
+    """세션이 유효한 프로필 (지역/생애주기/대상이 바뀌면 이전 결과는 무효)"""
+    life_cycle = ",".join(sorted(user.get("life_cycle") or []))
+    target_group = ",".join(sorted(user.get("target_group") or []))
+    return f"{user.get('ctpv_nm') or ''}|{user.get('sgg_nm') or ''}|{life_cycle}|{target_group}"
+
+
+class SearchSessionStore:
+    """kakao_user_id → 마지막 검색 세션 (컨테이너 LRU → search_sessions 테이블)"""
+
+    def __init__(
+        self,
+        supabase=None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        use_table: Optional[bool] = None,
+    ):
+        self.supabase = supabase
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("SEARCH_SESSION_TTL_SECONDS", "1800"))
+        self.max_entries = max_entries or int(os.getenv("SEARCH_SESSION_CACHE_SIZE", "1000"))
+        if use_table is None:
+            use_table = _env_flag("SEARCH_SESSION_TABLE_ENABLED", True)
+        self.use_table = use_table and supabase is not None
+
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"saved": 0, "local": 0, "table": 0, "miss": 0}
+
+    # ------------------------------------------------
+    # Public API
+    # ------------------------------------------------
+
+    def save(self, user_id: str, user: Dict[str, Any], query: str, results: List[Dict[str, Any]], auto_search: bool = False) -> Dict[str, Any]:
+        """
+        새 검색 결과로 세션 교체 (테이블 저장은 첫 페이지를 보낸 뒤 advance()에서)
+
+        Returns:
+            세션 dict {"session_id", "query", "profile_key", "ranked", "items", "offset", "auto_search", "expires_at"}
+        """
+        results = results[:SEARCH_SESSION_MAX_RESULTS]
+        session = {
+            "session_id": f"{time.time_ns():x}",
+            "query": query,
+            "profile_key": profile_key(user),
+            "ranked": [
+                {"id": item["id"], "source_type": item.get("source_type"), "similarity": item.get("similarity")}
+                for item in results
+            ],
+            "items": {item["id"]: item for item in results},
+            "offset": 0,
+            "auto_search": auto_search,
+            "expires_at": time.time() + self.ttl_seconds,
+            "persisted": False,
+            "seq": None,  # 테이블 저장 후 DB가 매긴 session_seq
+        }
+        self._put_local(user_id, session)
+        self.stats["saved"] += 1
+        return session
+
+    def get(self, user_id: str, user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """유효한 세션 조회 (만료/프로필 변경 시 None)"""
+        session = self._get_local(user_id)
+        if self.use_table and (session is None or session["persisted"]):
+            row = self._table_get(user_id)
+            if row is None:
+                pass  # 테이블 조회 실패/저장 전: 컨테이너 세션 사용
+            elif session is not None and row["session_id"] == session["session_id"]:
+                # 같은 세션: 카드는 컨테이너 것 재사용, offset은 더 앞선 쪽 (백그라운드 쓰기가 아직 안 끝났을 수 있음)
+                session["offset"] = max(session["offset"], row["offset"])
+            elif session is not None and session["seq"] is not None and row["seq"] < session["seq"]:
+                pass  # 테이블 조회가 이 컨테이너의 저장보다 뒤처짐 (이전 세션)
+            else:
+                session = row
+                self.stats["table"] += 1
+                self._put_local(user_id, session)
+            if session is not None and session is not row:
+                self.stats["local"] += 1
+        elif session is not None:
+            self.stats["local"] += 1
+
+        if session is None or session["profile_key"] != profile_key(user):
+            self.stats["miss"] += 1
+            return None
+        return session
+
+    def page(self, session: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        현재 offset부터 최대 SEARCH_PAGE_SIZE개 결과 행 (offset은 움직이지 않음)
+
+        컨테이너에 없는 행은 benefits에서 id로 조회 (임베딩/벡터 검색 없음),
+        비활성화/삭제된 혜택은 건너뜀
+
+        Returns:
+            (결과 행 목록 - 각 행에 1부터 시작하는 순위 "rank" 추가, 이 페이지를 다 보냈을 때의 다음 offset)
+        """
+        ranked = session["ranked"]
+        offset = session["offset"]
+        results: List[Dict[str, Any]] = []
+        while offset < len(ranked) and len(results) < SEARCH_PAGE_SIZE:
+            window = ranked[offset:offset + SEARCH_PAGE_SIZE - len(results)]
+            missing = [entry["id"] for entry in window if entry["id"] not in session["items"]]
+            if missing:
+                fetched = self._fetch_benefits(missing)
+                for benefit_id in missing:
+                    session["items"][benefit_id] = fetched.get(benefit_id)  # None = 더 이상 없는 혜택
+            for i, entry in enumerate(window):
+                item = session["items"].get(entry["id"])
+                if item is not None:
+                    results.append({**item, "source_type": entry.get("source_type"), "similarity": entry.get("similarity"), "rank": offset + i + 1})
+            offset += len(window)
+        return results, offset
+
+    def advance(self, user_id: str, session: Dict[str, Any], offset: int) -> None:
+        """
+        보낸 만큼 offset 이동 (테이블 반영은 응답 전에 동기로)
+
+        새 세션은 행 전체를 upsert하고 DB가 매긴 session_seq를 기록,
+        이후에는 같은 세션일 때만 next_offset 갱신 (다른 컨테이너가 덮어쓴 새 세션은 건드리지 않음)
+        """
+        session["offset"] = min(offset, len(session["ranked"]))
+        if not self.use_table:
+            return
+        if not session["persisted"]:
+            seq = self._table_upsert(self._table_row(user_id, session))
+            if seq is not None:
+                session["seq"] = seq
+                session["persisted"] = True  # 실패하면 다음 advance()에서 다시 upsert
+        else:
+            self._table_update_offset(user_id, session["session_id"], session["offset"])
+
+    @staticmethod
+    def remaining(session: Dict[str, Any]) -> int:
+        return max(0, len(session["ranked"]) - session["offset"])
+
+    # ------------------------------------------------
+    # Tier 1: 컨테이너 LRU
+    # ------------------------------------------------
+
+    def _get_local(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return None
+            if session["expires_at"] < time.time():
+                del self._sessions[user_id]
+                return None
+            self._sessions.move_to_end(user_id)
+            return session
+
+    def _put_local(self, user_id: str, session: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sessions[user_id] = session
+            self._sessions.move_to_end(user_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    # ------------------------------------------------
+    # Tier 2: search_sessions 테이블
+    # ------------------------------------------------
+
+    def _table_get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            res = self.supabase.table(SESSION_TABLE) \
+                .select("session_id, session_seq, query, profile_key, results, next_offset, auto_search, expires_at") \
+                .eq("kakao_user_id", user_id) \
+                .gt("expires_at", datetime.now(timezone.utc).isoformat()) \
+                .limit(1) \
+                .execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Search session read failed: {e}")
+            return None
+        if not res.data:
+            return None
+        row = res.data[0]
+        expires_at = datetime.fromisoformat(row["expires_at"].replace("Z", "+00:00")).timestamp()
+        return {
+            "session_id": row["session_id"],
+            "query": row["query"],
+            "profile_key": row["profile_key"],
+            "ranked": row["results"] or [],
+            "items": {},
+            "offset": row["next_offset"],
+            "auto_search": row["auto_search"],
+            "expires_at": expires_at,
+            "persisted": True,
+            "seq": row["session_seq"],
+        }
+
+    def _table_row(self, user_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "kakao_user_id": user_id,
+            "session_id": session["session_id"],
+            "query": session["query"],
+            "profile_key": session["profile_key"],
+            "results": session["ranked"],
+            "next_offset": session["offset"],
+            "auto_search": session["auto_search"],
+            "expires_at": datetime.fromtimestamp(session["expires_at"], timezone.utc).isoformat(),
+        }
+
+    def _table_upsert(self, row: Dict[str, Any]) -> Optional[int]:
+        """새 세션 저장 (Returns: DB가 매긴 session_seq, 실패 시 None)"""
+        try:
+            res = self.supabase.table(SESSION_TABLE).upsert(row).execute()
+            return res.data[0]["session_seq"] if res.data else None
+        except Exception as e:
+            logger.warning(f"⚠️ Search session write failed: {e}")
+            return None
+
+    def _table_update_offset(self, user_id: str, session_id: str, offset: int) -> None:
+        try:
+            self.supabase.table(SESSION_TABLE).update({"next_offset": offset}) \
+                .eq("kakao_user_id", user_id) \
+                .eq("session_id", session_id) \
+                .execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Search session write failed: {e}")
+
+    def _fetch_benefits(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        if self.supabase is None:
+            return {}
+        try:
+            res = self.supabase.table("benefits").select(CARD_COLUMNS) \
+                .in_("id", ids) \
+                .eq("is_active", True) \
+                .execute()
+            return {row["id"]: row for row in res.data}
+        except Exception as e:
+            logger.warning(f"⚠️ Search session card fetch failed: {e}")
+            return {}
+
+
+_STORE: Optional[SearchSessionStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_search_sessions(supabase=None) -> SearchSessionStore:
+    """컨테이너 공용 세션 저장소 (첫 호출의 supabase 클라이언트 사용)"""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = SearchSessionStore(supabase=supabase)
+    return _STORE
@@ -0,0 +1,169 @@
+"""
+프로필 세그먼트 단위 Whitelist 캐시
+
+get_eligible_benefits 결과는 (ctpv_nm, sgg_nm, life_cycle, target_group)에만 의존하므로
+세그먼트 키로 캐시합니다.
+
+- 1차: 프로세스 내 LRU
+- 2차: whitelist_cache 테이블 (선택, WHITELIST_CACHE_TABLE_ENABLED=true)
+
+무효화: data_versions 테이블의 'benefits' 워터마크.
+수집기/임베딩 스크립트가 실행 종료 시 bump_data_version('benefits')를 호출하면
+버전이 바뀐 캐시 항목은 자동으로 무시됩니다.
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSIONS_TABLE = "data_versions"
+WHITELIST_CACHE_TABLE = "whitelist_cache"
+BENEFITS_DATA_VERSION = "benefits"
+KST = timezone(timedelta(hours=9))
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def segment_key(ctpv_nm: Optional[str], sgg_nm: Optional[str], life_cycle: Optional[List[str]], target_group: Optional[List[str]]) -> str:
+    """
+    프로필 세그먼트 키 (배열은 정렬하여 순서 무관)
+
+    DB 함수 make_segment_key()와 동일한 형식이어야 합니다 (segment_eligibility 조회 키).
+    예: '서울특별시|종로구|노년|저소득층,장애인'
+    """
+    return "|".join([
+        ctpv_nm or "",
+        sgg_nm or "",
+        ",".join(sorted(life_cycle or [])),
+        ",".join(sorted(target_group or [])),
+    ])
+
+
+class DataVersionWatcher:
+    """data_versions 워터마크 조회 (TTL 동안 재조회하지 않음)"""
+
+    def __init__(self, supabase, name: str = BENEFITS_DATA_VERSION, ttl_seconds: Optional[float] = None):
+        self.supabase = supabase
+        self.name = name
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("DATA_VERSION_TTL_SECONDS", "60"))
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[int]:
+        """현재 데이터 버전 (조회 실패 시 마지막으로 알던 값, 없으면 None)"""
+        with self._lock:
+            if self._checked_at and time.time() - self._checked_at < self.ttl_seconds:
+                return self._version
+            try:
+                res = self.supabase.table(DATA_VERSIONS_TABLE).select("version").eq("name", self.name).limit(1).execute()
+                self._version = res.data[0]["version"] if res.data else 0
+            except Exception as e:
+                logger.warning(f"⚠️ Data version check failed ({self.name}): {e}")
+            self._checked_at = time.time()
+            return self._version
+
+
+class WhitelistCache:
+    """세그먼트 키 → get_eligible_benefits 결과 캐시"""
+
+    def __init__(
+        self,
+        supabase,
+        version_watcher: Optional[DataVersionWatcher] = None,
+        max_entries: Optional[int] = None,
+        use_table: Optional[bool] = None,
+        fallback_ttl_seconds: Optional[float] = None,
+    ):
+        self.supabase = supabase
+        self.version_watcher = version_watcher or DataVersionWatcher(supabase)
+        self.max_entries = max_entries or int(os.getenv("WHITELIST_CACHE_SIZE", "64"))
+        if use_table is None:
+            use_table = _env_flag("WHITELIST_CACHE_TABLE_ENABLED", False)
+        self.use_table = use_table
+        # 워터마크를 읽을 수 없을 때(테이블 미생성 등) 사용하는 보수적 TTL
+        self.fallback_ttl_seconds = fallback_ttl_seconds if fallback_ttl_seconds is not None else float(os.getenv("WHITELIST_CACHE_TTL_SECONDS", "600"))
+
+        # key -> (data_version, stored_at, items)
+        self._entries: "OrderedDict[str, Tuple[Optional[int], float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory": 0, "table": 0, "miss": 0}
+
+    @staticmethod
+    def _dated(key: str) -> str:
+        # Whitelist는 종료일(enfc_end_ymd >= current_date) 조건을 포함하므로 날짜가 바뀌면 무효
+        return f"{key}#{datetime.now(KST).date().isoformat()}"
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        key = self._dated(key)
+        version = self.version_watcher.current()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, stored_at, items = entry
+                if self._is_fresh(entry_version, stored_at, version):
+                    self._entries.move_to_end(key)
+                    self.stats["memory"] += 1
+                    return items
+                del self._entries[key]
+
+        items = self._table_get(key, version)
+        if items is not None:
+            self.stats["table"] += 1
+            self._memory_put(key, version, items)
+            return items
+
+        self.stats["miss"] += 1
+        return None
+
+    def put(self, key: str, items: List[Dict[str, Any]]) -> None:
+        key = self._dated(key)
+        version = self.version_watcher.current()
+        self._memory_put(key, version, items)
+        if self.use_table and version is not None:
+            threading.Thread(target=self._table_put, args=(key, version, items), daemon=True).start()
+
+    def _is_fresh(self, entry_version: Optional[int], stored_at: float, current_version: Optional[int]) -> bool:
+        if current_version is None:
+            return time.time() - stored_at < self.fallback_ttl_seconds
+        return entry_version == current_version
+
+    def _memory_put(self, key: str, version: Optional[int], items: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (version, time.time(), items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _table_get(self, key: str, version: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        if not self.use_table or version is None:
+            return None
+        try:
+            res = self.supabase.table(WHITELIST_CACHE_TABLE).select("items") \
+                .eq("segment_key", key).eq("data_version", version).limit(1).execute()
+            if res.data:
+                return res.data[0]["items"]
+        except Exception as e:
+            logger.warning(f"⚠️ Whitelist cache table read failed: {e}")
+        return None
+
+    def _table_put(self, key: str, version: int, items: List[Dict[str, Any]]) -> None:
+        try:
+            self.supabase.table(WHITELIST_CACHE_TABLE).upsert({
+                "segment_key": key,
+                "data_version": version,
+                "items": items,
+            }, on_conflict="segment_key").execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Whitelist cache table write failed: {e}")
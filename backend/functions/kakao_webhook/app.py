@@ -1,19 +1,27 @@
 import json
 import os
+import re
 import sys
-from datetime import datetime
+import time
+import threading
+import contextvars
 
 # Python 3.11 업데이트 - 2026-01-31
 # OpenAI text-embedding-3-small 전환 완료 + 상세 로그 (지역/생애주기/대상) - 2026-02-01 v29
 # common 모듈 파일들이 같은 디렉토리에 있음
 
-# 전역 변수로 클라이언트 재사용 (Cold Start 최적화)
-_supabase_client = None
-_rag_service = None
+# 클라이언트는 ContainerResources가 컨테이너 단위로 재사용 (Cold Start 최적화)
 
 try:
-    from supabase_client import SupabaseClient
     from rag_service import RAGService
+    from resources import ContainerResources
+    from card_renderer import get_render_card, CAROUSEL_MAX_ITEMS, SIMPLE_TEXT_MAX
+    from region_snapshot import load_region_snapshot
+    from region_index import load_region_index
+    from write_behind import write_behind_enabled, get_write_queue, get_profile_cache
+    from idempotency import idempotency_enabled, webhook_request_key, get_idempotency_guard
+    from search_session import get_search_sessions, SEARCH_SESSION_MAX_RESULTS
+    from tracing import start_trace, finish_trace, span, set_dimension, set_property, debug_enabled
 except ImportError as e:
     print(f"❌ Import Error: {e}")
     print(f"📂 sys.path: {sys.path}")
@@ -26,6 +34,66 @@ except ImportError as e:
         pass
     raise ImportError(f"Failed to import common modules: {e}")
 
+# ----------------------------------------------------
+# 고정 발화 (자동 검색 + Quick Reply 버튼)
+# scripts/embeddings/seed_query_cache.py가 배포 시 임베딩 캐시에 미리 적재
+# ----------------------------------------------------
+
+AUTO_SEARCH_QUERY = "맞춤 혜택 추천"
+
+COMMAND_UTTERANCES = ['시작하기', '안녕', '처음으로', '리셋']
+
+# 온보딩 완료 후: 예시 질문 버튼
+ONBOARDING_DONE_QUICK_REPLIES = [
+    {"label": "청년 일자리 지원", "action": "message", "messageText": "청년 일자리 지원금 알려줘"},
+    {"label": "육아 지원", "action": "message", "messageText": "육아 지원 혜택 있어?"},
+    {"label": "주거비 지원", "action": "message", "messageText": "주거비 지원 받을 수 있을까?"},
+    {"label": "처음으로", "action": "message", "messageText": "처음으로"}
+]
+
+# 일반 질문 후: 간단한 액션 버튼
+SEARCH_QUICK_REPLIES = [
+    {"label": "다른 혜택 찾기", "action": "message", "messageText": "다른 혜택 알려줘"},
+    {"label": "처음으로", "action": "message", "messageText": "처음으로"}
+]
+
+# 검색 결과 페이지 이동 발화 (마지막 검색 세션의 다음 페이지, 새로 검색하지 않음)
+MORE_UTTERANCE = "더보기"
+NAVIGATION_UTTERANCES = [MORE_UTTERANCE, '다른 혜택 알려줘', '다른 혜택', '다음', '다음 페이지']
+
+
+# 검색 결과 응답 형식: carousel(기본) | text(simpleText fallback), 페이지당 SEARCH_PAGE_SIZE개 (기본 5)
+SEARCH_RESPONSE_FORMAT = os.getenv("SEARCH_RESPONSE_FORMAT", "carousel").lower()
+
+# 콜백(비동기 스킬) 모드: 블록에 콜백이 켜져 있으면 userRequest.callbackUrl이 옴
+#   off(기본) - 사용 안 함
+#   auto      - 예상 검색 시간이 SEARCH_LATENCY_BUDGET_MS를 넘을 때만 콜백
+#   always    - callbackUrl이 있으면 항상 콜백
+# ⚠️ Lambda에서 켜려면 함수 역할에 자기 자신에 대한 lambda:InvokeFunction 권한 필요 (README 콜백 모드 참고)
+KAKAO_CALLBACK_MODE = os.getenv("KAKAO_CALLBACK_MODE", "off").lower()
+SEARCH_LATENCY_BUDGET_MS = float(os.getenv("SEARCH_LATENCY_BUDGET_MS", "3500"))
+# 이 컨테이너에서 잰 검색 시간이 없을 때의 예상치 (임베딩 생성 포함) - 예산 안이면 동기로 검색해 측정값을 쌓음
+SEARCH_LATENCY_PRIOR_MS = float(os.getenv("SEARCH_LATENCY_PRIOR_MS", "2500"))
+CALLBACK_ACK_TEXT = "맞춤 혜택을 찾고 있어요. 잠시만 기다려주세요! 🔍"
+
+# 같은 요청이 재전송됐는데 원 요청이 아직 처리 중일 때
+DUPLICATE_IN_PROGRESS_TEXT = "이전 메시지를 처리하고 있어요. 잠시 후 다시 시도해주세요. 🙏"
+
+# 이번 요청이 오류 응답으로 끝났는지 (오류 응답은 재사용하지 않고 재전송 시 다시 처리)
+_error_response = contextvars.ContextVar("kakao_error_response", default=False)
+# 이번 요청이 useCallback 응답으로 끝났는지 (재전송은 새 callbackUrl을 가져오므로 응답을 재사용하지 않음)
+_callback_ack = contextvars.ContextVar("kakao_callback_ack", default=False)
+
+
+def get_preset_search_queries():
+    """웹훅이 스스로 만들어내는 검색 발화 목록 (임베딩 사전 적재용)"""
+    queries = [AUTO_SEARCH_QUERY]
+    for reply in ONBOARDING_DONE_QUICK_REPLIES + SEARCH_QUICK_REPLIES:
+        text = reply["messageText"]
+        if text not in COMMAND_UTTERANCES and text not in queries:
+            queries.append(text)
+    return queries
+
 # ----------------------------------------------------
 # Main Handler with DB-State Logic
 # ----------------------------------------------------
@@ -34,13 +102,78 @@ def lambda_handler(event, context):
     """
     KakaoTalk Chatbot Webhook Handler (Stateless -> DB Stateful)
     """
-    global _supabase_client, _rag_service
+    is_cold_start = ContainerResources.mark_invocation()
     
-    # Warming 요청 처리 (Cold Start 방지용)
+    # Warming 요청 처리 (Cold Start 방지용): 커넥션/캐시 실제 예열 + 소요시간 측정
     if event.get('warming'):
-        return {'statusCode': 200, 'body': json.dumps({'status': 'warmed'})}
+        prewarm = ContainerResources.prewarm(get_preset_search_queries())
+        prewarm['cold_start'] = is_cold_start
+        if write_behind_enabled():
+            # 멈춰 있던 컨테이너의 밀린 쓰기를 비움
+            prewarm['write_behind'] = {'flushed': get_write_queue().flush(timeout=10), **get_write_queue().stats}
+        embedding_cache = getattr(ContainerResources.get_rag_service(), 'embedding_cache', None)
+        if embedding_cache is not None:
+            # 응답 전 대기 시간을 넘긴 임베딩 캐시 테이블 쓰기 마무리
+            prewarm['embedding_cache_writes'] = embedding_cache.flush(timeout=5)
+        print(f"🔥 Prewarm: {json.dumps(prewarm, ensure_ascii=False)}")
+        return {'statusCode': 200, 'body': json.dumps({'status': 'warmed', **prewarm}, ensure_ascii=False)}
+    
+    if is_cold_start:
+        print("🧊 Cold start invocation")
+    
+    # 단계별 소요시간 측정 → 종료 시 EMF 메트릭 한 줄 출력 (tracing.py)
+    trace = start_trace("kakao_webhook", cold_start=is_cold_start)
+    try:
+        # 콜백 모드 백그라운드 호출 (dispatch_callback_search가 자기 자신을 Event 호출)
+        if event.get('callback_search'):
+            set_dimension("Path", "callback")
+            return run_callback_search(event['callback_search'])
+        return handle_deduplicated(event)
+    finally:
+        finish_trace(trace)
+
+
+def handle_deduplicated(event):
+    """카카오 재전송(같은 유저/발화/블록) 억제: 처리 결과를 재사용 (idempotency.py)"""
+    # "더보기" 연타는 재전송이 아니라 다음 페이지 요청 (재전송이면 한 페이지 건너뛰는 정도)
+    # "처음으로"/"리셋" 등 명령어도 매번 처리 (초기화는 여러 번 적용해도 결과가 같음)
+    key = webhook_request_key(event, repeatable=NAVIGATION_UTTERANCES + COMMAND_UTTERANCES) if idempotency_enabled() else None
+    if key is None:
+        return handle_kakao_event(event)
     
-    print(f"Event: {json.dumps(event, ensure_ascii=False)}")
+    guard = get_idempotency_guard(ContainerResources.get_supabase())
+    with span("idempotency"):
+        claim = guard.begin(key)
+    if claim['status'] != 'new':
+        set_dimension("Path", "duplicate")
+        set_property("duplicate", claim['status'])
+        print(f"♻️ Duplicate delivery ({claim['status']}) - skipping reprocessing")
+        if claim['status'] == 'duplicate':
+            return claim['response']
+        return api_response(simple_text_response(DUPLICATE_IN_PROGRESS_TEXT))
+    
+    _error_response.set(False)
+    _callback_ack.set(False)
+    try:
+        response = handle_kakao_event(event)
+    except Exception:
+        guard.abandon(key)
+        raise
+    with span("idempotency"):
+        if _error_response.get() or _callback_ack.get():
+            # 오류 / useCallback 응답은 저장하지 않음: 재전송은 새로 처리 (useCallback이면 새 callbackUrl로 결과 전송)
+            guard.abandon(key)
+        else:
+            # 응답 전에 기록 (멈춘 컨테이너에 맡기면 행이 TTL까지 "처리 중"으로 남음)
+            guard.complete(key, response)
+    return response
+
+
+def handle_kakao_event(event):
+    """카카오 스킬 요청 1건 처리 (유저 조회 → 명령어/온보딩/검색 분기)"""
+    # 이벤트 전체 덤프는 TRACE_DEBUG일 때만 (요청마다 수 KB 로그)
+    if debug_enabled():
+        print(f"Event: {json.dumps(event, ensure_ascii=False)}")
     
     try:
         body = json.loads(event.get('body', '{}')) if event.get('body') else {}
@@ -50,159 +183,82 @@ def lambda_handler(event, context):
     user_request = body.get('userRequest', {})
     user_id = user_request.get('user', {}).get('id')
     utterance = user_request.get('utterance', '').strip()
+    callback_url = user_request.get('callbackUrl')
     
     if not user_id:
         return api_response(simple_text_response("유저 정보를 찾을 수 없습니다."))
 
-    # 1. Fetch User State from DB
-    supabase = SupabaseClient.get_client()
-    user = None
+    # 1. 온보딩 상태 전이 (유저 조회 + 생성/초기화 + 입력 저장 + 지역코드 조회 = RPC 1회)
+    print(f"💬 Utterance: '{utterance}'")
+    supabase = ContainerResources.get_supabase()
     try:
-        res = supabase.table('users').select('*').eq('kakao_user_id', user_id).execute()
-        if res.data:
-            user = res.data[0]
+        result = advance_onboarding(supabase, user_id, utterance)
     except Exception as e:
-        print(f"DB Fetch Error: {e}")
-
-    # 2. Handle Special Commands
-    print(f"💬 Utterance: '{utterance}'")
-    print(f"👤 User exists: {user is not None}")
+        print(f"❌ advance_onboarding Error: {e}")
+        _error_response.set(True)
+        return api_response(simple_text_response("일시적인 오류가 발생했습니다. 잠시 후 다시 시도해주세요."))
     
-    # "시작하기" / "안녕" - 신규 가입자용
-    if utterance in ['시작하기', '안녕']:
-        if not user:
-            # 신규 회원: 온보딩 시작
-            create_initial_user(supabase, user_id)
-            return api_response(response_select_city())
-        else:
-            # 기존 회원: 이미 가입됨 안내
-            return api_response(simple_text_response(
-                "이미 가입하셨습니다! 😊\n\n"
-                "정보를 다시 입력하려면 '처음으로'를 입력하세요."
-            ))
-    
-    # "처음으로" / "리셋" - 정보 재입력 (디버깅용)
-    if utterance in ['처음으로', '리셋']:
-        if user:
-            # 기존 회원: 정보 초기화 후 온보딩 재시작
-            reset_user_state(supabase, user_id)
-        else:
-            # 신규 회원: 온보딩 시작
-            create_initial_user(supabase, user_id)
-        return api_response(response_select_city())
+    status = result['status']
+    step = result.get('step')
+    user = result['user']
+    print(f"👤 Onboarding: status={status}, applied={result.get('applied')}, step={step}")
     
-    # 신규 회원 (특수 명령어 없이 메시지 입력)
-    if not user:
-        create_initial_user(supabase, user_id)
+    # 2. Handle Special Commands
+    # "시작하기"/"안녕"/"처음으로"/"리셋" 또는 신규 회원 → 온보딩 시작
+    if status in ('created', 'reset'):
+        set_dimension("Path", "command")
         return api_response(response_select_city())
-
-    # 3. State Machine Logic
-    # We check what is missing in the User Profile in order: City -> SGG -> Birth -> Gender
     
-    # State: Wait for City
-    if not user.get('ctpv_nm'):
-        # Check if utterance is a valid City
-        if is_valid_city(utterance):
-            # Update City, Ask SGG
-            update_user_field(supabase, user_id, {'ctpv_nm': utterance})
-            return api_response(response_select_sgg(utterance))
-        else:
-            return api_response(response_select_city(fail_msg=True))
-            
-    # State: Wait for SGG
-    if not user.get('sgg_nm'):
-        # Check if utterance is valid SGG (simple check or trust user)
-        # Note: 'utterance' is what user typed or clicked.
-        # Ideally we check against DB regions, but for MVP we trust if length > 0
-        if utterance and len(utterance) > 1:
-             # Update SGG, Ask Birth Range
-            update_user_field(supabase, user_id, {'sgg_nm': utterance})
-            return api_response(response_select_birth_range(user['ctpv_nm'], utterance))
-        else:
-            return api_response(response_select_sgg(user['ctpv_nm'], fail_msg=True))
-            
-    # State: Wait for Birth Year (Range or Direct)
-    curr_birth_year = user.get('birth_year')
-    if not curr_birth_year or curr_birth_year == 0:
-        clean_text = utterance.replace(' ', '')
-        
-        # 1. Check if it's a Range Selection (e.g. "1950년대", "1930년대이전")
-        if any(x in clean_text for x in ['년대', '이전', '이후']):
-            # Extract the decade
-            # "1950년대" -> 1950
-            # "1930년대이전" -> 1930
-            # Find the first 4 digit number
-            import re
-            match = re.search(r'\d{4}', clean_text)
-            if match:
-                start_year_str = match.group()
-                return api_response(response_select_birth_year(user['ctpv_nm'], user['sgg_nm'], start_year_str))
-        
-        # 2. Check if it's a Specific Year (e.g. "1953년", "1953")
-        # Extract digits
-        val = ''.join(filter(str.isdigit, clean_text))
-        if len(val) == 4:
-            year = int(val)
-            # Valid range check 1900~2030
-            if 1900 <= year <= 2030:
-                 update_user_field(supabase, user_id, {'birth_year': year})
-                 return api_response(response_select_gender(user['ctpv_nm'], user['sgg_nm'], year))
-                 
-        # 3. Fallback: Show Range Selection again
-        return api_response(response_select_birth_range(user['ctpv_nm'], user['sgg_nm']))
-
-    # State: Wait for Gender
-    if not user.get('gender'):
-        if '남' in utterance:
-            gender = 'M'
-        elif '여' in utterance:
-            gender = 'F'
-        else:
-            gender = None
-            
-        if gender:
-            # Save gender and move to target_group selection
-            update_user_field(supabase, user_id, {'gender': gender})
-            return api_response(response_select_target_group(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
-        else:
-            return api_response(response_select_gender(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
+    if status == 'exists':
+        set_dimension("Path", "command")
+        return api_response(simple_text_response(
+            "이미 가입하셨습니다! 😊\n\n"
+            "정보를 다시 입력하려면 '처음으로'를 입력하세요."
+        ))
     
-    # State: Wait for Target Group (대상 특성)
-    if user.get('target_group') is None:
-        # Parse target_group from utterance
-        target_group = parse_target_group(utterance)
-        
-        if target_group is not None:  # 선택 완료 (빈 배열 포함)
-            # Calculate life_cycle from birth_year
-            life_cycle = RAGService.convert_birth_year_to_life_cycle(user['birth_year'])
-            
-            # Complete onboarding!
-            update_user_field(supabase, user_id, {
-                'target_group': target_group,
-                'life_cycle': life_cycle,
-                'is_active': True,
-                'region_code': resolve_region_code(supabase, user['ctpv_nm'], user['sgg_nm'])
-            })
-            
-            # 온보딩 완료 메시지 + 자동 검색 🎉
-            user['target_group'] = target_group
-            user['life_cycle'] = life_cycle
-            user['is_active'] = True
-            
-            completion_msg = f"🎉 등록이 완료되었습니다!\n\n" \
-                           f"📍 지역: {user['ctpv_nm']} {user['sgg_nm']}\n" \
-                           f"🎂 출생: {user['birth_year']}년 ({', '.join(life_cycle)})\n" \
-                           f"👤 성별: {'남성' if user['gender']=='M' else '여성'}\n" \
-                           f"🎯 대상: {', '.join(target_group) if target_group else '일반'}\n\n" \
-                           f"회원님께 맞는 혜택을 찾고 있습니다... 🔍"
-            
-            # 자동 검색 실행
-            return handle_search_query(supabase, user, "맞춤 혜택 추천", auto_search=True)
-        else:
-            return api_response(response_select_target_group(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
-
     # Onboarding Complete - Handle User Query
-    return handle_search_query(supabase, user, utterance)
+    if status == 'complete':
+        set_dimension("Path", "search")
+        if is_navigation_utterance(utterance):
+            return handle_next_page(supabase, user, utterance, callback_url=callback_url)
+        return handle_search_query(supabase, user, utterance, callback_url=callback_url)
+    
+    # 3. State Machine Logic (City -> SGG -> Birth -> Gender -> Target Group)
+    set_dimension("Path", "onboarding")
+    
+    if status == 'advanced':
+        # 저장 완료 → 다음 단계 질문
+        if step == 'sgg_nm':
+            return api_response(response_select_sgg(user['ctpv_nm']))
+        if step == 'birth_year':
+            return api_response(response_select_birth_range(user['ctpv_nm'], user['sgg_nm']))
+        if step == 'gender':
+            return api_response(response_select_gender(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
+        if step == 'target_group':
+            return api_response(response_select_target_group(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
+        
+        # 온보딩 완료 (생애주기/지역코드는 RPC가 계산) → 자동 검색 🎉
+        print(f"🎉 Onboarding complete: {user['ctpv_nm']} {user['sgg_nm']} | life={user.get('life_cycle')} | target={user.get('target_group')}")
+        return handle_search_query(supabase, user, AUTO_SEARCH_QUERY, auto_search=True, callback_url=callback_url)
+    
+    # status == 'invalid': 현재 단계 다시 질문
+    if step == 'ctpv_nm':
+        return api_response(response_select_city(fail_msg=True))
+    if step == 'sgg_nm':
+        # 애매한 입력 ('성남' → 성남시/수정구/분당구...) 또는 오타 → 후보를 버튼으로
+        suggestions = load_region_index().resolve(utterance, ctpv_nm=user['ctpv_nm'])
+        if suggestions:
+            return api_response(response_suggest_sgg(user['ctpv_nm'], suggestions))
+        return api_response(response_select_sgg(user['ctpv_nm'], fail_msg=True))
+    if step == 'birth_year':
+        # 연대 선택 (e.g. "1950년대", "1930년대 이전") → 연도 선택
+        start_year_str = parse_birth_decade(utterance)
+        if start_year_str:
+            return api_response(response_select_birth_year(user['ctpv_nm'], user['sgg_nm'], start_year_str))
+        return api_response(response_select_birth_range(user['ctpv_nm'], user['sgg_nm']))
+    if step == 'gender':
+        return api_response(response_select_gender(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
+    return api_response(response_select_target_group(user['ctpv_nm'], user['sgg_nm'], user['birth_year']))
 
 
 def api_response(response_data):
@@ -216,79 +272,208 @@ def api_response(response_data):
 # DB Helpers
 # ----------------------------------------------------
 
-def create_initial_user(supabase, user_id):
-    default_region_code = get_default_region_code(supabase)
-    supabase.table('users').upsert({
-        'kakao_user_id': user_id,
-        'ctpv_nm': '', 
-        'sgg_nm': '', 
-        'birth_year': 0, 
-        'gender': '', 
-        'target_group': None,  # None = not set yet
-        'life_cycle': None,    # Will be calculated from birth_year
-        'region_code': default_region_code,
-        'region_depth': 2,  # Default: 시군구 레벨
-        'is_active': False
+ONBOARDING_STEPS = ['ctpv_nm', 'sgg_nm', 'birth_year', 'gender', 'target_group']
+
+def advance_onboarding(supabase, user_id, utterance):
+    """
+    온보딩 1턴 처리 (advance_onboarding RPC 1회)
+    
+    발화를 단계별 후보 값으로 미리 해석해서 넘기면, DB가 현재 단계에 맞는 후보만 검증/저장하고
+    갱신된 프로필을 반환합니다.
+    WRITE_BEHIND_ENABLED=true이고 프로필이 캐시되어 있으면 상태 전이를 로컬에서 계산하고
+    RPC는 쓰기 큐에 넣습니다 (응답 경로에 DB 호출 없음).
+    
+    Returns:
+        {"status", "step", "applied", "user"} (supabase/schema.sql 참고)
+    """
+    if utterance in ['시작하기', '안녕']:
+        command = 'start'
+    elif utterance in ['처음으로', '리셋']:
+        command = 'reset'
+    else:
+        command = None
+    candidates = parse_onboarding_candidates(utterance) if command is None else {}
+    
+    if write_behind_enabled():
+        profiles = get_profile_cache()
+        cached = profiles.get(user_id)
+        if cached is not None:
+            set_property("profile_cache_hit", True)
+            result = transition_locally(cached, command, candidates)
+            if result['status'] in ('advanced', 'reset'):
+                profiles.put(user_id, result['user'])
+                enqueue_onboarding_write(supabase, user_id, command, candidates, expected_step=result.get('applied'))
+            return result
+        
+        # 캐시가 없으면 DB가 최신이 되도록 이 유저의 밀린 쓰기부터 반영
+        if get_write_queue().pending(user_id):
+            get_write_queue().flush(timeout=3)
+    
+    with span("state_transition"):
+        result = call_advance_onboarding(supabase, user_id, command, candidates)
+    if write_behind_enabled():
+        get_profile_cache().put(user_id, result['user'])
+    return result
+
+def call_advance_onboarding(supabase, user_id, command, candidates, expected_step=None):
+    res = supabase.rpc('advance_onboarding', {
+        'p_kakao_user_id': user_id,
+        'p_command': command,
+        'p_candidates': candidates,
+        'p_expected_step': expected_step
     }).execute()
+    return res.data
 
-def update_user_field(supabase, user_id, data):
-    data['updated_at'] = datetime.now().isoformat()
-    supabase.table('users').update(data).eq('kakao_user_id', user_id).execute()
-
-def reset_user_state(supabase, user_id):
-    default_region_code = get_default_region_code(supabase)
-    supabase.table('users').update({
-        'ctpv_nm': '', 
-        'sgg_nm': '', 
-        'birth_year': 0, 
-        'gender': '', 
-        'target_group': None,
-        'life_cycle': None,
-        'region_code': default_region_code,
-        'region_depth': 2,  # Default: 시군구 레벨
-        'is_active': False
-    }).eq('kakao_user_id', user_id).execute()
-
-def get_default_region_code(supabase):
-    try:
-        # Fetch any valid region code (e.g., limit 1)
-        res = supabase.table('regions').select('region_code').limit(1).execute()
-        if res.data:
-            return res.data[0]['region_code']
-    except:
-        pass
-    return "1100000000" # Fallback to Seoul if query fails (hoping it exists)
+def enqueue_onboarding_write(supabase, user_id, command, candidates, expected_step=None):
+    """로컬에서 계산한 전이를 DB에 반영 (유저별 순서 보장, 실패/충돌 시 프로필 캐시 폐기)"""
+    queue = get_write_queue()
+    profiles = get_profile_cache()
+    
+    def on_success(result):
+        if result['status'] == 'conflict':
+            print(f"⚠️ Write-behind conflict ({user_id}): expected={expected_step}, actual={result.get('step')}")
+            profiles.invalidate(user_id)
+        elif queue.pending(user_id) <= 1:
+            # 뒤에 밀린 쓰기가 없을 때만 DB 값으로 캐시 갱신 (지역코드 등)
+            profiles.put(user_id, result['user'])
+    
+    queue.submit(
+        user_id,
+        lambda: call_advance_onboarding(supabase, user_id, command, candidates, expected_step),
+        on_success=on_success,
+        on_failure=lambda e: profiles.invalidate(user_id)
+    )
+    set_property("write_behind", True)
+
+def onboarding_step(user):
+    """처음으로 비어 있는 온보딩 항목 (완료면 None) - advance_onboarding RPC와 같은 순서"""
+    if not user.get('ctpv_nm'):
+        return 'ctpv_nm'
+    if not user.get('sgg_nm'):
+        return 'sgg_nm'
+    if not user.get('birth_year'):
+        return 'birth_year'
+    if not user.get('gender'):
+        return 'gender'
+    if user.get('target_group') is None:
+        return 'target_group'
+    return None
 
-def resolve_region_code(supabase, city, sgg):
-    try:
-        # Simple lookup fallback
-        res = supabase.table('regions').select('region_code').eq('name', f"{city} {sgg}").execute()
-        if res.data:
-            return res.data[0]['region_code']
-    except:
-        pass
-    return "0000000000"
+def transition_locally(user, command, candidates):
+    """캐시된 프로필로 advance_onboarding RPC와 같은 상태 전이를 계산 (DB 쓰기 없음)"""
+    if command == 'reset':
+        user = dict(user, ctpv_nm='', sgg_nm='', birth_year=0, gender='', target_group=None, life_cycle=None, is_active=False)
+        return {'status': 'reset', 'step': 'ctpv_nm', 'applied': None, 'user': user}
+    if command == 'start':
+        return {'status': 'exists', 'step': None, 'applied': None, 'user': user}
+    
+    step = onboarding_step(user)
+    if step is None:
+        return {'status': 'complete', 'step': None, 'applied': None, 'user': user}
+    
+    invalid = {'status': 'invalid', 'step': step, 'applied': None, 'user': user}
+    value = candidates.get(step)
+    if value is None:
+        return invalid
+    
+    user = dict(user)
+    if step == 'sgg_nm' and isinstance(value, dict):
+        region = value.get(user['ctpv_nm'])
+        if not region:
+            return invalid
+        user['sgg_nm'] = region['sgg_nm']
+        user['region_code'] = region.get('region_code') or user.get('region_code')
+    elif step == 'birth_year':
+        if not 1900 <= value <= 2030:
+            return invalid
+        user['birth_year'] = value
+    elif step == 'gender':
+        if value not in ('M', 'F'):
+            return invalid
+        user['gender'] = value
+    elif step == 'target_group':
+        user['target_group'] = value
+        user['life_cycle'] = RAGService.convert_birth_year_to_life_cycle(user['birth_year'])
+        user['is_active'] = True
+    else:
+        user[step] = value
+    
+    next_index = ONBOARDING_STEPS.index(step) + 1
+    return {
+        'status': 'advanced',
+        'step': ONBOARDING_STEPS[next_index] if next_index < len(ONBOARDING_STEPS) else None,
+        'applied': step,
+        'user': user
+    }
 
-def is_valid_city(text):
-    cities = ["서울특별시", "경기도", "부산광역시", "인천광역시", "대구광역시", "경상남도", "경상북도", "전라남도", "전라북도", "충청남도", "충청북도", "광주광역시", "강원특별자치도", "대전광역시", "울산광역시", "세종특별자치시", "제주특별자치도"]
-    return any(c in text for c in cities)
+def parse_onboarding_candidates(utterance):
+    """
+    발화를 온보딩 각 단계의 값으로 해석 (해석 불가한 단계는 생략)
+    현재 어느 단계인지는 DB만 알기 때문에 모든 단계를 한 번에 해석합니다.
+    """
+    candidates = {}
+    
+    # City: '서울', '충북', '경기도' 등 약칭/전체 이름
+    city = load_region_index().find_sido(utterance)
+    if city:
+        candidates['ctpv_nm'] = city
+    
+    # SGG: 스냅샷에 있으면 시/도별로 확정된 (이름, 지역코드) 후보 ('분당' → 성남시 분당구),
+    # 스냅샷이 없으면 2글자 이상 입력을 신뢰
+    if load_region_snapshot().has_sgg:
+        sgg_candidates = load_region_index().sgg_candidates(utterance)
+        if sgg_candidates:
+            candidates['sgg_nm'] = sgg_candidates
+    elif utterance and len(utterance) > 1:
+        candidates['sgg_nm'] = utterance
+    
+    # Birth Year: 연대 선택("1950년대")은 연도 선택 화면으로 넘어가야 하므로 제외
+    if not parse_birth_decade(utterance):
+        val = ''.join(filter(str.isdigit, utterance))
+        if len(val) == 4 and 1900 <= int(val) <= 2030:
+            candidates['birth_year'] = int(val)
+    
+    if '남' in utterance:
+        candidates['gender'] = 'M'
+    elif '여' in utterance:
+        candidates['gender'] = 'F'
+    
+    target_group = parse_target_group(utterance)
+    if target_group is not None:  # 선택 완료 (빈 배열 포함)
+        candidates['target_group'] = target_group
+    
+    return candidates
+
+def parse_birth_decade(utterance):
+    """연대 선택 발화("1950년대", "1930년대 이전")에서 시작 연도 문자열 추출"""
+    clean_text = utterance.replace(' ', '')
+    if any(x in clean_text for x in ['년대', '이전', '이후']):
+        match = re.search(r'\d{4}', clean_text)
+        if match:
+            return match.group()
+    return None
 
 # ----------------------------------------------------
 # Response Builders (Updated to 'message' action)
 # ----------------------------------------------------
 
 def response_select_city(fail_msg=False):
-    cities = ["서울특별시", "경기도", "부산광역시", "인천광역시", "대구광역시", "경상남도", "경상북도", "전라남도", "전라북도", "충청남도", "충청북도", "광주광역시", "강원특별자치도"] 
+    cities = load_region_snapshot().city_names()
     quick_replies = [{"label": c, "action": "message", "messageText": c} for c in cities]
     msg = "거주하시는 **지역(시/도)**을 선택해주세요." if not fail_msg else "정확한 지역(시/도)을 목록에서 선택해주세요."
     return build_response(msg, quick_replies)
 
 def response_select_sgg(city, fail_msg=False):
-    sgg_list = get_sgg_list_from_db(city)
+    # 번들 스냅샷에서 조회 (스냅샷이 없을 때만 DB)
+    sgg_list = load_region_snapshot().sgg_names(city) or get_sgg_list_from_db(city)
     quick_replies = [{"label": s, "action": "message", "messageText": s} for s in sgg_list[:25]]
     msg = f"**{city}**의 어느 구/군에 사시나요?" if not fail_msg else "목록에 있는 구/군을 선택해주세요."
     return build_response(msg, quick_replies)
 
+def response_suggest_sgg(city, suggestions):
+    quick_replies = [{"label": s['sgg_nm'], "action": "message", "messageText": s['sgg_nm']} for s in suggestions]
+    return build_response(f"**{city}**의 어느 지역인지 아래에서 선택해주세요.", quick_replies)
+
 def response_select_birth_range(city, sgg):
     ranges = ["1930년대 이전", "1940년대", "1950년대", "1960년대", "1970년대 이후"]
     quick_replies = [{"label": r, "action": "message", "messageText": r} for r in ranges]
@@ -337,7 +522,7 @@ def response_select_target_group(city, sgg, birth_year):
 def get_sgg_list_from_db(ctpv_nm):
     """Fetch distinct SGG names for a CTPV from regions table"""
     try:
-        supabase = SupabaseClient.get_client()
+        supabase = ContainerResources.get_supabase()
         # Assuming db structure: regions table has sgg_nm where ctpv_nm matches.
         # Actually regions table has 'name'. We might need to query 'regions' where 'parent_code' matches the ctpv code.
         # But 'regions' table stores full name in 'name'.
@@ -353,7 +538,8 @@ def get_sgg_list_from_db(ctpv_nm):
         # Actually, let's just query `regions` where name like '{ctpv_nm}%' and depth=2?
         # Regions table: name='서울특별시 종로구'.
         
-        res = supabase.table('regions').select('name').ilike('name', f"{ctpv_nm}%").eq('depth', 2).execute()
+        with span("region_lookup"):
+            res = supabase.table('regions').select('name').ilike('name', f"{ctpv_nm}%").eq('depth', 2).execute()
         if res.data:
             # Extract SGG part. "서울특별시 종로구" -> "종로구"
             return [r['name'].replace(f"{ctpv_nm} ", "") for r in res.data]
@@ -377,6 +563,68 @@ def build_response(text, quick_replies):
         }
     }
 
+def result_header(results, total=None):
+    """'🎯 찾은 혜택: N개' (여러 페이지면 전체 개수 중 몇 번째인지)"""
+    if not results or total is None or total <= len(results):
+        return f"🎯 찾은 혜택: {len(results)}개"
+    first = results[0].get('rank', 1)
+    last = results[-1].get('rank', first + len(results) - 1)
+    return f"🎯 찾은 혜택: {total}개 중 {first}~{last}번째"
+
+def build_carousel_response(results, closing_text, quick_replies, total=None):
+    """검색 결과 → 안내 문구 + textCard carousel (카드는 render_card 재사용)"""
+    results = results[:CAROUSEL_MAX_ITEMS]
+    items = [get_render_card(benefit)["card"] for benefit in results]
+    return {
+        "version": "2.0",
+        "template": {
+            "outputs": [
+                {
+                    "simpleText": {
+                        "text": f"{result_header(results, total)}\n\n{closing_text}"
+                    }
+                },
+                {
+                    "carousel": {
+                        "type": "textCard",
+                        "items": items
+                    }
+                }
+            ],
+            "quickReplies": quick_replies
+        }
+    }
+
+def build_result_text(results, closing_text, total=None):
+    """
+    검색 결과 → simpleText (render_card의 텍스트 조각을 글자 수 한도 안에서 이어붙임)
+    
+    Returns:
+        (텍스트, 실제로 담은 결과 수)
+    """
+    footer = f"\n{closing_text}"
+    blocks = []
+    length = 0
+    for idx, benefit in enumerate(results, 1):
+        source_type = benefit.get('source_type', 'UNKNOWN')
+        similarity = benefit.get('similarity')
+        if source_type == 'VECTOR':
+            label = f"🔍[AI검색 {similarity:.2f}]" if similarity is not None else "🔍[AI검색]"
+        elif source_type == 'RULES':
+            label = "📋[자격기반]"
+        else:
+            label = f"❓[{source_type}]"
+        
+        block = f"{benefit.get('rank', idx)}. {benefit.get('serv_nm', '제목 없음')} {label}\n{get_render_card(benefit)['text']}\n\n"
+        header_len = len(f"{result_header(results[:len(blocks) + 1], total)}\n\n")
+        if header_len + length + len(block) + len(footer) > SIMPLE_TEXT_MAX:
+            break
+        blocks.append(block)
+        length += len(block)
+    
+    text = f"{result_header(results[:len(blocks)], total)}\n\n" + "".join(blocks) + footer
+    return text, len(blocks)
+
 def simple_text_response(text):
     return {
         "version": "2.0",
@@ -428,7 +676,7 @@ def parse_target_group(utterance):
     # Could not parse
     return None
 
-def handle_search_query(supabase, user, query, auto_search=False):
+def handle_search_query(supabase, user, query, auto_search=False, callback_url=None):
     """
     Handle user query using RAG service.
     
@@ -437,14 +685,24 @@ def handle_search_query(supabase, user, query, auto_search=False):
         user: User profile dict
         query: User's query text
         auto_search: If True, this is an automatic search after onboarding
+        callback_url: 카카오 콜백 URL (있고 느릴 것으로 예상되면 즉시 useCallback 응답 후 백그라운드 검색)
     """
+    if user.get('is_active') and callback_url and should_use_callback(query):
+        ack = dispatch_callback_search(callback_url, user, query, auto_search)
+        if ack is not None:
+            return api_response(ack)
+    return api_response(build_search_response(user, query, auto_search))
+
+
+def build_search_response(user, query, auto_search=False):
+    """검색 + 응답 조립 (스킬 응답 dict 반환, 일반 응답/콜백 POST 공용)"""
     try:
         # Validate user profile
         if not user.get('is_active'):
-            return api_response(simple_text_response("먼저 회원 정보를 등록해주세요."))
+            return simple_text_response("먼저 회원 정보를 등록해주세요.")
         
-        # Initialize RAG Service (환경변수에서 Supabase 자동 초기화)
-        rag_service = RAGService()
+        # 컨테이너 공용 RAG Service (Supabase/OpenAI 커넥션 재사용)
+        rag_service = ContainerResources.get_rag_service()
         
         # Build user profile for RAG
         user_profile = {
@@ -456,135 +714,235 @@ def handle_search_query(supabase, user, query, auto_search=False):
             'target_group': user.get('target_group', [])
         }
         
-        # Search for services (디버깅용: top_k=30)
+        # Search for services (순위 결과를 세션에 저장하고 SEARCH_PAGE_SIZE개씩 응답)
+        cached = query_embedding_in_memory(rag_service, query)
+        search_start = time.perf_counter()
         results = rag_service.get_recommended_services(
             query_text=query,  # ← query_text로 수정!
             user_profile=user_profile,
-            top_k=30  # 디버깅용 최대 개수
+            top_k=SEARCH_SESSION_MAX_RESULTS
         )
+        SEARCH_LATENCY.record(cached, (time.perf_counter() - search_start) * 1000)
+        set_property("result_count", len(results))
         
         if not results:
-            return api_response(simple_text_response(
+            return simple_text_response(
                 "죄송합니다. 😢\n\n"
                 "현재 조건에 맞는 혜택을 찾지 못했습니다.\n\n"
                 "다른 질문이나 키워드로 다시 시도해보시거나,\n"
                 "'처음으로' 라고 말씀하시면 정보를 수정할 수 있습니다."
-            ))
+            )
         
-        # Format results (Option B: 상세 정보 표시 - 디버깅용)
-        response_text = f"🎯 찾은 혜택: **{len(results)}개**\n\n"
-        
-        for idx, benefit in enumerate(results, 1):
-            # Source type 표시 (벡터 검색 vs 자격 기반 필터)
-            source_type = benefit.get('source_type', 'UNKNOWN')
-            serv_nm = benefit.get('serv_nm', '제목 없음')
-            similarity = benefit.get('similarity')
-            
-            # 지역 정보
-            ctpv_nm = benefit.get('ctpv_nm', '')
-            sgg_nm = benefit.get('sgg_nm', '')
-            region_str = f"{ctpv_nm} {sgg_nm}".strip() if ctpv_nm or sgg_nm else "전국"
-            
-            # 생애주기 정보
-            life_cycles = benefit.get('life_nm_array')
-            life_str = ', '.join(life_cycles) if life_cycles and len(life_cycles) > 0 else "전체"
-            
-            # 대상 정보
-            targets = benefit.get('trgter_indvdl_nm_array')
-            target_str = ', '.join(targets) if targets and len(targets) > 0 else "전국민"
-            
-            # 디버깅: 서비스명, source_type, 유사도 점수, 지역, 생애주기, 대상 출력
-            if source_type == 'VECTOR' and similarity is not None:
-                print(f"[DEBUG] Benefit {idx}: {source_type}({similarity:.3f}) | 지역={region_str} | 생애주기=[{life_str}] | 대상=[{target_str}] | '{serv_nm}'")
-            else:
-                print(f"[DEBUG] Benefit {idx}: {source_type} | 지역={region_str} | 생애주기=[{life_str}] | 대상=[{target_str}] | '{serv_nm}' ")
-            
-            if source_type == 'VECTOR':
-                source_icon = "🔍"
-                # 유사도 점수 표시 (벡터 검색인 경우)
+        if debug_enabled():
+            for idx, benefit in enumerate(results, 1):
                 similarity = benefit.get('similarity')
-                if similarity is not None:
-                    source_label = f"[AI검색 {similarity:.2f}]"
-                else:
-                    source_label = "[AI검색]"
-            elif source_type == 'RULES':
-                source_icon = "📋"
-                source_label = "[자격기반]"
-            else:
-                source_icon = "❓"
-                source_label = f"[{source_type}]"
-            
-            response_text += f"**{source_icon}{idx}. {benefit.get('serv_nm', '제목 없음')}** {source_label}\n"
-            response_text += f"🆔 ID: {benefit.get('id', 'N/A')}\n"
-            response_text += f"📍 {benefit.get('ctpv_nm', '')} {benefit.get('sgg_nm', '')}\n"
-            
-            # 대상 특성 (배열)
-            targets = benefit.get('trgter_indvdl_nm_array')
-            if targets and len(targets) > 0:
-                response_text += f"👥 대상: {', '.join(targets)}\n"
-            else:
-                response_text += f"👥 대상: 전국민\n"
-            
-            # 생애주기 (디버깅용)
-            life_cycles = benefit.get('life_nm_array')
-            if life_cycles and len(life_cycles) > 0:
-                response_text += f"📅 생애주기: {', '.join(life_cycles)}\n"
-            else:
-                response_text += f"📅 생애주기: 전국민\n"
-            
-            # 서비스 요약
-            if benefit.get('serv_dgst'):
-                desc = benefit['serv_dgst']
-                if len(desc) > 150:
-                    desc = desc[:150] + "..."
-                response_text += f"📝 {desc}\n"
-            
-            # 상세 내용 (접기 형태로 추가)
-            service_content = benefit.get('service_content')
-            if service_content:
-                # 300자 제한 (너무 길면 잘라내기)
-                if len(service_content) > 300:
-                    service_content = service_content[:300] + "..."
-                response_text += f"\n💡 상세내용:\n{service_content}\n"
-            
-            # 마감일
-            if benefit.get('enfc_end_ymd'):
-                response_text += f"⏰ 마감: {benefit['enfc_end_ymd']}\n"
-            
-            # 상세 링크
-            response_text += f"🔗 상세: {benefit.get('serv_dtl_link', '정보 없음')}\n"
-            response_text += "\n" + "─" * 30 + "\n\n"
-        
-        # 온보딩 직후 vs 일반 검색에 따라 다른 안내 메시지
-        if auto_search:
-            response_text += "💬 궁금한 혜택을 아래 버튼을 눌러 질문해보세요!"
-            
-            # 온보딩 완료 후: 예시 질문 버튼
-            quick_replies = [
-                {"label": "청년 일자리 지원", "action": "message", "messageText": "청년 일자리 지원금 알려줘"},
-                {"label": "육아 지원", "action": "message", "messageText": "육아 지원 혜택 있어?"},
-                {"label": "주거비 지원", "action": "message", "messageText": "주거비 지원 받을 수 있을까?"},
-                {"label": "처음으로", "action": "message", "messageText": "처음으로"}
-            ]
-        else:
-            response_text += "💬 다른 혜택을 찾으시려면 아래 버튼을 눌러주세요!"
-            
-            # 일반 질문 후: 간단한 액션 버튼
-            quick_replies = [
-                {"label": "다른 혜택 찾기", "action": "message", "messageText": "다른 혜택 알려줘"},
-                {"label": "처음으로", "action": "message", "messageText": "처음으로"}
-            ]
+                score = f"({similarity:.3f})" if similarity is not None else ""
+                print(f"[DEBUG] Benefit {idx}: {benefit.get('source_type', 'UNKNOWN')}{score} | ID={benefit.get('id')} | '{benefit.get('serv_nm', '제목 없음')}'")
         
-        return api_response(build_response(response_text, quick_replies))
+        # "더보기"용 검색 세션 (첫 페이지를 보내고 나면 테이블에도 저장)
+        user_id = user.get('kakao_user_id')
+        session = get_search_sessions(ContainerResources.get_supabase()).save(user_id, user, query, results, auto_search=auto_search)
+        return build_page_response(user_id, session)
         
     except Exception as e:
         print(f"❌ Error in handle_search_query: {str(e)}")
+        _error_response.set(True)
         import traceback
         traceback.print_exc()
         
-        return api_response(simple_text_response(
+        return simple_text_response(
             "죄송합니다. 😢\n\n"
             "혜택 검색 중 오류가 발생했습니다.\n\n"
             f"오류 내용: {str(e)}\n\n"
             "잠시 후 다시 시도해주세요."
-        ))
+        )
+
+# ----------------------------------------------------
+# 검색 결과 페이지 ("더보기")
+# ----------------------------------------------------
+
+def is_navigation_utterance(utterance):
+    compact = "".join(utterance.split())
+    return any(compact == "".join(text.split()) for text in NAVIGATION_UTTERANCES)
+
+
+def handle_next_page(supabase, user, utterance, callback_url=None):
+    """'더보기' 등: 마지막 검색의 다음 페이지 (임베딩/벡터 검색 없음, 세션이 없으면 일반 검색)"""
+    user_id = user.get('kakao_user_id')
+    with span("search_session"):
+        session = get_search_sessions(supabase).get(user_id, user) if user_id and user.get('is_active') else None
+    if session is None:
+        print("📄 No search session - searching the utterance")
+        return handle_search_query(supabase, user, utterance, callback_url=callback_url)
+    
+    set_dimension("Path", "page")
+    print(f"📄 Next page: '{session['query']}' offset={session['offset']}/{len(session['ranked'])}")
+    return api_response(build_page_response(user_id, session))
+
+
+def search_quick_replies(auto_search, remaining):
+    """남은 결과가 있으면 '더보기' 버튼, 마지막 페이지면 예시 질문 버튼"""
+    if remaining <= 0:
+        return ONBOARDING_DONE_QUICK_REPLIES
+    base = ONBOARDING_DONE_QUICK_REPLIES if auto_search else SEARCH_QUICK_REPLIES
+    more = {"label": f"더보기 ({remaining}개)", "action": "message", "messageText": MORE_UTTERANCE}
+    return [more] + [reply for reply in base if not is_navigation_utterance(reply["messageText"])]
+
+
+def build_page_response(user_id, session):
+    """검색 세션의 현재 페이지 → 스킬 응답 dict (보낸 만큼 세션 offset 이동)"""
+    sessions = get_search_sessions()
+    with span("search_session"):
+        results, next_offset = sessions.page(session)
+    
+    if not results:
+        with span("search_session"):
+            sessions.advance(user_id, session, next_offset)
+        return build_response(
+            "더 보여드릴 혜택이 없어요. 😊\n\n"
+            "궁금한 혜택을 새로 질문하시거나 '처음으로'를 눌러 정보를 수정할 수 있어요.",
+            ONBOARDING_DONE_QUICK_REPLIES
+        )
+    
+    # 온보딩 직후 vs 일반 검색에 따라 다른 안내 메시지
+    if session['auto_search']:
+        closing_text = "💬 궁금한 혜택을 아래 버튼을 눌러 질문해보세요!"
+    else:
+        closing_text = "💬 다른 혜택을 찾으시려면 아래 버튼을 눌러주세요!"
+    total = len(session['ranked'])
+    
+    # 사전 렌더링된 카드(benefits.render_card)를 조립만 함
+    with span("render"):
+        if SEARCH_RESPONSE_FORMAT == "text":
+            text, shown = build_result_text(results, closing_text, total=total)
+            if 0 < shown < len(results):
+                next_offset = results[shown]['rank'] - 1  # 글자 수 한도로 못 담은 결과는 다음 페이지로
+    
+    # 세션 저장은 응답 전에 (응답 후 멈춘 컨테이너에서는 쓰기가 늦거나 유실됨)
+    with span("search_session"):
+        sessions.advance(user_id, session, next_offset)
+    quick_replies = search_quick_replies(session['auto_search'], sessions.remaining(session))
+    if SEARCH_RESPONSE_FORMAT == "text":
+        return build_response(text, quick_replies)
+    with span("render"):
+        return build_carousel_response(results, closing_text, quick_replies, total=total)
+
+# ----------------------------------------------------
+# Callback (비동기 스킬) 모드
+# 카카오는 5초 안에 응답이 없으면 실패 처리 → 느린 검색은 useCallback으로 먼저 응답하고
+# 결과는 1분 안에 callbackUrl로 POST (콜백 URL은 1회용)
+# ----------------------------------------------------
+
+class SearchLatencyEstimator:
+    """최근 검색 소요시간 EWMA (쿼리 임베딩이 메모리 캐시에 있을 때/없을 때 따로)"""
+    
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._ewma = {}
+        self._lock = threading.Lock()
+    
+    def record(self, cached, elapsed_ms):
+        with self._lock:
+            previous = self._ewma.get(cached)
+            self._ewma[cached] = elapsed_ms if previous is None else previous + self.alpha * (elapsed_ms - previous)
+    
+    def predict(self, cached):
+        """예상 소요시간(ms), 이 컨테이너에서 측정한 적이 없으면 None"""
+        with self._lock:
+            return self._ewma.get(cached)
+
+
+SEARCH_LATENCY = SearchLatencyEstimator()
+
+# 비동기 호출이 실패하면(권한 없음 등) 이 컨테이너에서는 콜백을 더 시도하지 않음 (요청마다 실패 후 동기 검색 방지)
+_callback_unavailable = threading.Event()
+
+
+def query_embedding_in_memory(rag_service, query):
+    cache = getattr(rag_service, 'embedding_cache', None)
+    return bool(cache is not None and cache.in_memory(query))
+
+
+def should_use_callback(query):
+    """콜백 모드 사용 여부 (KAKAO_CALLBACK_MODE + 예상 소요시간)"""
+    if KAKAO_CALLBACK_MODE == 'off' or _callback_unavailable.is_set():
+        return False
+    if KAKAO_CALLBACK_MODE == 'always':
+        return True
+    
+    cached = query_embedding_in_memory(ContainerResources.get_rag_service(), query)
+    predicted = SEARCH_LATENCY.predict(cached)
+    if predicted is None:
+        # 측정값 없음 = 이 컨테이너에서 아직 검색 전: 임베딩이 메모리에 있으면 동기,
+        # 없으면 SEARCH_LATENCY_PRIOR_MS로 판단 (예산 안이면 동기로 검색 → 측정값이 생김)
+        use_callback = not cached and SEARCH_LATENCY_PRIOR_MS > SEARCH_LATENCY_BUDGET_MS
+    else:
+        use_callback = predicted > SEARCH_LATENCY_BUDGET_MS
+    estimate = "unknown" if predicted is None else f"{predicted:.0f}ms"
+    print(f"⏱️ Search latency prediction: {estimate} (cached={cached}) → callback={use_callback}")
+    return use_callback
+
+
+def dispatch_callback_search(callback_url, user, query, auto_search):
+    """
+    백그라운드 검색 시작 후 useCallback 응답 반환 (시작 실패 시 None → 동기 검색)
+    
+    Lambda: 같은 함수를 InvocationType=Event로 비동기 호출 (lambda:InvokeFunction 권한 필요)
+    로컬: 데몬 스레드에서 실행 (scripts/kakao_callback_server.py로 POST 확인)
+    """
+    job = {
+        'callback_url': callback_url,
+        'user': user,
+        'query': query,
+        'auto_search': auto_search,
+    }
+    function_name = os.getenv('AWS_LAMBDA_FUNCTION_NAME')
+    try:
+        with span("callback_dispatch"):
+            if function_name:
+                ContainerResources.get_lambda_client().invoke(
+                    FunctionName=function_name,
+                    InvocationType='Event',
+                    Payload=json.dumps({'callback_search': job}, ensure_ascii=False, default=str).encode('utf-8')
+                )
+            else:
+                threading.Thread(target=run_callback_search, args=(job,), name="callback-search", daemon=True).start()
+    except Exception as e:
+        print(f"⚠️ Callback dispatch failed, searching inline: {e}")
+        if function_name:
+            # 권한/설정 문제는 다음 요청에서도 같으므로 이 컨테이너에서는 콜백 중단
+            _callback_unavailable.set()
+            print("⚠️ Callback mode disabled for this container")
+        return None
+    
+    set_dimension("Path", "callback_ack")
+    _callback_ack.set(True)
+    print(f"📨 Callback search dispatched: '{query}'")
+    return {
+        "version": "2.0",
+        "useCallback": True,
+        "data": {"text": CALLBACK_ACK_TEXT}
+    }
+
+
+def run_callback_search(job):
+    """검색 후 결과를 callbackUrl로 POST (응답 본문은 일반 스킬 응답과 동일)"""
+    response = build_search_response(job['user'], job['query'], job.get('auto_search', False))
+    delivered = post_callback(job['callback_url'], response)
+    return {'statusCode': 200 if delivered else 502, 'body': json.dumps({'delivered': delivered})}
+
+
+def post_callback(callback_url, response_data, attempts=2):
+    import requests  # 콜백 경로에서만 사용
+    
+    with span("callback_post"):
+        for attempt in range(1, attempts + 1):
+            try:
+                res = requests.post(callback_url, json=response_data, timeout=5)
+                if res.status_code < 500:
+                    print(f"📬 Callback delivered: {res.status_code}")
+                    return res.ok
+                print(f"⚠️ Callback POST {attempt}/{attempts} failed: {res.status_code}")
+            except Exception as e:
+                print(f"⚠️ Callback POST {attempt}/{attempts} error: {e}")
+    return False
@@ -0,0 +1,255 @@
+"""
+웹훅 중복 전달(재전송) 억제
+
+카카오는 스킬 응답이 늦으면 같은 요청을 다시 보냅니다. 재전송을 그대로 처리하면 유저 조회 / 임베딩 /
+벡터 검색이 반복되어 이미 느린 시점에 부하가 배로 늘고, 온보딩 입력은 두 번 적용될 수 있습니다.
+
+키: sha256(봇 id + 유저 id + 정규화 발화 + 요청 지문(블록 id, 액션 파라미터))
+카카오 요청에는 전달마다 고유한 id가 없으므로, 원 요청이 처리 중일 때만 같은 키를 재전송으로 봅니다.
+1. webhook_requests 테이블 (IDEMPOTENCY_TABLE_ENABLED, 기본 켜짐) - 컨테이너 간 공유
+   claim_webhook_request RPC로 선점, 다른 컨테이너가 처리 중이면 응답이 저장될 때까지 짧게 폴링
+   Lambda 컨테이너는 한 번에 1요청만 처리하므로 재전송은 항상 다른 컨테이너로 감 → 실제 중복 억제는 이 tier
+2. 컨테이너 맵 - 같은 프로세스에서 동시에 처리 중인 키 (로컬 서버/스레드 실행, 테이블 장애 시 대체)
+
+처리가 끝난 키는 바로 해제되어, 같은 발화를 다시 보내면 새 요청으로 처리합니다.
+TTL(IDEMPOTENCY_TTL_SECONDS, 기본 60초)은 끝나지 않은 선점의 최대 유지 시간입니다 (컨테이너 중단 대비).
+"처음으로"/"더보기"처럼 연달아 보내는 것이 정상인 발화(repeatable)는 처리 중이어도 매번 새로 처리합니다.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    from embedding_cache import normalize_query
+except ImportError:
+    from .embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TABLE = "webhook_requests"
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def idempotency_enabled() -> bool:
+    """IDEMPOTENCY_ENABLED=false면 중복 억제 없이 모든 요청 처리"""
+    return _env_flag("IDEMPOTENCY_ENABLED", True)
+
+
+def webhook_request_key(event: Dict[str, Any], repeatable: Iterable[str] = ()) -> Optional[str]:
+    """
+    카카오 스킬 요청 → 중복 판정 키 (유저 id가 없으면 None)
+
+    재전송 간에 바뀔 수 있는 값(callbackUrl, 타임스탬프 등)은 제외
+
+    Args:
+        repeatable: 같은 발화를 연달아 보내는 것이 정상인 발화 ("더보기" 등) - 키 없음(None)
+    """
+    try:
+        body = json.loads(event.get("body") or "{}")
+    except (TypeError, ValueError):
+        return None
+    user_request = body.get("userRequest") or {}
+    user_id = (user_request.get("user") or {}).get("id")
+    if not user_id:
+        return None
+
+    utterance = normalize_query(user_request.get("utterance", ""))
+    if utterance in {normalize_query(text) for text in repeatable}:
+        return None
+
+    action = body.get("action") or {}
+    fingerprint = [
+        (body.get("bot") or {}).get("id"),
+        user_id,
+        utterance,
+        (user_request.get("block") or {}).get("id"),
+        action.get("params"),
+        action.get("clientExtra"),
+    ]
+    raw = json.dumps(fingerprint, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _LocalEntry:
+    __slots__ = ("done", "response", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.done = threading.Event()
+        self.response: Optional[Dict[str, Any]] = None
+        self.expires_at = expires_at
+
+
+class IdempotencyGuard:
+    """요청 키 선점 / 응답 저장 (컨테이너 맵 → 공유 테이블)"""
+
+    def __init__(
+        self,
+        supabase=None,
+        ttl_seconds: Optional[float] = None,
+        wait_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        use_table: Optional[bool] = None,
+    ):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "60"))
+        self.wait_seconds = wait_seconds if wait_seconds is not None else float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "3"))
+        self.max_entries = max_entries or int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "2000"))
+        if use_table is None:
+            use_table = _env_flag("IDEMPOTENCY_TABLE_ENABLED", True)
+        self.supabase = supabase
+        self.use_table = use_table and supabase is not None
+        self.poll_interval = 0.25
+
+        self._entries: "OrderedDict[str, _LocalEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"new": 0, "local_hit": 0, "table_hit": 0, "in_progress": 0}
+
+    # ------------------------------------------------
+    # Public API
+    # ------------------------------------------------
+
+    def begin(self, key: str) -> Dict[str, Any]:
+        """
+        요청 처리 시작 선언
+
+        Returns:
+            {"status": "new"} - 처리 후 complete() / 실패 시 abandon() 호출
+            {"status": "duplicate", "response": ...} - 처리 중이던 원 요청의 응답 그대로 반환
+            {"status": "in_progress"} - 원 요청이 대기 시간 안에 끝나지 않음
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._entries[key] = _LocalEntry(now + self.ttl_seconds)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # 같은 컨테이너에서 처리 중 (완료된 키는 complete()가 바로 지움)
+            if entry.done.wait(self.wait_seconds):
+                if entry.response is None:
+                    return self.begin(key)  # 원 요청 실패 → 새로 처리
+                self.stats["local_hit"] += 1
+                return {"status": "duplicate", "response": entry.response}
+            self.stats["in_progress"] += 1
+            return {"status": "in_progress"}
+
+        if self.use_table:
+            claim = self._table_claim(key)
+            if claim is not None and not claim.get("claimed"):
+                # 다른 컨테이너가 선점 → 응답이 저장될 때까지 폴링
+                response = claim.get("response") or self._table_wait(key)
+                self._forget(key)
+                if response is not None:
+                    self.stats["table_hit"] += 1
+                    return {"status": "duplicate", "response": response}
+                self.stats["in_progress"] += 1
+                return {"status": "in_progress"}
+
+        self.stats["new"] += 1
+        return {"status": "new"}
+
+    def complete(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        처리 완료: 대기 중인 중복 요청에 응답 전달 후 선점 해제 (이후 같은 키는 새 요청)
+
+        공유 테이블에는 응답 전에 동기로 응답을 기록 (폴링 중인 다른 컨테이너가 가져가고, 이후 같은 키는 다시 선점 가능)
+        응답 후 멈춘 컨테이너에서는 백그라운드 쓰기가 실행되지 않아 행이 TTL까지 "처리 중"으로 남기 때문
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                del self._entries[key]
+        if entry is not None:
+            entry.response = response
+            entry.done.set()
+        if self.use_table:
+            self._table_complete(key, response)
+
+    def abandon(self, key: str) -> None:
+        """선점 해제 (처리 실패 또는 재사용하면 안 되는 응답 - 대기 중이던/다음 재전송은 새로 처리)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+        if self.use_table:
+            try:
+                self.supabase.table(REQUEST_TABLE).delete().eq("request_key", key).execute()
+            except Exception as e:
+                logger.warning(f"⚠️ Idempotency release failed: {e}")
+
+    # ------------------------------------------------
+    # Shared table
+    # ------------------------------------------------
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def _table_claim(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            res = self.supabase.rpc("claim_webhook_request", {
+                "p_request_key": key,
+                "p_ttl_seconds": int(self.ttl_seconds),
+            }).execute()
+            return res.data
+        except Exception as e:
+            # 공유 저장소 장애 시 컨테이너 맵만으로 처리
+            logger.warning(f"⚠️ Idempotency claim failed: {e}")
+            return None
+
+    def _table_wait(self, key: str) -> Optional[Dict[str, Any]]:
+        deadline = time.time() + self.wait_seconds
+        while time.time() < deadline:
+            time.sleep(self.poll_interval)
+            try:
+                res = self.supabase.table(REQUEST_TABLE).select("response") \
+                    .eq("request_key", key).limit(1).execute()
+            except Exception as e:
+                logger.warning(f"⚠️ Idempotency poll failed: {e}")
+                return None
+            if not res.data:
+                return None  # 원 요청 실패로 선점 해제됨
+            if res.data[0].get("response") is not None:
+                return res.data[0]["response"]
+        return None
+
+    def _table_complete(self, key: str, response: Dict[str, Any]) -> None:
+        try:
+            self.supabase.table(REQUEST_TABLE).update({"response": response}) \
+                .eq("request_key", key).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Idempotency store failed: {e}")
+
+
+_GUARD: Optional[IdempotencyGuard] = None
+_GUARD_LOCK = threading.Lock()
+
+
+def get_idempotency_guard(supabase=None) -> IdempotencyGuard:
+    """컨테이너 공용 가드 (첫 호출의 supabase 클라이언트 사용)"""
+    global _GUARD
+    if _GUARD is None:
+        with _GUARD_LOCK:
+            if _GUARD is None:
+                _GUARD = IdempotencyGuard(supabase=supabase)
+    return _GUARD
@@ -0,0 +1,165 @@
+"""
+컨테이너 단위 리소스 관리자 (Warm Lambda 재사용)
+
+Lambda 컨테이너가 살아있는 동안 Supabase/OpenAI 클라이언트와 RAGService를
+한 번만 생성하여 HTTP 커넥션 풀(TLS 세션)을 계속 재사용합니다.
+warming 이벤트에서는 prewarm()으로 커넥션과 캐시를 미리 열어둡니다.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+try:
+    from supabase_client import SupabaseClient
+    from rag_service import RAGService
+    from region_index import load_region_index
+    from lean_clients import LeanOpenAIClient
+except ImportError:
+    from .supabase_client import SupabaseClient
+    from .rag_service import RAGService
+    from .region_index import load_region_index
+    from .lean_clients import LeanOpenAIClient
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerResources:
+    """컨테이너 수명 동안 유지되는 클라이언트 모음 (lazy 싱글톤)"""
+
+    _openai_client = None
+    _lambda_client = None
+    _rag_service: Optional[RAGService] = None
+    _lock = threading.Lock()
+
+    # 컨테이너 상태 (Cold/Warm 구분용)
+    container_started_at = time.time()
+    invocation_count = 0
+    last_prewarm: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def get_supabase(cls):
+        """Supabase 클라이언트 (SupabaseClient 싱글톤 공유)"""
+        return SupabaseClient.get_client()
+
+    @classmethod
+    def get_openai_client(cls):
+        """Keep-alive 커넥션 풀을 가진 OpenAI 클라이언트 (OPENAI_CLIENT=lean이면 SDK 없이 임베딩만)"""
+        if cls._openai_client is None:
+            with cls._lock:
+                if cls._openai_client is None:
+                    api_key = os.getenv("OPENAI_API_KEY")
+                    if not api_key:
+                        raise ValueError("OPENAI_API_KEY must be set")
+
+                    if os.getenv("OPENAI_CLIENT", "sdk").strip().lower() == "lean":
+                        cls._openai_client = LeanOpenAIClient(
+                            api_key=api_key,
+                            timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "3.0")),
+                            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "1")),
+                            keepalive_seconds=float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "300")),
+                        )
+                        return cls._openai_client
+
+                    import httpx
+                    from openai import OpenAI
+
+                    http_client = httpx.Client(
+                        timeout=httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT_SECONDS", "3.0")), connect=2.0),
+                        limits=httpx.Limits(
+                            max_connections=10,
+                            max_keepalive_connections=5,
+                            keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "300")),
+                        ),
+                    )
+                    cls._openai_client = OpenAI(
+                        api_key=api_key,
+                        http_client=http_client,
+                        max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "1")),
+                    )
+        return cls._openai_client
+
+    @classmethod
+    def get_lambda_client(cls):
+        """자기 자신 비동기 호출용 Lambda 클라이언트 (callback 모드에서만 사용하므로 lazy import)"""
+        if cls._lambda_client is None:
+            with cls._lock:
+                if cls._lambda_client is None:
+                    import boto3
+
+                    cls._lambda_client = boto3.client("lambda")
+        return cls._lambda_client
+
+    @classmethod
+    def get_rag_service(cls) -> RAGService:
+        """컨테이너 공용 RAGService (클라이언트 재사용)"""
+        if cls._rag_service is None:
+            with cls._lock:
+                if cls._rag_service is None:
+                    cls._rag_service = RAGService(
+                        supabase=cls.get_supabase(),
+                        openai_client=cls.get_openai_client(),
+                    )
+        return cls._rag_service
+
+    @classmethod
+    def mark_invocation(cls) -> bool:
+        """호출 횟수 증가. 이 컨테이너의 첫 호출(Cold Start)이면 True"""
+        cls.invocation_count += 1
+        return cls.invocation_count == 1
+
+    @classmethod
+    def prewarm(cls, preset_queries: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        실제 예열: 클라이언트 생성 → DB/OpenAI 커넥션 개설 → 벡터 스냅샷 로드 → 임베딩 캐시 적재
+
+        Args:
+            preset_queries: 캐시에 올려둘 고정 발화 (웹훅 Quick Reply 등)
+
+        Returns:
+            단계별 소요시간(ms)과 실패 내역
+        """
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        def measure(name, fn):
+            start = time.perf_counter()
+            try:
+                return fn()
+            except Exception as e:
+                errors[name] = str(e)
+                logger.warning(f"⚠️ Prewarm step '{name}' failed: {e}")
+                return None
+            finally:
+                timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        rag_service = measure("init_clients", cls.get_rag_service)
+
+        # 온보딩 지역 메뉴/검증용 행정구역 스냅샷 + 이름 인덱스
+        measure("region_index", load_region_index)
+
+        # DB 커넥션 (TLS 핸드셰이크 포함) 개설
+        measure("supabase_connect", lambda: cls.get_supabase().table("regions").select("region_code").limit(1).execute())
+
+        if rag_service is not None:
+            # OpenAI 커넥션 개설 (과금 없는 메타데이터 조회)
+            measure("openai_connect", lambda: rag_service.openai_client.models.retrieve(rag_service.embedding_model))
+
+            # 벡터 스냅샷 mmap 열기 + 데이터 버전 확인 (RAG_VECTOR_BACKEND=local)
+            if rag_service.vector_backend == "local":
+                measure("vector_index", rag_service.get_vector_index)
+
+            # 고정 발화 임베딩을 LRU까지 끌어올림 (시드/테이블/OpenAI 순)
+            if preset_queries:
+                measure("embedding_cache", lambda: [rag_service.generate_embedding(q) for q in preset_queries])
+
+        result = {
+            "timings_ms": timings,
+            "total_ms": round(sum(timings.values()), 1),
+            "errors": errors,
+            "container_age_s": round(time.time() - cls.container_started_at, 1),
+            "invocations": cls.invocation_count,
+        }
+        cls.last_prewarm = result
+        return result
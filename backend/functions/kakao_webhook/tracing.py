@@ -0,0 +1,148 @@
+"""
+요청 단위 구간(span) 측정 + CloudWatch EMF 메트릭 출력
+
+lambda_handler 호출마다 trace를 하나 시작하고, 각 단계를 span()으로 감싸면
+종료 시 단계별 소요시간(ms)을 EMF(Embedded Metric Format) JSON 한 줄로 출력합니다.
+CloudWatch Logs가 이 줄을 메트릭으로 자동 추출합니다 (별도 API 호출 없음).
+
+- 샘플링: TRACE_SAMPLE_RATE (0.0~1.0, 기본 1.0) - 샘플링되지 않은 호출은 span이 no-op
+- 상세 로그: TRACE_DEBUG=true이면 샘플링된 호출에서만 debug_enabled()가 True
+- 스레드: contextvars 기반이므로 스레드 풀 작업은 copy_context().run으로 실행해야 같은 trace에 기록됨
+- 리스너: add_trace_listener(fn)로 등록하면 종료된 trace의 EMF 레코드를 받음 (부하 테스트 집계용)
+
+사용법:
+    trace = start_trace("kakao_webhook", cold_start=True)
+    with span("whitelist_rpc"):
+        ...
+    finish_trace(trace)
+"""
+import os
+import json
+import time
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Callable
+
+TRACE_NAMESPACE = os.getenv("TRACE_NAMESPACE", "TtokSunI")
+
+_current_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("ttok_trace", default=None)
+_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def _sample_rate() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))))
+    except ValueError:
+        return 1.0
+
+
+class Trace:
+    """호출 1건의 단계별 소요시간 모음"""
+
+    def __init__(self, service: str, sampled: bool, debug: bool):
+        self.service = service
+        self.sampled = sampled
+        self.debug = debug
+        self.started_at = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.dimensions: Dict[str, str] = {"Service": service, "Path": "unknown"}
+        self.properties: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        # 같은 이름의 span이 여러 번 실행되면 합산 (예: state_transition 쓰기 2회)
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + elapsed_ms
+
+    def to_emf(self) -> Dict[str, Any]:
+        total_ms = (time.perf_counter() - self.started_at) * 1000
+        metrics = {name: round(ms, 1) for name, ms in self.spans.items()}
+        metrics["total"] = round(total_ms, 1)
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": TRACE_NAMESPACE,
+                    "Dimensions": [list(self.dimensions.keys())],
+                    "Metrics": [{"Name": f"{name}_ms", "Unit": "Milliseconds"} for name in metrics],
+                }],
+            },
+            **self.dimensions,
+            **{f"{name}_ms": value for name, value in metrics.items()},
+            **self.properties,
+        }
+
+
+def start_trace(service: str, **properties) -> Trace:
+    """현재 컨텍스트에 새 trace 시작 (샘플링 여부는 이 시점에 결정)"""
+    sampled = random.random() < _sample_rate()
+    debug = sampled and os.getenv("TRACE_DEBUG", "false").lower() in ("1", "true", "yes", "on")
+    trace = Trace(service, sampled, debug)
+    trace.properties.update(properties)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    """단계 소요시간 측정 (trace가 없거나 샘플링되지 않았으면 측정하지 않음)"""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, (time.perf_counter() - start) * 1000)
+
+
+def set_dimension(name: str, value: str) -> None:
+    """메트릭 차원 지정 (예: Path=search / onboarding / command)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.dimensions[name] = value
+
+
+def set_property(name: str, value: Any) -> None:
+    """메트릭이 아닌 부가 정보 (검색 결과 수 등, 로그에서만 조회)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.properties[name] = value
+
+
+def debug_enabled() -> bool:
+    """결과별 상세 로그 출력 여부 (TRACE_DEBUG + 샘플링된 호출)"""
+    trace = _current_trace.get()
+    return trace is not None and trace.debug
+
+
+def add_trace_listener(listener: Callable[[Dict[str, Any]], None]) -> None:
+    """종료된 trace의 EMF 레코드를 받을 함수 등록 (scripts/loadtest 등 로컬 집계용)"""
+    _listeners.append(listener)
+
+
+def remove_trace_listener(listener: Callable[[Dict[str, Any]], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def finish_trace(trace: Optional[Trace]) -> Optional[Dict[str, Any]]:
+    """EMF 한 줄 출력 후 컨텍스트 정리 (샘플링되지 않았으면 출력 없음)"""
+    _current_trace.set(None)
+    if trace is None or not trace.sampled:
+        return None
+    record = trace.to_emf()
+    print(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+    for listener in list(_listeners):
+        try:
+            listener(record)
+        except Exception:
+            pass  # 집계 실패가 요청 처리에 영향을 주지 않도록
+    return record
@@ -0,0 +1,293 @@
+"""
+쿼리 임베딩 다층 캐시
+
+조회 순서 (빠른 순):
+1. 프로세스 내 LRU        - 같은 컨테이너에서 반복되는 발화
+2. /tmp 파일 캐시          - Warm Lambda 재호출 간 유지
+3. query_embedding_cache  - 컨테이너/배포 간 공유 (Supabase)
+
+캐시 키는 정규화된 발화 + 모델명 + 차원 수로 구성됩니다.
+공유 테이블 쓰기는 응답 전에 최대 EMBEDDING_CACHE_WRITE_TIMEOUT초(기본 0.5초) 기다립니다
+(Lambda는 응답 후 컨테이너를 멈추므로 백그라운드에만 맡기면 쓰기가 유실됨, 남은 쓰기는 warming에서 마저 처리).
+배포 시 생성되는 시드 파일(query_embedding_seed.json)이 있으면 LRU에 미리 적재합니다.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_TABLE = "query_embedding_cache"
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ttok_embedding_cache")
+DEFAULT_SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_embedding_seed.json")
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def normalize_query(text: str) -> str:
+    """
+    캐시 키용 발화 정규화
+
+    - 유니코드 NFKC 정규화 (전각/반각 통일)
+    - 앞뒤 공백 제거 + 연속 공백 1칸으로 축소
+    - 영문 소문자화
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.lower()
+
+
+def make_cache_key(text: str, model: str, dimensions: int) -> str:
+    """정규화 발화 + 모델 + 차원으로 캐시 키 생성 (sha256)"""
+    raw = f"{model}:{dimensions}:{normalize_query(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """쿼리 임베딩 3단계 캐시 (LRU → /tmp → Supabase 테이블)"""
+
+    def __init__(
+        self,
+        model: str,
+        dimensions: int,
+        supabase=None,
+        max_entries: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        use_table: Optional[bool] = None,
+        seed_path: Optional[str] = None,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.supabase = supabase
+
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_SIZE", "512"))
+        self.cache_dir = cache_dir or os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_files = int(os.getenv("EMBEDDING_CACHE_MAX_FILES", "5000"))
+        self.write_timeout = float(os.getenv("EMBEDDING_CACHE_WRITE_TIMEOUT", "0.5"))
+        if use_table is None:
+            use_table = _env_flag("EMBEDDING_CACHE_TABLE_ENABLED", True)
+        self.use_table = use_table and supabase is not None
+
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending_writes: List[threading.Thread] = []
+        self.stats = {"lru": 0, "file": 0, "table": 0, "miss": 0}
+
+        self._file_count = self._init_cache_dir()
+        self._load_seed(seed_path or os.getenv("EMBEDDING_SEED_PATH", DEFAULT_SEED_PATH))
+
+    # ------------------------------------------------
+    # Public API
+    # ------------------------------------------------
+
+    def key(self, text: str) -> str:
+        return make_cache_key(text, self.model, self.dimensions)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """캐시 조회 (하위 tier에서 찾으면 상위 tier로 승격)"""
+        key = self.key(text)
+
+        embedding = self._lru_get(key)
+        if embedding is not None:
+            self.stats["lru"] += 1
+            return embedding
+
+        embedding = self._file_get(key)
+        if embedding is not None:
+            self.stats["file"] += 1
+            self._lru_put(key, embedding)
+            return embedding
+
+        embedding = self._table_get(key)
+        if embedding is not None:
+            self.stats["table"] += 1
+            self._lru_put(key, embedding)
+            self._file_put(key, embedding)
+            return embedding
+
+        self.stats["miss"] += 1
+        return None
+
+    def in_memory(self, text: str) -> bool:
+        """프로세스 LRU에 있는지 (통계/승격 없이 확인, 지연시간 예측용)"""
+        return self._lru_get(self.key(text)) is not None
+
+    def put(self, text: str, embedding: List[float], background: bool = True) -> None:
+        """
+        모든 tier에 저장
+
+        Args:
+            background: True면 공유 테이블 쓰기를 스레드로 처리하고 write_timeout초까지만 기다림
+                        (OpenAI 호출이 이미 수백 ms인 miss 경로라 추가 지연은 작음, 넘기면 flush()에서 마저 대기)
+        """
+        if not embedding:
+            return
+        key = self.key(text)
+        self._lru_put(key, embedding)
+        self._file_put(key, embedding)
+
+        if not self.use_table:
+            return
+        if background:
+            writer = threading.Thread(target=self._table_put, args=(key, text, embedding), daemon=True)
+            writer.start()
+            writer.join(self.write_timeout)
+            with self._lock:
+                self._pending_writes = [t for t in self._pending_writes if t.is_alive()]
+                if writer.is_alive():
+                    self._pending_writes.append(writer)
+        else:
+            self._table_put(key, text, embedding)
+
+    def flush(self, timeout: float = 10.0) -> int:
+        """
+        남은 테이블 쓰기 완료 대기 (스크립트 종료 전 / Lambda warming 호출)
+
+        Returns:
+            대기한 쓰기 수
+        """
+        with self._lock:
+            pending = list(self._pending_writes)
+            self._pending_writes = []
+        for writer in pending:
+            writer.join(timeout)
+        return len(pending)
+
+    def export_seed(self, texts: List[str]) -> Dict:
+        """주어진 발화들의 임베딩을 시드 파일 포맷으로 반환 (LRU에 있는 항목만)"""
+        entries = {}
+        for text in texts:
+            key = self.key(text)
+            embedding = self._lru_get(key)
+            if embedding is not None:
+                entries[key] = embedding
+        return {
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "entries": entries,
+        }
+
+    # ------------------------------------------------
+    # Tier 1: In-process LRU
+    # ------------------------------------------------
+
+    def _lru_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._lru.get(key)
+            if embedding is not None:
+                self._lru.move_to_end(key)
+            return embedding
+
+    def _lru_put(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._lru[key] = embedding
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _load_seed(self, seed_path: str) -> None:
+        if not seed_path or not os.path.exists(seed_path):
+            return
+        try:
+            with open(seed_path, encoding="utf-8") as f:
+                seed = json.load(f)
+            if seed.get("model") != self.model or seed.get("dimensions") != self.dimensions:
+                logger.warning(f"⚠️ Embedding seed skipped (model/dimensions mismatch): {seed_path}")
+                return
+            for key, embedding in seed.get("entries", {}).items():
+                self._lru_put(key, embedding)
+            logger.info(f"🌱 Embedding seed loaded: {len(seed.get('entries', {}))} queries")
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load embedding seed {seed_path}: {e}")
+
+    # ------------------------------------------------
+    # Tier 2: /tmp file cache (float32 binary)
+    # ------------------------------------------------
+
+    def _init_cache_dir(self) -> int:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            return len(os.listdir(self.cache_dir))
+        except OSError as e:
+            logger.warning(f"⚠️ Embedding file cache disabled ({self.cache_dir}): {e}")
+            self.cache_dir = None
+            return 0
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.f32")
+
+    def _file_get(self, key: str) -> Optional[List[float]]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._file_path(key), "rb") as f:
+                values = array("f")
+                values.frombytes(f.read())
+            if len(values) != self.dimensions:
+                return None
+            return values.tolist()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding file cache read failed: {e}")
+            return None
+
+    def _file_put(self, key: str, embedding: List[float]) -> None:
+        if not self.cache_dir or self._file_count >= self.max_files:
+            return
+        path = self._file_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            # 원자적 쓰기: 임시 파일 작성 후 rename
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(array("f", embedding).tobytes())
+            os.replace(tmp_path, path)
+            self._file_count += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding file cache write failed: {e}")
+
+    # ------------------------------------------------
+    # Tier 3: Shared Supabase table
+    # ------------------------------------------------
+
+    def _table_get(self, key: str) -> Optional[List[float]]:
+        if not self.use_table:
+            return None
+        try:
+            res = self.supabase.table(CACHE_TABLE).select("embedding").eq("cache_key", key).limit(1).execute()
+            if res.data:
+                embedding = res.data[0].get("embedding")
+                if embedding and len(embedding) == self.dimensions:
+                    return embedding
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache table read failed: {e}")
+        return None
+
+    def _table_put(self, key: str, text: str, embedding: List[float]) -> None:
+        try:
+            self.supabase.table(CACHE_TABLE).upsert({
+                "cache_key": key,
+                "normalized_text": normalize_query(text),
+                "model": self.model,
+                "dimensions": self.dimensions,
+                "embedding": embedding,
+            }, on_conflict="cache_key").execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache table write failed: {e}")
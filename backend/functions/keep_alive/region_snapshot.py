@@ -0,0 +1,227 @@
+"""
+행정구역 스냅샷 (시/도 → 시/군/구 이름 + 지역코드)
+
+regions 테이블의 시/도(depth=1)·시/군/구(depth=2)와 읍/면/동(depth=3) 이름을 압축한 JSON 파일을
+Lambda 번들에 포함하여 웹훅이 온보딩 메뉴 / 입력 검증 / 지역코드 조회를 DB 없이 처리합니다.
+(읍/면/동은 코드 없이 이름만 - 자유 입력을 시/군/구로 해석하는 region_index.py용 별칭)
+
+스냅샷 형식 (region_snapshot.json):
+    {
+      "format": 2,
+      "version": "내용 해시 12자리",
+      "data_version": data_versions('regions') 값,
+      "generated_at": "...",
+      "sido": [{"name": "서울특별시", "code": "1100000000", "sgg": [["종로구", "1111000000", ["청운동", ...]], ...]}, ...]
+    }
+
+생성: scripts/region_code/export_region_snapshot.py (build.sh), load_region_codes.py 적재 직후
+파일이 없으면 기본 시/도 목록(DEFAULT_SIDO)만으로 동작하고, 시/군/구 메뉴는 DB 조회로 대체합니다.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 2
+SUPPORTED_FORMATS = (1, 2)  # 1: 읍/면/동 별칭 없음
+SNAPSHOT_FILENAME = "region_snapshot.json"
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), SNAPSHOT_FILENAME)
+
+# 스냅샷이 없을 때 사용하는 시/도 목록 (기존 웹훅 하드코딩 목록과 동일한 이름)
+DEFAULT_SIDO = [
+    ("서울특별시", "1100000000"),
+    ("부산광역시", "2600000000"),
+    ("대구광역시", "2700000000"),
+    ("인천광역시", "2800000000"),
+    ("광주광역시", "2900000000"),
+    ("대전광역시", "3000000000"),
+    ("울산광역시", "3100000000"),
+    ("세종특별자치시", "3611000000"),
+    ("경기도", "4100000000"),
+    ("충청북도", "4300000000"),
+    ("충청남도", "4400000000"),
+    ("전라북도", "4500000000"),
+    ("전라남도", "4600000000"),
+    ("경상북도", "4700000000"),
+    ("경상남도", "4800000000"),
+    ("제주특별자치도", "5000000000"),
+    ("강원특별자치도", "5100000000"),
+]
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def _strip_parent(name: str, parent_name: str) -> str:
+    # API 지역명은 전체 주소 ('서울특별시 종로구') → 상위 지역 부분 제거
+    name = _normalize(name)
+    if parent_name and name.startswith(parent_name + " "):
+        return name[len(parent_name) + 1:]
+    return name
+
+
+def build_region_snapshot(regions: List[Dict[str, Any]], data_version: int = 0) -> Dict[str, Any]:
+    """
+    regions 행 목록으로 스냅샷 생성
+
+    Args:
+        regions: region_code, name, depth, parent_code, is_active를 가진 행 (DB 행 또는 parse_region_code 결과)
+        data_version: data_versions('regions') 값 (모르면 0)
+
+    Returns:
+        스냅샷 dict (write_region_snapshot으로 저장)
+    """
+    active = [r for r in regions if r.get("is_active", True)]
+    sido_rows = sorted((r for r in active if r.get("depth") == 1), key=lambda r: r["region_code"])
+
+    # 읍/면/동 → 상위 시/군/구 (parent_code, 없으면 코드 앞 5자리)
+    emd_by_parent: Dict[str, List[Dict[str, Any]]] = {}
+    for row in active:
+        if row.get("depth") == 3:
+            parent = row.get("parent_code") or row["region_code"][:5] + "00000"
+            emd_by_parent.setdefault(parent, []).append(row)
+
+    sido_list = []
+    for sido in sido_rows:
+        sido_name = _normalize(sido["name"])
+        prefix = sido["region_code"][:2]
+        sgg = []
+        for row in sorted((r for r in active if r.get("depth") == 2 and r["region_code"][:2] == prefix), key=lambda r: r["region_code"]):
+            name = _strip_parent(row["name"], sido_name)
+            full_name = f"{sido_name} {name}"
+            emd = sorted({_strip_parent(e["name"], full_name) for e in emd_by_parent.get(row["region_code"], [])})
+            sgg.append([name, row["region_code"], emd])
+        if not sgg:
+            # 세종특별자치시처럼 시/군/구가 없는 시/도는 자기 자신을 선택지로 (읍/면/동은 시/도 바로 아래)
+            emd = sorted({_strip_parent(e["name"], sido_name) for e in emd_by_parent.get(sido["region_code"], [])})
+            sgg.append([sido_name, sido["region_code"], emd])
+        sido_list.append({"name": sido_name, "code": sido["region_code"], "sgg": sgg})
+
+    body = json.dumps(sido_list, ensure_ascii=False, sort_keys=True)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": hashlib.sha1(body.encode("utf-8")).hexdigest()[:12],
+        "data_version": data_version,
+        "generated_at": datetime.now().isoformat(),
+        "sido": sido_list,
+    }
+
+
+def write_region_snapshot(path: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """스냅샷 파일 저장 후 요약 반환"""
+    if not snapshot.get("sido"):
+        raise ValueError("Region snapshot is empty")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return {
+        "version": snapshot["version"],
+        "data_version": snapshot.get("data_version", 0),
+        "sido": len(snapshot["sido"]),
+        "sgg": sum(len(s["sgg"]) for s in snapshot["sido"]),
+        "bytes": os.path.getsize(path),
+    }
+
+
+class RegionSnapshot:
+    """시/도·시/군/구 이름 ↔ 지역코드 조회 (메모리 dict, DB 조회 없음)"""
+
+    def __init__(self, snapshot: Dict[str, Any], bundled: bool = True):
+        self.version = snapshot.get("version", "default")
+        self.data_version = snapshot.get("data_version", 0)
+        self.bundled = bundled
+        self._sido: Dict[str, Dict[str, Any]] = {}
+        for sido in snapshot.get("sido", []):
+            entries = sido.get("sgg", [])
+            self._sido[sido["name"]] = {
+                "code": sido["code"],
+                "sgg": {entry[0]: entry[1] for entry in entries},
+                "emd": {entry[0]: entry[2] for entry in entries if len(entry) > 2},
+            }
+
+    @classmethod
+    def default(cls) -> "RegionSnapshot":
+        """번들 스냅샷이 없을 때: 시/도만 있는 기본 목록"""
+        return cls({"sido": [{"name": name, "code": code, "sgg": []} for name, code in DEFAULT_SIDO]}, bundled=False)
+
+    @property
+    def has_sgg(self) -> bool:
+        return any(sido["sgg"] for sido in self._sido.values())
+
+    def city_names(self) -> List[str]:
+        return list(self._sido.keys())
+
+    def find_city(self, text: Optional[str]) -> Optional[str]:
+        """발화에서 시/도 이름 찾기 (정확히 일치 → 포함 순)"""
+        text = _normalize(text)
+        if text in self._sido:
+            return text
+        for name in self._sido:
+            if name in text:
+                return name
+        return None
+
+    def sgg_names(self, ctpv_nm: Optional[str]) -> List[str]:
+        sido = self._sido.get(_normalize(ctpv_nm))
+        return list(sido["sgg"].keys()) if sido else []
+
+    def iter_sgg(self):
+        """(시/도, 시/군/구, 지역코드, 읍/면/동 이름 목록) 순회"""
+        for ctpv_nm, sido in self._sido.items():
+            for sgg_nm, code in sido["sgg"].items():
+                yield ctpv_nm, sgg_nm, code, sido["emd"].get(sgg_nm, [])
+
+    def resolve_code(self, ctpv_nm: Optional[str], sgg_nm: Optional[str]) -> Optional[str]:
+        """(시/도, 시/군/구) → 지역코드 (없으면 None)"""
+        sido = self._sido.get(_normalize(ctpv_nm))
+        if not sido:
+            return None
+        return sido["sgg"].get(_normalize(sgg_nm))
+
+
+_SNAPSHOT: Optional[RegionSnapshot] = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def load_region_snapshot(path: Optional[str] = None) -> RegionSnapshot:
+    """
+    컨테이너당 한 번 스냅샷 로드 (파일 없음/손상 시 기본 시/도 목록)
+
+    경로: 인자 → REGION_SNAPSHOT_PATH → 모듈 옆 region_snapshot.json
+    """
+    global _SNAPSHOT
+    if _SNAPSHOT is not None:
+        return _SNAPSHOT
+
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is not None:
+            return _SNAPSHOT
+
+        path = path or os.getenv("REGION_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        try:
+            start = time.time()
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") not in SUPPORTED_FORMATS:
+                raise ValueError(f"unsupported format {data.get('format')}")
+            _SNAPSHOT = RegionSnapshot(data)
+            logger.info(
+                f"🗺️ Region snapshot loaded: {len(_SNAPSHOT.city_names())} sido "
+                f"(version={_SNAPSHOT.version}, data_version={_SNAPSHOT.data_version}, {time.time() - start:.3f}s)"
+            )
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Region snapshot not found ({path}) - using default sido list")
+            _SNAPSHOT = RegionSnapshot.default()
+        except Exception as e:
+            logger.error(f"❌ Region snapshot load failed ({path}): {e} - using default sido list")
+            _SNAPSHOT = RegionSnapshot.default()
+        return _SNAPSHOT
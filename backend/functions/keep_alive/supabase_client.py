@@ -1,26 +1,54 @@
 """
 Supabase 데이터베이스 클라이언트
+
+SUPABASE_CLIENT=lean이면 supabase SDK 대신 lean_clients.LeanSupabaseClient(PostgREST 직접 호출)를 사용합니다.
+SDK는 실제로 클라이언트를 만들 때만 import합니다 (모듈 로딩 = Cold Start 시간 절약).
 """
 import os
-from typing import Optional
-from supabase import create_client, Client
+import threading
+from typing import Any, Optional
+
+
+def supabase_client_mode() -> str:
+    """sdk(기본) | lean"""
+    return os.getenv("SUPABASE_CLIENT", "sdk").strip().lower()
 
 
 class SupabaseClient:
     """Supabase 클라이언트 싱글톤"""
-    
-    _instance: Optional[Client] = None
-    
+
+    _instance: Optional[Any] = None
+    _lock = threading.Lock()
+
     @classmethod
-    def get_client(cls) -> Client:
-        """Supabase 클라이언트 인스턴스 반환"""
+    def get_client(cls):
+        """Supabase 클라이언트 인스턴스 반환 (supabase.Client 또는 LeanSupabaseClient)"""
         if cls._instance is None:
-            url = os.environ.get('SUPABASE_URL')
-            key = os.environ.get('SUPABASE_SERVICE_KEY')
-            
-            if not url or not key:
-                raise ValueError('SUPABASE_URL and SUPABASE_SERVICE_KEY must be set')
-            
-            cls._instance = create_client(url, key)
-        
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls._create()
+
         return cls._instance
+
+    @staticmethod
+    def _create():
+        url = os.environ.get('SUPABASE_URL')
+        key = os.environ.get('SUPABASE_SERVICE_KEY')
+
+        if not url or not key:
+            raise ValueError('SUPABASE_URL and SUPABASE_SERVICE_KEY must be set')
+
+        if supabase_client_mode() == 'lean':
+            try:
+                from lean_clients import LeanSupabaseClient
+            except ImportError:
+                from .lean_clients import LeanSupabaseClient
+            return LeanSupabaseClient(
+                url,
+                key,
+                timeout=float(os.getenv('SUPABASE_TIMEOUT_SECONDS', '5.0')),
+                keepalive_seconds=float(os.getenv('SUPABASE_KEEPALIVE_SECONDS', '60')),
+            )
+
+        from supabase import create_client
+        return create_client(url, key)
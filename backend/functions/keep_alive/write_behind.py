@@ -0,0 +1,185 @@
+"""
+웹훅 DB 쓰기 지연 처리 (write-behind) + 컨테이너 프로필 캐시
+
+온보딩 턴의 응답은 캐시된 프로필만으로 계산할 수 있으므로, DB 쓰기는 큐에 넣고
+백그라운드 스레드가 응답과 별개로 처리합니다.
+
+- 순서: 단일 워커가 FIFO로 처리 → 같은 유저의 쓰기는 항상 들어온 순서대로 반영
+- 재시도: 실패 시 지수 백오프로 WRITE_BEHIND_MAX_ATTEMPTS회까지, 끝내 실패하면 on_failure 호출
+- Lambda: 응답 반환 후 컨테이너가 멈추면 워커도 멈췄다가 다음 호출(또는 warming)에서 이어서 처리
+  (warming 호출은 flush()로 큐를 비움)
+
+프로필 캐시는 마지막으로 알고 있는 users 행을 보관하여, 다음 턴에 유저 조회 없이 상태를 판단합니다.
+쓰기가 거부(conflict)되거나 실패하면 해당 유저 캐시를 버리고 다음 턴에 DB에서 다시 읽습니다.
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def write_behind_enabled() -> bool:
+    """WRITE_BEHIND_ENABLED=true일 때만 지연 쓰기 (기본: 동기 RPC)"""
+    return _env_flag("WRITE_BEHIND_ENABLED", False)
+
+
+class ProfileCache:
+    """kakao_user_id → users 행 (컨테이너 LRU + TTL)"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size or int(os.getenv("PROFILE_CACHE_SIZE", "1000"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "600"))
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None:
+                return None
+            profile, stored_at = item
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._items[user_id]
+                return None
+            self._items.move_to_end(user_id)
+            return dict(profile)
+
+    def put(self, user_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[user_id] = (dict(profile), time.time())
+            self._items.move_to_end(user_id)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._items.pop(user_id, None)
+
+
+class WriteBehindQueue:
+    """유저별 순서를 지키는 단일 워커 쓰기 큐"""
+
+    def __init__(self, max_attempts: Optional[int] = None, backoff_seconds: float = 0.2):
+        self.max_attempts = max_attempts or int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "3"))
+        self.backoff_seconds = backoff_seconds
+        self._queue: deque = deque()
+        self._pending: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {"submitted": 0, "written": 0, "retried": 0, "failed": 0}
+
+    def submit(
+        self,
+        user_id: str,
+        fn: Callable[[], Any],
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_failure: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """쓰기 등록 (즉시 반환). fn은 워커 스레드에서 실행"""
+        with self._cond:
+            self._queue.append((user_id, fn, on_success, on_failure))
+            self._pending[user_id] = self._pending.get(user_id, 0) + 1
+            self.stats["submitted"] += 1
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def pending(self, user_id: Optional[str] = None) -> int:
+        """대기 중인 쓰기 수 (user_id 지정 시 해당 유저만, 실행 중인 작업 포함)"""
+        with self._cond:
+            if user_id is None:
+                return sum(self._pending.values())
+            return self._pending.get(user_id, 0)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """큐가 빌 때까지 대기 (타임아웃이면 False)"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                user_id, fn, on_success, on_failure = self._queue.popleft()
+
+            self._execute(user_id, fn, on_success, on_failure)
+
+            with self._cond:
+                self._pending[user_id] -= 1
+                if self._pending[user_id] <= 0:
+                    del self._pending[user_id]
+                self._cond.notify_all()
+
+    def _execute(self, user_id, fn, on_success, on_failure) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = fn()
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    self.stats["retried"] += 1
+                    logger.warning(f"⚠️ Write-behind retry {attempt}/{self.max_attempts} ({user_id}): {e}")
+                    time.sleep(self.backoff_seconds * (2 ** (attempt - 1)))
+                    continue
+                self.stats["failed"] += 1
+                logger.error(f"❌ Write-behind failed ({user_id}): {e}")
+                if on_failure:
+                    try:
+                        on_failure(e)
+                    except Exception as callback_error:
+                        logger.error(f"❌ Write-behind failure callback error: {callback_error}")
+                return
+
+            self.stats["written"] += 1
+            if on_success:
+                try:
+                    on_success(result)
+                except Exception as callback_error:
+                    logger.error(f"❌ Write-behind success callback error: {callback_error}")
+            return
+
+
+_QUEUE: Optional[WriteBehindQueue] = None
+_PROFILES: Optional[ProfileCache] = None
+_SINGLETON_LOCK = threading.Lock()
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """컨테이너 공용 쓰기 큐"""
+    global _QUEUE
+    if _QUEUE is None:
+        with _SINGLETON_LOCK:
+            if _QUEUE is None:
+                _QUEUE = WriteBehindQueue()
+    return _QUEUE
+
+
+def get_profile_cache() -> ProfileCache:
+    """컨테이너 공용 프로필 캐시"""
+    global _PROFILES
+    if _PROFILES is None:
+        with _SINGLETON_LOCK:
+            if _PROFILES is None:
+                _PROFILES = ProfileCache()
+    return _PROFILES
@@ -13,6 +13,7 @@ from typing import List, Dict, Set
 try:
     from supabase_client import SupabaseClient
     from slack_notifier import notify_info, notify_error
+    from region_snapshot import build_region_snapshot
 except ImportError as e:
     print(f"❌ Import Error: {e}")
     raise ImportError(f"Failed to import common modules: {e}")
@@ -54,6 +55,16 @@ def lambda_handler(event, context):
         stats = update_database(regions)
         print(f"✅ Database update complete: {stats}")
         
+        # 웹훅 번들 행정구역 스냅샷 버전 (내용이 바뀌었으면 kakao_webhook 재배포 필요)
+        snapshot = build_region_snapshot([parse_region_code(r['code'], r['name']) for r in regions])
+        stats['snapshot_version'] = snapshot['version']
+        print(f"🗺️ Region snapshot version: {snapshot['version']} ({len(snapshot['sido'])} sido)")
+        try:
+            res = supabase.rpc('bump_data_version', {'p_name': 'regions'}).execute()
+            stats['data_version'] = res.data
+        except Exception as e:
+            print(f"Data version bump failed: {e}")
+        
         # Slack 알림 (성공 -> 모니터링 채널)
         message = (
             f"✅ *행정구역 코드 업데이트 완료*\n"
@@ -64,7 +75,8 @@ def lambda_handler(event, context):
         notify_info("Region Updater 완료", details={
             "수집": f"{len(regions)}건",
             "갱신": f"{stats['inserted']}건",
-            "폐지": f"{stats['deprecated']}건"
+            "폐지": f"{stats['deprecated']}건",
+            "스냅샷": f"{stats['snapshot_version']} (웹훅 재배포 시 반영)"
         })
         
         return {
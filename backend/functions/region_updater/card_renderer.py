@@ -0,0 +1,104 @@
+"""
+혜택 응답 카드 사전 렌더링
+
+수집 시점에 혜택마다 카카오 carousel(textCard) 아이템과 텍스트 fallback 조각을 만들어
+benefits.render_card(jsonb)에 저장합니다. 웹훅은 검색 결과의 카드를 조립만 합니다.
+
+render_card 형식:
+    {"v": CARD_RENDER_VERSION, "card": {textCard 아이템}, "text": "텍스트 fallback 조각"}
+
+카드 형식을 바꾸면 CARD_RENDER_VERSION을 올리고
+scripts/cards/render_benefit_cards.py로 기존 혜택을 다시 렌더링합니다.
+(버전이 다른 카드는 웹훅이 즉석에서 다시 렌더링하므로 응답은 깨지지 않습니다)
+"""
+from typing import Dict, Any, List, Optional
+
+CARD_RENDER_VERSION = 1
+
+# 카카오 스킬 응답 제한
+CAROUSEL_MAX_ITEMS = 10          # carousel 아이템 최대 개수
+CARD_TITLE_MAX = 50              # textCard title
+CARD_DESCRIPTION_MAX = 230       # textCard description (carousel 내 표시 한도 고려)
+SIMPLE_TEXT_MAX = 1000           # simpleText text
+
+DETAIL_BUTTON_LABEL = "자세히 보기"  # 버튼 label (최대 14자)
+DEFAULT_DETAIL_URL = "https://www.bokjiro.go.kr"
+
+
+def _clip(text: Optional[str], limit: int) -> str:
+    text = " ".join((text or "").split())
+    if limit <= 0:
+        return ""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + "…"
+
+
+def _region_label(benefit: Dict[str, Any]) -> str:
+    region = f"{benefit.get('ctpv_nm') or ''} {benefit.get('sgg_nm') or ''}".strip()
+    return region or "전국"
+
+
+def _join_or(values: Optional[List[str]], default: str) -> str:
+    return ", ".join(values) if values else default
+
+
+def render_card(benefit: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    혜택 1건의 카드 + 텍스트 조각 생성
+
+    Args:
+        benefit: benefits 행 (serv_nm, ctpv_nm, sgg_nm, trgter_indvdl_nm_array,
+                 life_nm_array, serv_dgst, enfc_end_ymd, serv_dtl_link 사용)
+
+    Returns:
+        {"v", "card", "text"} (benefits.render_card에 그대로 저장)
+    """
+    serv_nm = benefit.get("serv_nm") or "제목 없음"
+    region = _region_label(benefit)
+    targets = _join_or(benefit.get("trgter_indvdl_nm_array"), "전국민")
+    link = benefit.get("serv_dtl_link") or DEFAULT_DETAIL_URL
+    end_date = benefit.get("enfc_end_ymd")
+
+    # carousel 카드: 지역/대상 한 줄 + 요약 (+ 마감일)
+    header = f"📍 {region} · 👥 {targets}"
+    footer = f"\n⏰ 마감: {end_date}" if end_date else ""
+    summary_limit = max(0, CARD_DESCRIPTION_MAX - len(header) - len(footer) - 1)
+    summary = _clip(benefit.get("serv_dgst"), summary_limit)
+    description = _clip(header, CARD_DESCRIPTION_MAX)
+    if summary:
+        description += f"\n{summary}"
+    description += footer
+
+    card = {
+        "title": _clip(serv_nm, CARD_TITLE_MAX),
+        "description": description[:CARD_DESCRIPTION_MAX],
+        "buttons": [
+            {"action": "webLink", "label": DETAIL_BUTTON_LABEL, "webLinkUrl": link}
+        ],
+    }
+
+    # 텍스트 fallback 조각 (번호/출처 라벨은 웹훅이 앞에 붙임)
+    lines = [
+        f"📍 {region} | 👥 {targets}",
+    ]
+    digest = _clip(benefit.get("serv_dgst"), 80)
+    if digest:
+        lines.append(f"📝 {digest}")
+    if end_date:
+        lines.append(f"⏰ 마감: {end_date}")
+    lines.append(f"🔗 {link}")
+
+    return {
+        "v": CARD_RENDER_VERSION,
+        "card": card,
+        "text": "\n".join(lines),
+    }
+
+
+def get_render_card(benefit: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 render_card 사용, 없거나 버전이 다르면 즉석 렌더링"""
+    cached = benefit.get("render_card")
+    if cached and cached.get("v") == CARD_RENDER_VERSION:
+        return cached
+    return render_card(benefit)
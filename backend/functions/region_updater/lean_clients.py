@@ -0,0 +1,381 @@
+"""
+경량 Supabase(PostgREST) / OpenAI 임베딩 클라이언트 (표준 라이브러리만 사용)
+
+supabase SDK는 gotrue/realtime/storage/postgrest/httpx를, openai SDK는 pydantic/httpx를 함께 로딩하여
+256MB 웹훅 Lambda의 Cold Start에 수백 ms를 더합니다. 웹훅이 실제로 쓰는 기능은
+table().select/eq/.../upsert/update/delete, rpc(), embeddings.create()뿐이므로
+http.client 커넥션 풀 위에 같은 호출 모양만 구현합니다.
+
+- SUPABASE_CLIENT=lean → SupabaseClient.get_client()가 LeanSupabaseClient 반환 (기본 sdk)
+- OPENAI_CLIENT=lean   → ContainerResources.get_openai_client()가 LeanOpenAIClient 반환 (기본 sdk)
+
+응답은 SDK와 같이 .data 속성을 가진 객체이고, HTTP 오류는 LeanAPIError로 올립니다.
+"""
+import json
+import time
+import queue
+import logging
+import http.client
+from urllib.parse import urlsplit, urlencode, quote
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 재사용 중이던 keep-alive 커넥션이 서버에서 닫혔을 때 나는 오류 (새 커넥션으로 1회 재시도)
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class LeanAPIError(Exception):
+    """PostgREST / OpenAI HTTP 오류 (status + 응답 본문의 message/code)"""
+
+    def __init__(self, status: int, message: str, code: Optional[str] = None):
+        super().__init__(f"{status} {code or ''} {message}".strip())
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+class LeanResponse:
+    def __init__(self, data: Any):
+        self.data = data
+
+
+class HTTPConnectionPool:
+    """호스트 1개에 대한 keep-alive 커넥션 풀 (스레드 안전, LIFO 재사용, keepalive_seconds 넘게 쉰 커넥션은 폐기)"""
+
+    def __init__(self, base_url: str, timeout: float = 5.0, max_size: int = 10, keepalive_seconds: float = 60.0):
+        parsed = urlsplit(base_url)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self._idle: "queue.LifoQueue[Tuple[http.client.HTTPConnection, float]]" = queue.LifoQueue(maxsize=max_size)
+        self._ssl_context = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        if self._ssl_context is None:
+            import ssl
+            self._ssl_context = ssl.create_default_context()
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self._ssl_context)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """
+        요청 1회 (base_url 경로 뒤에 path를 붙임)
+
+        Returns:
+            (HTTP status, 응답 본문)
+        """
+        url = f"{self.base_path}{path}"
+        for attempt in (1, 2):
+            conn = self._acquire() if attempt == 1 else None
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect()
+            try:
+                conn.request(method, url, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and attempt == 1:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, data
+        raise RuntimeError("unreachable")
+
+    def _acquire(self) -> Optional[http.client.HTTPConnection]:
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            if time.monotonic() - released_at <= self.keepalive_seconds:
+                return conn
+            conn.close()  # 서버/LB가 이미 닫았을 가능성이 큼
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            conn.close()
+
+    def warm(self) -> None:
+        """커넥션 1개를 미리 열어 둠 (TCP/TLS 핸드셰이크를 요청 경로에서 제거)"""
+        conn = self._connect()
+        conn.connect()
+        self._release(conn)
+
+    def close(self) -> None:
+        while True:
+            conn = self._acquire()
+            if conn is None:
+                return
+            conn.close()
+
+
+def _decode(status: int, data: bytes) -> Any:
+    try:
+        payload = json.loads(data) if data else None
+    except ValueError:
+        if status < 400:
+            raise
+        payload = None  # 게이트웨이 오류 페이지 등
+    if status >= 400:
+        if isinstance(payload, dict):
+            error = payload.get("error") if isinstance(payload.get("error"), dict) else payload
+            raise LeanAPIError(status, str(error.get("message") or payload), error.get("code"))
+        raise LeanAPIError(status, data.decode("utf-8", errors="replace")[:200])
+    return payload
+
+
+# ------------------------------------------------
+# Supabase (PostgREST)
+# ------------------------------------------------
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _quote_list_item(value: Any) -> str:
+    # in.(...) 목록: 구분자/괄호/따옴표/공백이 있으면 큰따옴표로 감쌈 (PostgREST 규칙)
+    text = _format_value(value)
+    if any(ch in text for ch in ',()" '):
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+
+class LeanQuery:
+    """PostgREST 요청 빌더 (supabase-py 쿼리 빌더와 같은 메서드 이름)"""
+
+    def __init__(self, client: "LeanSupabaseClient", table: str):
+        self.client = client
+        self.table = table
+        self.method = "GET"
+        self.params: List[Tuple[str, str]] = []
+        self.body: Any = None
+        self.prefer: List[str] = []
+
+    # 동작
+    def select(self, columns: str = "*", *more_columns):
+        self.method = "GET"
+        self.params.append(("select", ",".join((columns,) + more_columns).replace(" ", "")))
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.method, self.body = "POST", payload
+        self.prefer.append("return=representation")
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None, ignore_duplicates: bool = False, **kwargs):
+        self.method, self.body = "POST", payload
+        self.prefer += ["resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates", "return=representation"]
+        if on_conflict:
+            self.params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, payload, **kwargs):
+        self.method, self.body = "PATCH", payload
+        self.prefer.append("return=representation")
+        return self
+
+    def delete(self, **kwargs):
+        self.method = "DELETE"
+        self.prefer.append("return=representation")
+        return self
+
+    # 필터
+    def _filter(self, column: str, operator: str, value: str):
+        self.params.append((column, f"{operator}.{value}"))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", _format_value(value))
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", _format_value(value))
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", _format_value(value))
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", _format_value(value))
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", _format_value(value))
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", _format_value(value))
+
+    def like(self, column, pattern):
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._filter(column, "is", _format_value(value))
+
+    def in_(self, column, values):
+        return self._filter(column, "in", "(" + ",".join(_quote_list_item(v) for v in values) + ")")
+
+    def order(self, column, desc: bool = False, **kwargs):
+        self.params.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, count: int):
+        self.params.append(("limit", str(count)))
+        return self
+
+    def execute(self) -> LeanResponse:
+        path = f"/rest/v1/{quote(self.table)}"
+        if self.params:
+            path += "?" + urlencode(self.params, safe=",()*.:")
+        headers = self.client.headers(self.prefer)
+        body = json.dumps(self.body, ensure_ascii=False).encode("utf-8") if self.body is not None else None
+        status, data = self.client.pool.request(self.method, path, body=body, headers=headers)
+        return LeanResponse(_decode(status, data))
+
+
+class LeanRPC:
+    def __init__(self, client: "LeanSupabaseClient", name: str, params: Dict[str, Any]):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> LeanResponse:
+        body = json.dumps(self.params, ensure_ascii=False).encode("utf-8")
+        status, data = self.client.pool.request("POST", f"/rest/v1/rpc/{quote(self.name)}", body=body, headers=self.client.headers())
+        return LeanResponse(_decode(status, data))
+
+
+class LeanSupabaseClient:
+    """
+    supabase.Client 대체 (table / rpc만, service key 인증)
+
+    Args:
+        url: SUPABASE_URL
+        key: SUPABASE_SERVICE_KEY
+        timeout: 요청 timeout (초)
+        max_connections: 풀에 보관할 keep-alive 커넥션 수
+        keepalive_seconds: 이보다 오래 쉰 커넥션은 재사용하지 않음
+    """
+
+    def __init__(self, url: str, key: str, timeout: float = 5.0, max_connections: int = 10, keepalive_seconds: float = 60.0):
+        self.pool = HTTPConnectionPool(url, timeout=timeout, max_size=max_connections, keepalive_seconds=keepalive_seconds)
+        self._headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+        }
+
+    def headers(self, prefer: Optional[List[str]] = None) -> Dict[str, str]:
+        if not prefer:
+            return self._headers
+        return {**self._headers, "Prefer": ",".join(prefer)}
+
+    def table(self, name: str) -> LeanQuery:
+        return LeanQuery(self, name)
+
+    def from_(self, name: str) -> LeanQuery:
+        return LeanQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> LeanRPC:
+        return LeanRPC(self, name, params or {})
+
+
+# ------------------------------------------------
+# OpenAI (embeddings / models)
+# ------------------------------------------------
+
+class _Embedding:
+    def __init__(self, item: Dict[str, Any]):
+        self.embedding = item["embedding"]
+        self.index = item.get("index", 0)
+
+
+class _EmbeddingResponse:
+    def __init__(self, payload: Dict[str, Any]):
+        self.data = [_Embedding(item) for item in payload.get("data", [])]
+        self.model = payload.get("model")
+        self.usage = payload.get("usage")
+
+
+class _Embeddings:
+    def __init__(self, client: "LeanOpenAIClient"):
+        self.client = client
+
+    def create(self, model: str, input, dimensions: Optional[int] = None, **kwargs) -> _EmbeddingResponse:
+        body = {"model": model, "input": input}
+        if dimensions:
+            body["dimensions"] = dimensions
+        return _EmbeddingResponse(self.client.request("POST", "/embeddings", body))
+
+
+class _Models:
+    def __init__(self, client: "LeanOpenAIClient"):
+        self.client = client
+
+    def retrieve(self, model: str, **kwargs) -> Dict[str, Any]:
+        return self.client.request("GET", f"/models/{quote(model)}")
+
+
+class LeanOpenAIClient:
+    """
+    openai.OpenAI 대체 (embeddings.create / models.retrieve만)
+
+    429/5xx/연결 오류는 max_retries회까지 짧은 백오프 후 재시도 (SDK 기본 동작과 같은 대상)
+    """
+
+    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", timeout: float = 3.0,
+                 max_retries: int = 1, max_connections: int = 5, keepalive_seconds: float = 300.0):
+        self.pool = HTTPConnectionPool(base_url, timeout=timeout, max_size=max_connections, keepalive_seconds=keepalive_seconds)
+        self.max_retries = max_retries
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+        }
+        self.embeddings = _Embeddings(self)
+        self.models = _Models(self)
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        for attempt in range(self.max_retries + 1):
+            try:
+                status, raw = self.pool.request(method, path, body=data, headers=self._headers)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt < self.max_retries:
+                    logger.warning(f"⚠️ OpenAI request retry {attempt + 1}/{self.max_retries}: {e}")
+                    time.sleep(0.2 * (2 ** attempt))
+                    continue
+                raise
+            if (status == 429 or status >= 500) and attempt < self.max_retries:
+                logger.warning(f"⚠️ OpenAI request retry {attempt + 1}/{self.max_retries}: HTTP {status}")
+                time.sleep(0.2 * (2 ** attempt))
+                continue
+            return _decode(status, raw)
@@ -0,0 +1,376 @@
+"""
+프로세스 내 양자화 벡터 인덱스 (match_benefits의 로컬 대체)
+
+benefit_embeddings(WELFARE, 활성 혜택)의 벡터를 float16 또는 int8로 양자화하여
+하나의 스냅샷 파일로 저장하고, Lambda에서는 np.memmap으로 열어 NumPy로 top-k를 계산합니다.
+DB 벡터 검색 왕복(및 그 지연 편차)을 요청 경로에서 제거하는 것이 목적입니다.
+
+스냅샷 파일 구조 (little-endian):
+    MAGIC(8) | header_len(uint32) | header(JSON, utf-8) | padding | arrays...
+
+    header.arrays: 배열별 {dtype, shape, offset} (offset은 데이터 영역 기준, 64바이트 정렬)
+      - codes  : (N, D) float16 또는 int8  - 단위 벡터의 양자화 값
+      - scales : (N,)   float32            - int8 역양자화 배율 (float16은 1.0)
+      - norms  : (N,)   float32            - 역양자화 벡터의 L2 norm (코사인 보정용)
+      - rows   : (N,)   int32              - 벡터 → header.benefits 인덱스
+    header.benefits: match_benefits 반환 컬럼 + 필터 컬럼(source_api)
+
+유사도는 match_benefits와 동일하게 1 - cosine_distance 이며,
+양자화 오차(float16 ≈ 1e-3, int8 ≈ 1e-2) 범위 안에서 같은 값을 보고합니다.
+"""
+import os
+import json
+import time
+import struct
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+# numpy는 첫 사용 시 import (모듈 로딩 = Cold Start 시간에 넣지 않음, 없으면 인덱스 비활성화)
+np = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"TTOKVEC1"
+SNAPSHOT_FILENAME = "vector_snapshot.bin"
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), SNAPSHOT_FILENAME)
+ALIGNMENT = 64
+KST = timezone(timedelta(hours=9))
+
+# match_benefits가 반환하는 혜택 컬럼 (similarity 제외)
+BENEFIT_COLUMNS = [
+    "id", "serv_nm", "srv_pvsn_nm", "ctpv_nm", "sgg_nm",
+    "trgter_indvdl_nm_array", "life_nm_array", "serv_dgst",
+    "enfc_end_ymd", "serv_dtl_link",
+]
+# 스냅샷에만 필요한 필터 컬럼
+FILTER_COLUMNS = ["source_api"]
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+
+def numpy_available() -> bool:
+    return _load_numpy() is not None
+
+
+def _quantize(unit_vectors, dtype: str):
+    """단위 벡터 행렬 → (codes, scales, norms)"""
+    if dtype == "float16":
+        codes = unit_vectors.astype(np.float16)
+        scales = np.ones(len(unit_vectors), dtype=np.float32)
+        dequantized = codes.astype(np.float32)
+    elif dtype == "int8":
+        max_abs = np.abs(unit_vectors).max(axis=1)
+        scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(unit_vectors / scales[:, None]), -127, 127).astype(np.int8)
+        dequantized = codes.astype(np.float32) * scales[:, None]
+    else:
+        raise ValueError(f"Unsupported snapshot dtype: {dtype}")
+    norms = np.linalg.norm(dequantized, axis=1).astype(np.float32)
+    norms[norms == 0] = 1.0
+    return codes, scales, norms
+
+
+def write_snapshot(
+    path: str,
+    embeddings: List[List[float]],
+    benefit_rows: List[int],
+    benefits: List[Dict[str, Any]],
+    dtype: str = "float16",
+    data_version: Optional[int] = None,
+    model: str = "text-embedding-3-small",
+) -> Dict[str, Any]:
+    """
+    스냅샷 파일 작성 (임시 파일 작성 후 rename)
+
+    Args:
+        embeddings: 청크 벡터 목록 (N x D)
+        benefit_rows: 각 벡터가 가리키는 benefits 인덱스 (N)
+        benefits: 혜택 메타데이터 (BENEFIT_COLUMNS + FILTER_COLUMNS)
+        dtype: 'float16' 또는 'int8'
+        data_version: 스냅샷 기준 data_versions('benefits') 버전
+
+    Returns:
+        작성된 헤더 (arrays 제외 요약)
+    """
+    if _load_numpy() is None:
+        raise RuntimeError("numpy is required to write a vector snapshot")
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if len(vectors) == 0:
+        raise ValueError("Cannot write an empty vector snapshot")
+    if vectors.ndim != 2 or len(vectors) != len(benefit_rows):
+        raise ValueError("embeddings must be an (N, D) matrix aligned with benefit_rows")
+    lengths = np.linalg.norm(vectors, axis=1)
+    lengths[lengths == 0] = 1.0
+    codes, scales, norms = _quantize(vectors / lengths[:, None], dtype)
+
+    arrays = {
+        "codes": codes,
+        "scales": scales,
+        "norms": norms,
+        "rows": np.asarray(benefit_rows, dtype=np.int32),
+    }
+    header = {
+        "model": model,
+        "dtype": dtype,
+        "count": int(len(vectors)),
+        "dimensions": int(vectors.shape[1]),
+        "data_version": data_version,
+        "created_at": datetime.now(KST).isoformat(),
+        "benefits": benefits,
+        "arrays": {},
+    }
+
+    # offset은 데이터 영역(헤더 뒤 정렬 위치) 기준이라 헤더 길이와 무관
+    offset = 0
+    for name, arr in arrays.items():
+        header["arrays"][name] = {"dtype": str(arr.dtype), "shape": list(arr.shape), "offset": offset}
+        offset = _align(offset + arr.nbytes)
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = _data_start(len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.write(b"\0" * (data_start + header["arrays"][name]["offset"] - f.tell()))
+            f.write(np.ascontiguousarray(arr).tobytes())
+    os.replace(tmp_path, path)
+
+    summary = {k: v for k, v in header.items() if k not in ("benefits", "arrays")}
+    summary["benefit_count"] = len(benefits)
+    summary["bytes"] = os.path.getsize(path)
+    return summary
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _data_start(header_len: int) -> int:
+    return _align(len(SNAPSHOT_MAGIC) + 4 + header_len)
+
+
+class VectorIndex:
+    """메모리 매핑된 스냅샷 위의 brute-force 코사인 top-k 검색"""
+
+    def __init__(self, path: str, block_rows: Optional[int] = None):
+        if _load_numpy() is None:
+            raise RuntimeError("numpy is not installed")
+
+        self.path = path
+        self.block_rows = block_rows or int(os.getenv("VECTOR_INDEX_BLOCK_ROWS", "8192"))
+
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                raise ValueError(f"Not a vector snapshot: {path}")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        self.model = header["model"]
+        self.dtype = header["dtype"]
+        self.count = header["count"]
+        self.dimensions = header["dimensions"]
+        self.data_version = header.get("data_version")
+        self.created_at = header.get("created_at")
+        self.benefits: List[Dict[str, Any]] = header["benefits"]
+
+        data_start = _data_start(header_len)
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r", offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+        self.codes = arrays["codes"]
+        # 작은 보조 배열은 메모리에 올려둠
+        self.scales = np.asarray(arrays["scales"], dtype=np.float32)
+        self.norms = np.asarray(arrays["norms"], dtype=np.float32)
+        self.rows = np.asarray(arrays["rows"], dtype=np.int32)
+
+        # 필터 평가용 혜택 컬럼 사전 계산
+        self._ctpv = [b.get("ctpv_nm") for b in self.benefits]
+        self._sgg = [b.get("sgg_nm") for b in self.benefits]
+        self._national = [b.get("source_api") == "NATIONAL" for b in self.benefits]
+        self._targets = [frozenset(b.get("trgter_indvdl_nm_array") or []) for b in self.benefits]
+        self._lives = [frozenset(b.get("life_nm_array") or []) for b in self.benefits]
+        self._end_dates = [b.get("enfc_end_ymd") for b in self.benefits]
+
+        self._mask_cache: Dict[Tuple, Any] = {}
+        self._mask_lock = threading.Lock()
+
+    # ------------------------------------------------
+    # Filters (match_benefits와 동일한 조건)
+    # ------------------------------------------------
+
+    def _benefit_eligible(self, i: int, ctpv: Optional[str], sgg: Optional[str], lives: frozenset, targets: frozenset, today: str) -> bool:
+        # 유효 기간 (종료일 없음 또는 오늘 이후)
+        end = self._end_dates[i]
+        if end and end < today:
+            return False
+
+        # 지역 (중앙부처는 지역 무관)
+        if not self._national[i]:
+            b_ctpv, b_sgg = self._ctpv[i], self._sgg[i]
+            region_ok = (
+                (b_ctpv is None and b_sgg is None)
+                or (b_ctpv == ctpv and b_sgg is None)
+                or (b_ctpv == ctpv and b_sgg == sgg)
+            )
+            if not region_ok:
+                return False
+
+        # 대상 특성: 서비스 대상이 있으면 사용자 대상과 겹쳐야 함
+        b_targets = self._targets[i]
+        if b_targets and not (targets and b_targets & targets):
+            return False
+
+        # 생애주기: 어느 한쪽이 비어 있으면 통과
+        b_lives = self._lives[i]
+        if b_lives and lives and not (b_lives & lives):
+            return False
+
+        return True
+
+    def _eligible_rows(self, ctpv: Optional[str], sgg: Optional[str], life_cycle: List[str], target_group: List[str]):
+        """프로필 조건을 만족하는 벡터 행 번호 (세그먼트 + 날짜 단위 캐시)"""
+        today = datetime.now(KST).date().isoformat()
+        lives = frozenset(life_cycle or [])
+        targets = frozenset(target_group or [])
+        key = (ctpv, sgg, lives, targets, today)
+
+        with self._mask_lock:
+            cached = self._mask_cache.get(key)
+        if cached is not None:
+            return cached
+
+        benefit_ok = np.fromiter(
+            (self._benefit_eligible(i, ctpv, sgg, lives, targets, today) for i in range(len(self.benefits))),
+            dtype=bool,
+            count=len(self.benefits),
+        )
+        row_ids = np.flatnonzero(benefit_ok[self.rows]) if len(self.benefits) else np.empty(0, dtype=np.int64)
+
+        with self._mask_lock:
+            if len(self._mask_cache) >= 128:
+                self._mask_cache.clear()
+            self._mask_cache[key] = row_ids
+        return row_ids
+
+    # ------------------------------------------------
+    # Search
+    # ------------------------------------------------
+
+    def search(
+        self,
+        query_embedding: List[float],
+        match_threshold: float,
+        match_count: int,
+        ctpv: Optional[str],
+        sgg: Optional[str],
+        life_cycle: List[str],
+        target_group: List[str],
+    ) -> List[Dict[str, Any]]:
+        """
+        match_benefits와 같은 형식의 결과 반환 (혜택 단위 - 혜택당 가장 유사한 청크, 유사도 내림차순)
+
+        Returns:
+            혜택 컬럼 + similarity 딕셔너리 목록 (서로 다른 혜택 최대 match_count개)
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.dimensions,):
+            raise ValueError(f"Query dimension mismatch: {query.shape} != ({self.dimensions},)")
+        q_norm = float(np.linalg.norm(query))
+        if q_norm == 0 or match_count <= 0:
+            return []
+        query = query / q_norm
+
+        row_ids = self._eligible_rows(ctpv, sgg, life_cycle, target_group)
+        if len(row_ids) == 0:
+            return []
+
+        # 블록 단위로 역양자화하여 메모리 사용량 제한
+        sims = np.empty(len(row_ids), dtype=np.float32)
+        for start in range(0, len(row_ids), self.block_rows):
+            block = row_ids[start:start + self.block_rows]
+            sims[start:start + len(block)] = self.codes[block].astype(np.float32) @ query
+        sims *= self.scales[row_ids] / self.norms[row_ids]
+
+        passed = np.flatnonzero(sims > match_threshold)
+
+        # 상위 청크를 유사도 순으로 훑으며 혜택당 첫 청크(= 최고 유사도)만 사용
+        # 서로 다른 혜택이 모자라면 후보를 늘려 다시 (match_benefits와 같은 방식)
+        take = min(len(passed), match_count * 3)
+        while True:
+            top = passed if take >= len(passed) else passed[np.argpartition(-sims[passed], take - 1)[:take]]
+            top = top[np.argsort(-sims[top], kind="stable")]
+
+            results = []
+            seen = set()
+            for idx in top:
+                benefit_row = int(self.rows[row_ids[idx]])
+                if benefit_row in seen:
+                    continue
+                seen.add(benefit_row)
+                benefit = self.benefits[benefit_row]
+                item = {col: benefit.get(col) for col in BENEFIT_COLUMNS}
+                item["similarity"] = float(sims[idx])
+                results.append(item)
+                if len(results) >= match_count:
+                    break
+
+            if len(results) >= match_count or take >= len(passed):
+                return results
+            take = min(len(passed), take * 4)
+
+
+_INDEX: Optional[VectorIndex] = None
+_INDEX_LOCK = threading.Lock()
+_INDEX_FAILED = False
+
+
+def load_vector_index(path: Optional[str] = None) -> Optional[VectorIndex]:
+    """
+    컨테이너당 한 번 스냅샷을 연다 (실패/파일 없음이면 None, 이후 재시도하지 않음)
+
+    경로: 인자 → VECTOR_SNAPSHOT_PATH → 모듈 옆 vector_snapshot.bin
+    """
+    global _INDEX, _INDEX_FAILED
+    if _INDEX is not None or _INDEX_FAILED:
+        return _INDEX
+
+    with _INDEX_LOCK:
+        if _INDEX is not None or _INDEX_FAILED:
+            return _INDEX
+
+        path = path or os.getenv("VECTOR_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        if _load_numpy() is None:
+            logger.warning("⚠️ Vector index disabled: numpy is not installed")
+            _INDEX_FAILED = True
+            return None
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Vector index disabled: snapshot not found ({path})")
+            _INDEX_FAILED = True
+            return None
+
+        try:
+            start = time.time()
+            _INDEX = VectorIndex(path)
+            logger.info(
+                f"🧭 Vector index loaded: {_INDEX.count} vectors / {len(_INDEX.benefits)} benefits "
+                f"({_INDEX.dtype}, version={_INDEX.data_version}, {time.time() - start:.3f}s)"
+            )
+        except Exception as e:
+            logger.error(f"Failed to load vector snapshot {path}: {e}")
+            _INDEX_FAILED = True
+        return _INDEX
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+혜택 응답 카드 일괄 렌더링 스크립트
+
+수집기는 저장 시점에 benefits.render_card를 채우지만, 아래 경우에는 이 스크립트로 다시 렌더링합니다.
+- 기존 데이터 (render_card 컬럼 추가 이전 수집분)
+- data_collector Lambda가 일부 컬럼만 갱신하여 카드가 비워진 혜택
+- card_renderer.CARD_RENDER_VERSION 변경 (카드 형식 변경)
+
+사용법:
+    python scripts/cards/render_benefit_cards.py          # 비어 있거나 버전이 다른 카드만
+    python scripts/cards/render_benefit_cards.py --all    # 전체 재렌더링
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add repo root to path for backend.common imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.common.card_renderer import render_card, CARD_RENDER_VERSION
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+PAGE_SIZE = 500
+MAX_WORKERS = 8
+
+CARD_SOURCE_COLUMNS = "id, serv_nm, ctpv_nm, sgg_nm, trgter_indvdl_nm_array, life_nm_array, serv_dgst, enfc_end_ymd, serv_dtl_link, render_card"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render Kakao response cards for benefits")
+    parser.add_argument("--all", action="store_true", help="Re-render every active benefit")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        logger.error("Supabase credentials missing.")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+    def update_card(row):
+        try:
+            supabase.table("benefits").update({"render_card": render_card(row)}).eq("id", row["id"]).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Card update failed for {row['id']}: {e}")
+            return False
+
+    start = time.time()
+    rendered = 0
+    skipped = 0
+    failed = 0
+    page = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        while True:
+            res = supabase.table("benefits").select(CARD_SOURCE_COLUMNS) \
+                .eq("is_active", True) \
+                .order("id") \
+                .range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE - 1) \
+                .execute()
+            rows = res.data
+
+            targets = [
+                row for row in rows
+                if args.all or not row.get("render_card") or row["render_card"].get("v") != CARD_RENDER_VERSION
+            ]
+            skipped += len(rows) - len(targets)
+            for ok in executor.map(update_card, targets):
+                if ok:
+                    rendered += 1
+                else:
+                    failed += 1
+
+            logger.info(f"Page {page}: {len(targets)}/{len(rows)} cards rendered")
+            if len(rows) < PAGE_SIZE:
+                break
+            page += 1
+
+    logger.info(f"✅ Cards rendered: {rendered}, skipped: {skipped}, failed: {failed} (v{CARD_RENDER_VERSION}, took {time.time() - start:.1f}s)")
+
+    # Output for pipeline parsing
+    print(f"\n__PIPELINE_RESULT__:{json.dumps({'rendered': rendered, 'skipped': skipped, 'failed': failed})}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from dotenv import load_dotenv
 # Add parent directory to path to import common modules if needed
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from scripts.utils.data_version import bump_data_version
+from backend.common.card_renderer import render_card
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -366,6 +369,9 @@ def main():
             "updated_at": get_now_kst()
         }
         
+        # 응답 카드 사전 렌더링 (웹훅은 조립만)
+        cleaned_data["render_card"] = render_card(cleaned_data)
+        
         # 9. Upsert to Supabase
         max_retries = 5
         retry_delay = 1
@@ -488,6 +494,9 @@ def main():
     else:
         logger.info("No items to soft delete.")
 
+    # 데이터 버전 증가 (Lambda Whitelist 캐시 무효화)
+    bump_data_version(supabase)
+
     # Final Summary
     logger.info("")
     logger.info("="*60)
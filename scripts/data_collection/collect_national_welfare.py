@@ -12,6 +12,9 @@ import os
 # Add parent directory to path to allow importing modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from scripts.utils.data_version import bump_data_version
+from backend.common.card_renderer import render_card
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -387,6 +390,9 @@ def main():
             "related_links": related_links
         }
         
+        # 응답 카드 사전 렌더링 (웹훅은 조립만)
+        db_data["render_card"] = render_card(db_data)
+        
         # Upsert
         max_retries = 5
         retry_delay = 1
@@ -448,6 +454,9 @@ def main():
         logger.info(f"Page {page} complete. Success: {page_success}, Failed: {page_failed}")
         page += 1  # Move to next page
     
+    # Step 3: 데이터 버전 증가 (Lambda Whitelist 캐시 무효화)
+    bump_data_version(supabase)
+    
     # Final Summary
     logger.info("")
     logger.info("="*60)
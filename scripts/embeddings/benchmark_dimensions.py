@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+축소 차원(Matryoshka) 벡터 검색 벤치마크
+
+1536차원 match_benefits 결과를 정답으로 두고, 256/512/768차원 match_benefits_reduced의
+recall@k / RPC 지연시간 / 요청 페이로드 크기 / HNSW 인덱스 크기를 비교합니다.
+(재정렬 없음 vs 1536차원 재정렬)
+
+사용법:
+    python scripts/embeddings/benchmark_dimensions.py
+    python scripts/embeddings/benchmark_dimensions.py --ctpv 전라남도 --sgg 진도군 --life 노년 --repeat 10
+    python scripts/embeddings/benchmark_dimensions.py --queries "노인 일자리" "기초연금" --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import statistics
+from dotenv import load_dotenv
+from supabase import create_client
+from openai import OpenAI
+
+# Add repo root to path for backend.common imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.common.embedding_config import EMBEDDING_MODEL, FULL_EMBEDDING_DIMENSIONS, SUPPORTED_DIMENSIONS, truncate_embedding
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERIES = [
+    "맞춤 혜택 추천",
+    "노인 일자리",
+    "기초연금 신청",
+    "출산 지원금",
+    "장애인 활동 지원",
+    "청년 월세 지원",
+    "저소득층 의료비",
+    "한부모 가정 양육비",
+    "어르신 돌봄 서비스",
+    "난방비 지원",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_rpc(supabase, name, params, repeat):
+    """RPC를 repeat번 호출하여 (마지막 결과, 지연시간 ms 목록) 반환"""
+    latencies = []
+    data = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = supabase.rpc(name, params).execute().data or []
+        latencies.append((time.perf_counter() - start) * 1000)
+    return data, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reduced-dimension vector search (recall vs latency vs memory)")
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--ctpv", default="서울특별시")
+    parser.add_argument("--sgg", default="종로구")
+    parser.add_argument("--life", nargs="*", default=[])
+    parser.add_argument("--target", nargs="*", default=[])
+    parser.add_argument("--k", type=int, default=20, help="recall@k")
+    parser.add_argument("--candidates", type=int, default=150, help="Rerank candidate count")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per query/config for latency")
+    parser.add_argument("--output", help="Write raw results as JSON")
+    args = parser.parse_args()
+
+    supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"])
+    openai_client = OpenAI(api_key=os.environ["OPENAI_API_KEY"])
+
+    base_params = {
+        "match_threshold": 0.0,  # recall 비교를 위해 threshold 없이 top-k만 비교
+        "match_count": args.k,
+        "p_ctpv": args.ctpv,
+        "p_sgg": args.sgg,
+        "p_life_array": args.life,
+        "p_target_array": args.target,
+    }
+
+    configs = [("full", FULL_EMBEDDING_DIMENSIONS, False)]
+    for dims in SUPPORTED_DIMENSIONS:
+        if dims < FULL_EMBEDDING_DIMENSIONS:
+            configs.append((f"{dims}", dims, False))
+            configs.append((f"{dims}+rerank", dims, True))
+
+    results = {name: {"recall": [], "latency_ms": [], "payload_bytes": []} for name, _, _ in configs}
+
+    for query in args.queries:
+        embedding = openai_client.embeddings.create(
+            model=EMBEDDING_MODEL, input=query, dimensions=FULL_EMBEDDING_DIMENSIONS
+        ).data[0].embedding
+
+        truth_ids = None
+        for name, dims, rerank in configs:
+            if dims == FULL_EMBEDDING_DIMENSIONS:
+                rpc_name = "match_benefits"
+                params = dict(base_params, query_embedding=embedding)
+            else:
+                rpc_name = "match_benefits_reduced"
+                params = dict(
+                    base_params,
+                    query_embedding=truncate_embedding(embedding, dims),
+                    rerank_embedding=embedding if rerank else None,
+                    candidate_count=args.candidates if rerank else args.k,
+                )
+
+            data, latencies = timed_rpc(supabase, rpc_name, params, args.repeat)
+            ids = [row["id"] for row in data[:args.k]]
+            if truth_ids is None:
+                truth_ids = set(ids)
+
+            recall = len(truth_ids & set(ids)) / len(truth_ids) if truth_ids else 1.0
+            results[name]["recall"].append(recall)
+            results[name]["latency_ms"].extend(latencies)
+            results[name]["payload_bytes"].append(len(json.dumps(params)))
+
+        logger.info(f"✅ '{query}' done")
+
+    try:
+        index_sizes = {row["index_name"]: row["size_bytes"] for row in supabase.rpc("embedding_index_sizes", {}).execute().data}
+    except Exception as e:
+        logger.warning(f"⚠️ Index size lookup failed: {e}")
+        index_sizes = {}
+
+    def index_size_mb(dims):
+        suffix = "" if dims == FULL_EMBEDDING_DIMENSIONS else f"_{dims}"
+        size = index_sizes.get(f"idx_benefit_embeddings_vector_welfare{suffix}")
+        return f"{size / 1024 / 1024:.1f}" if size is not None else "N/A"
+
+    print("")
+    print(f"Profile: {args.ctpv} {args.sgg} life={args.life} target={args.target} | queries={len(args.queries)} k={args.k} repeat={args.repeat}")
+    print(f"{'config':<14} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8} {'payload B':>10} {'index MB':>9}")
+    print("-" * 62)
+    for name, dims, _ in configs:
+        r = results[name]
+        print(
+            f"{name:<14} {statistics.mean(r['recall']):>9.3f} "
+            f"{percentile(r['latency_ms'], 50):>8.1f} {percentile(r['latency_ms'], 95):>8.1f} "
+            f"{int(statistics.mean(r['payload_bytes'])):>10} {index_size_mb(dims):>9}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results, "index_sizes": index_sizes}, f, ensure_ascii=False, indent=2)
+        logger.info(f"Raw results written: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
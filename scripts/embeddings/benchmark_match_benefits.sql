@@ -0,0 +1,134 @@
+-- ============================================
+-- match_benefits 필터 벡터 검색 벤치마크 (합성 100k 청크)
+-- ============================================
+--
+-- 기존 형태(WHERE similarity > threshold + ORDER BY similarity)와 현재 match_benefits
+-- (ORDER BY 거리 + LIMIT, HNSW iterative scan)를 같은 합성 데이터에서 EXPLAIN ANALYZE로 비교합니다.
+-- 25k → 50k → 75k → 100k 청크로 늘려가며 측정하므로, 코퍼스가 커져도 지연시간이 평평한지 볼 수 있습니다.
+--
+-- ⚠️ 운영 DB에서 실행하지 마세요. benefits/benefit_embeddings에 'BENCH' 행을 넣습니다.
+--    로컬 Supabase(supabase start) 또는 빈 Postgres + pgvector(>= 0.8, iterative scan)에 schema.sql을 적용한 뒤 실행합니다.
+--
+-- 사용법:
+--    psql "$BENCH_DATABASE_URL" -f supabase/schema.sql
+--    psql "$BENCH_DATABASE_URL" -f scripts/embeddings/benchmark_match_benefits.sql 2>&1 | tee match_benefits_bench.txt
+--
+-- 결과에서 확인할 것:
+--    - 현재 형태: "Index Scan using idx_benefit_embeddings_vector_welfare" + "Order By: (embedding <=> ...)",
+--      Execution Time이 단계별로 거의 같음, 반환 행 수 = match_count (iterative scan)
+--    - 파티션 형태: Merge Append 아래 benefit_embeddings_seoul / benefit_embeddings_national 인덱스 스캔 2개만
+--      (다른 시도 파티션은 계획에서 제외됨)
+--    - 기존 형태: benefit_embeddings 전체에 대한 Seq Scan/Sort (단계마다 실행 시간이 청크 수에 비례)
+
+\set ON_ERROR_STOP on
+\set benefits_per_stage 5000
+\set chunks_per_benefit 5
+\set match_count 50
+\set threshold 0.35
+
+set maintenance_work_mem = '1GB';
+
+-- --------------------------------------------
+-- 합성 데이터 생성 함수 (세션 종료 시 삭제)
+-- --------------------------------------------
+
+-- 주제 중심 벡터 200개 + 잡음 → 실제 임베딩처럼 주제별로 뭉친 분포 (같은 주제 유사도 ~0.7, 다른 주제 ~0)
+create temp table bench_topics as
+select t.id, null::vector(1536) as centroid
+from generate_series(0, 199) as t(id);
+
+create function pg_temp.bench_random_vector()
+returns vector(1536)
+language plpgsql
+volatile
+as $$
+begin
+  return l2_normalize(array(select random() * 2 - 1 from generate_series(1, 1536))::vector(1536));
+end;
+$$;
+
+create function pg_temp.bench_noisy(p_centroid vector(1536), p_scale float)
+returns vector(1536)
+language plpgsql
+volatile
+as $$
+begin
+  return l2_normalize(array(select c + (random() * 2 - 1) * p_scale from unnest(p_centroid::real[]) c)::vector(1536));
+end;
+$$;
+
+update bench_topics set centroid = pg_temp.bench_random_vector();
+
+-- 혜택 p_count개 + 혜택당 p_chunks개 청크 추가
+-- 지역/대상/생애주기 분포: 중앙부처 25%, 시도 단위 20%, 시군구 단위 55% / 대상 지정 40% / 생애주기 지정 50%
+create function pg_temp.bench_insert(p_count int, p_chunks int)
+returns void
+language plpgsql
+as $$
+declare
+  v_offset int;
+  v_sido text[] := array['서울특별시', '부산광역시', '대구광역시', '인천광역시', '광주광역시', '대전광역시', '울산광역시',
+                         '세종특별자치시', '경기도', '강원특별자치도', '충청북도', '충청남도', '전북특별자치도',
+                         '전라남도', '경상북도', '경상남도', '제주특별자치도'];
+begin
+  select count(*) into v_offset from benefits where serv_id like 'BENCH%';
+
+  insert into benefits (serv_id, serv_nm, source_api, ctpv_nm, sgg_nm, trgter_indvdl_nm_array, life_nm_array, content_hash, is_active)
+  select
+    'BENCH' || lpad((v_offset + i)::text, 8, '0'),
+    '합성 혜택 ' || (v_offset + i),
+    case when i % 4 = 0 then 'NATIONAL' else 'LOCAL' end,
+    case when i % 4 = 0 then null else v_sido[1 + (i % 17)] end,
+    case when i % 4 = 0 or i % 5 = 0 then null else 'bench-sgg-' || (i % 10) end,
+    case when i % 5 < 2 then array[(array['저소득', '장애인', '한부모·조손'])[1 + (i % 3)]] else null end,
+    case when i % 2 = 0 then array[(array['노년', '중장년', '청년', '아동'])[1 + (i % 4)]] else null end,
+    'bench',
+    true
+  from generate_series(1, p_count) as g(i);
+
+  insert into benefit_embeddings (category, benefit_id, embedding, content_chunk, chunk_index, region_key)
+  select 'WELFARE', b.id, pg_temp.bench_noisy(t.centroid, 0.03), 'bench', c.idx, embedding_region_key(b.source_api, b.ctpv_nm)
+  from benefits b
+  cross join generate_series(0, p_chunks - 1) as c(idx)
+  join bench_topics t on t.id = (b.id % 200)
+  where b.serv_id like 'BENCH%'
+    and b.serv_id > ('BENCH' || lpad(v_offset::text, 8, '0'));
+end;
+$$;
+
+-- 고정 쿼리 벡터 (주제 7 근처)
+select pg_temp.bench_noisy(centroid, 0.03)::text as q from bench_topics where id = 7 \gset
+
+-- ============================================
+-- 단계 1~4: 25k / 50k / 75k / 100k 청크
+-- ============================================
+\timing on
+
+\echo '=== stage 1: 25k chunks ==='
+select pg_temp.bench_insert(:benefits_per_stage, :chunks_per_benefit);
+analyze benefits;
+analyze benefit_embeddings;
+\ir benchmark_match_benefits_queries.sql
+
+\echo '=== stage 2: 50k chunks ==='
+select pg_temp.bench_insert(:benefits_per_stage, :chunks_per_benefit);
+analyze benefits;
+analyze benefit_embeddings;
+\ir benchmark_match_benefits_queries.sql
+
+\echo '=== stage 3: 75k chunks ==='
+select pg_temp.bench_insert(:benefits_per_stage, :chunks_per_benefit);
+analyze benefits;
+analyze benefit_embeddings;
+\ir benchmark_match_benefits_queries.sql
+
+\echo '=== stage 4: 100k chunks ==='
+select pg_temp.bench_insert(:benefits_per_stage, :chunks_per_benefit);
+analyze benefits;
+analyze benefit_embeddings;
+\ir benchmark_match_benefits_queries.sql
+
+\timing off
+
+-- 정리 (벤치마크 DB를 계속 쓸 경우)
+-- delete from benefits where serv_id like 'BENCH%';
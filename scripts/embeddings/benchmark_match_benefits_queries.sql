@@ -0,0 +1,93 @@
+-- benchmark_match_benefits.sql의 단계별 측정 쿼리 (\ir로 포함, 단독 실행 불가 - :q 등 psql 변수 필요)
+-- 프로필: 서울특별시 bench-sgg-3 / 노년 / 저소득 (세그먼트 인덱스가 없으므로 benefit_profile_match 경로)
+
+select count(*) as welfare_chunks from benefit_embeddings where category = 'WELFARE';
+
+\echo '--- 기존 형태: WHERE similarity > threshold + ORDER BY similarity ---'
+explain (analyze, buffers, costs off)
+select b.id, (1 - (be.embedding <=> :'q'::vector(1536)))::float as similarity
+from benefit_embeddings be
+join benefits b on be.benefit_id = b.id
+where be.category = 'WELFARE'
+  and 1 - (be.embedding <=> :'q'::vector(1536)) > :threshold
+  and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date)
+  and b.is_active = true
+  and benefit_profile_match(
+        case when b.source_api = 'NATIONAL' then null else b.ctpv_nm end,
+        case when b.source_api = 'NATIONAL' then null else b.sgg_nm end,
+        b.trgter_indvdl_nm_array, b.life_nm_array,
+        '서울특별시', 'bench-sgg-3', array['노년'], array['저소득'])
+order by similarity desc
+limit :match_count;
+
+\echo '--- 현재 형태: ORDER BY 거리 + LIMIT (iterative scan), 청크 필터 컬럼만 사용 (benefits 조인 없음) ---'
+begin;
+select set_vector_scan_options(:match_count);
+explain (analyze, buffers, costs off)
+with candidates as materialized (
+  select be.benefit_id, be.embedding <=> :'q'::vector(1536) as distance
+  from benefit_embeddings be
+  where be.category = 'WELFARE'
+    and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+    and be.is_active = true
+    and benefit_profile_match(
+          case when be.source_api = 'NATIONAL' then null else be.ctpv_nm end,
+          case when be.source_api = 'NATIONAL' then null else be.sgg_nm end,
+          be.trgter_indvdl_nm_array, be.life_nm_array,
+          '서울특별시', 'bench-sgg-3', array['노년'], array['저소득'])
+  order by be.embedding <=> :'q'::vector(1536)
+  limit :match_count
+)
+select c.benefit_id, (1 - c.distance)::float as similarity
+from candidates c
+where 1 - c.distance > :threshold
+order by c.distance
+limit :match_count;
+commit;
+
+\echo '--- 파티션 형태: 사용자 시도 + NATIONAL 파티션만 (match_benefits와 같은 조건) ---'
+begin;
+select set_vector_scan_options(:match_count);
+explain (analyze, buffers, costs off)
+select be.benefit_id, (1 - (be.embedding <=> :'q'::vector(1536)))::float as similarity
+from benefit_embeddings be
+where be.category = 'WELFARE'
+  and be.region_key = any(array['NATIONAL', '서울특별시'])
+  and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+  and be.is_active = true
+  and benefit_profile_match(
+        case when be.source_api = 'NATIONAL' then null else be.ctpv_nm end,
+        case when be.source_api = 'NATIONAL' then null else be.sgg_nm end,
+        be.trgter_indvdl_nm_array, be.life_nm_array,
+        '서울특별시', 'bench-sgg-3', array['노년'], array['저소득'])
+order by be.embedding <=> :'q'::vector(1536)
+limit :match_count;
+commit;
+
+\echo '--- iterative scan 끔 (ef_search 기본값만): 필터 때문에 match_count보다 적게 반환되는지 ---'
+begin;
+set local hnsw.iterative_scan = off;
+select count(*) as rows_without_iterative_scan
+from (
+  select be.benefit_id
+  from benefit_embeddings be
+  join benefits b on be.benefit_id = b.id
+  where be.category = 'WELFARE'
+    and b.is_active = true
+    and benefit_profile_match(
+          case when b.source_api = 'NATIONAL' then null else b.ctpv_nm end,
+          case when b.source_api = 'NATIONAL' then null else b.sgg_nm end,
+          b.trgter_indvdl_nm_array, b.life_nm_array,
+          '서울특별시', 'bench-sgg-3', array['노년'], array['저소득'])
+  order by be.embedding <=> :'q'::vector(1536)
+  limit :match_count
+) t;
+commit;
+
+\echo '--- match_benefits RPC (3회, \timing 값 비교) ---'
+select count(*) as rows, round(min(similarity)::numeric, 3) as min_similarity
+from match_benefits(:'q'::vector(1536), :threshold, :match_count, '서울특별시', 'bench-sgg-3', array['노년'], array['저소득']);
+select count(*) as rows, round(min(similarity)::numeric, 3) as min_similarity
+from match_benefits(:'q'::vector(1536), :threshold, :match_count, '서울특별시', 'bench-sgg-3', array['노년'], array['저소득']);
+select count(*) as rows, round(min(similarity)::numeric, 3) as min_similarity
+from match_benefits(:'q'::vector(1536), :threshold, :match_count, '서울특별시', 'bench-sgg-3', array['노년'], array['저소득']);
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+벡터 스냅샷 내보내기 스크립트 (배포 시 실행)
+
+benefit_embeddings의 활성 WELFARE 벡터를 float16/int8로 양자화하여
+혜택 id·필터 컬럼과 함께 하나의 mmap 가능한 파일(vector_snapshot.bin)로 저장합니다.
+kakao_webhook은 RAG_VECTOR_BACKEND=local일 때 이 파일로 match_benefits를 대체합니다.
+
+사용법:
+    # build.sh가 common 모듈 복사 후 자동 실행
+    python scripts/embeddings/export_vector_snapshot.py
+
+    # int8 양자화 (파일 크기 절반, 유사도 오차 증가)
+    python scripts/embeddings/export_vector_snapshot.py --dtype int8
+
+    # 축소 차원 스냅샷 (기본값: EMBEDDING_DIMENSIONS)
+    python scripts/embeddings/export_vector_snapshot.py --dimensions 512
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add repo root to path for backend.common imports
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(REPO_ROOT)
+
+from backend.common.vector_index import write_snapshot, BENEFIT_COLUMNS, FILTER_COLUMNS, SNAPSHOT_FILENAME
+from backend.common.embedding_config import EMBEDDING_MODEL, SUPPORTED_DIMENSIONS, get_search_dimensions, truncate_embedding
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "backend", "functions", "kakao_webhook", SNAPSHOT_FILENAME)
+PAGE_SIZE = 1000
+
+
+def fetch_data_version(supabase):
+    """스냅샷 기준 버전 (내보내기 도중 버전이 올라가면 Lambda가 stale로 판단)"""
+    res = supabase.table("data_versions").select("version").eq("name", "benefits").limit(1).execute()
+    return res.data[0]["version"] if res.data else 0
+
+
+def fetch_active_benefits(supabase):
+    """활성 혜택 메타데이터 (id → row)"""
+    columns = ", ".join(BENEFIT_COLUMNS + FILTER_COLUMNS)
+    benefits = {}
+    page = 0
+    while True:
+        res = supabase.table("benefits").select(columns) \
+            .eq("is_active", True) \
+            .order("id") \
+            .range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE - 1) \
+            .execute()
+        for row in res.data:
+            benefits[row["id"]] = row
+        if len(res.data) < PAGE_SIZE:
+            break
+        page += 1
+    return benefits
+
+
+def fetch_welfare_embeddings(supabase):
+    """WELFARE 임베딩 (benefit_id, embedding) 목록"""
+    rows = []
+    page = 0
+    while True:
+        res = supabase.table("benefit_embeddings").select("id, benefit_id, embedding") \
+            .eq("category", "WELFARE") \
+            .order("id") \
+            .range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE - 1) \
+            .execute()
+        for row in res.data:
+            embedding = row["embedding"]
+            # pgvector는 PostgREST에서 '[0.1,0.2,...]' 문자열로 반환됨
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)
+            rows.append((row["benefit_id"], embedding))
+        logger.info(f"Fetched embeddings page {page} ({len(rows)} total)")
+        if len(res.data) < PAGE_SIZE:
+            break
+        page += 1
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export active WELFARE vectors to a quantized snapshot")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Snapshot path bundled into the Lambda package")
+    parser.add_argument("--dtype", choices=["float16", "int8"], default=os.environ.get("VECTOR_SNAPSHOT_DTYPE", "float16"))
+    parser.add_argument("--dimensions", type=int, choices=SUPPORTED_DIMENSIONS, default=get_search_dimensions(), help="Leading dimensions to keep (Matryoshka)")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        logger.error("Supabase credentials missing.")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+    start = time.time()
+    data_version = fetch_data_version(supabase)
+    benefits_by_id = fetch_active_benefits(supabase)
+    logger.info(f"Active benefits: {len(benefits_by_id)} (data version {data_version})")
+
+    benefits = []
+    benefit_index = {}
+    embeddings = []
+    benefit_rows = []
+    for benefit_id, embedding in fetch_welfare_embeddings(supabase):
+        benefit = benefits_by_id.get(benefit_id)
+        if benefit is None:
+            continue  # 비활성 혜택의 임베딩
+        if benefit_id not in benefit_index:
+            benefit_index[benefit_id] = len(benefits)
+            benefits.append(benefit)
+        embeddings.append(truncate_embedding(embedding, args.dimensions))
+        benefit_rows.append(benefit_index[benefit_id])
+
+    if not embeddings:
+        logger.error("❌ No active WELFARE embeddings found")
+        sys.exit(1)
+
+    summary = write_snapshot(
+        args.output,
+        embeddings,
+        benefit_rows,
+        benefits,
+        dtype=args.dtype,
+        data_version=data_version,
+        model=EMBEDDING_MODEL,
+    )
+    logger.info(f"✅ Snapshot written: {args.output} ({summary['bytes'] / 1024 / 1024:.1f} MB, took {time.time() - start:.1f}s)")
+    logger.info(f"Summary: {summary}")
+
+
+if __name__ == "__main__":
+    main()
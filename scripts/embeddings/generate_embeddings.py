@@ -10,6 +10,12 @@ from dotenv import load_dotenv
 from supabase import create_client, Client
 from openai import OpenAI
 
+# Add repo root to path for scripts.utils imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scripts.utils.data_version import bump_data_version
+from backend.common.embedding_config import EMBEDDING_MODEL, FULL_EMBEDDING_DIMENSIONS, embedding_region_key
+
 # Load environment variables
 load_dotenv()
 
@@ -50,12 +56,13 @@ def get_openai_client():
 def generate_embedding(openai_client, text):
     """
     Generate embedding using OpenAI text-embedding-3-small.
+    Always stores full dimensions; reduced columns (embedding_256/512/768) are derived in the DB.
     """
     try:
         response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
+            model=EMBEDDING_MODEL,
             input=text,
-            dimensions=1536
+            dimensions=FULL_EMBEDDING_DIMENSIONS
         )
         return response.data[0].embedding
     except Exception as e:
@@ -91,7 +98,7 @@ def compute_content_hash(content):
         return None
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-def process_single_chunk(openai_client, supabase, benefit_id, serv_id, chunk_content, chunk_index):
+def process_single_chunk(openai_client, supabase, benefit_id, serv_id, chunk_content, chunk_index, region_key):
     """
     Generate embedding for a single chunk and save to DB.
     """
@@ -104,7 +111,9 @@ def process_single_chunk(openai_client, supabase, benefit_id, serv_id, chunk_con
             # "serv_id": serv_id, # Column does not exist in benefit_embeddings table
             "content_chunk": chunk_content, # Correct column name: content_chunk
             "chunk_index": chunk_index,
-            "embedding": embedding
+            "embedding": embedding,
+            # 파티션 키를 직접 넣어 삽입 후 파티션 이동(fix_embedding_region_key)이 일어나지 않게 함
+            "region_key": region_key
         }
         
         # Retry logic for DB insert
@@ -310,7 +319,7 @@ def main():
         
         # Select all necessary columns for LLM summarization
         response = supabase.table("benefits") \
-            .select("id, serv_id, serv_nm, content_for_embedding, content_hash, ctpv_nm, sgg_nm, sprt_cyc_nm, srv_pvsn_nm, aply_mtd_nm, trgter_indvdl_nm_array, life_nm_array, target_detail, select_criteria, intrs_thema_nm_array, service_content, serv_dgst, wlfare_info_outl_cn, apply_method_detail, serv_dtl_link, enfc_bgng_ymd, enfc_end_ymd, contact_info") \
+            .select("id, serv_id, serv_nm, source_api, content_for_embedding, content_hash, ctpv_nm, sgg_nm, sprt_cyc_nm, srv_pvsn_nm, aply_mtd_nm, trgter_indvdl_nm_array, life_nm_array, target_detail, select_criteria, intrs_thema_nm_array, service_content, serv_dgst, wlfare_info_outl_cn, apply_method_detail, serv_dtl_link, enfc_bgng_ymd, enfc_end_ymd, contact_info") \
             .eq("is_active", True) \
             .range(page * limit, (page + 1) * limit - 1) \
             .execute()
@@ -403,9 +412,10 @@ def main():
                 continue
             
             # Add chunks
+            region_key = embedding_region_key(benefit.get('source_api'), benefit.get('ctpv_nm'))
             chunks = split_text(content)
             for i, chunk in enumerate(chunks):
-                tasks.append((benefit_id, serv_id, chunk, i))
+                tasks.append((benefit_id, serv_id, chunk, i, region_key))
 
         # Execute parallel tasks
         if tasks:
@@ -431,6 +441,9 @@ def main():
 
         page += 1
 
+    # 데이터 버전 증가 (Lambda Whitelist 캐시 무효화)
+    bump_data_version(supabase)
+
     logger.info("Embedding generation completed!")
     logger.info(f"Total processed chunks: {total_processed}")
     logger.info(f"Total updated benefits: {total_updated}")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+고정 발화 임베딩 사전 적재 스크립트 (배포 시 실행)
+
+kakao_webhook/app.py에 정의된 자동 검색 발화와 Quick Reply 발화의 임베딩을
+1) query_embedding_cache 테이블에 저장하고
+2) Lambda 패키지에 포함될 시드 파일(query_embedding_seed.json)로 기록합니다.
+
+사용법:
+    # build.sh가 common 모듈 복사 후 자동 실행
+    python scripts/embeddings/seed_query_cache.py
+
+    # 출력 경로 지정
+    python scripts/embeddings/seed_query_cache.py --output backend/functions/kakao_webhook/query_embedding_seed.json
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import importlib.util
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+KAKAO_WEBHOOK_DIR = os.path.join(REPO_ROOT, "backend", "functions", "kakao_webhook")
+DEFAULT_OUTPUT = os.path.join(KAKAO_WEBHOOK_DIR, "query_embedding_seed.json")
+
+
+def load_webhook_app():
+    """build.sh로 common 모듈이 복사된 kakao_webhook/app.py 로드"""
+    sys.path.insert(0, KAKAO_WEBHOOK_DIR)
+    spec = importlib.util.spec_from_file_location("kakao_app", os.path.join(KAKAO_WEBHOOK_DIR, "app.py"))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed query embedding cache with webhook preset utterances")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Seed file path bundled into the Lambda package")
+    args = parser.parse_args()
+
+    app = load_webhook_app()
+    queries = app.get_preset_search_queries()
+    logger.info(f"Preset queries: {queries}")
+
+    rag_service = app.RAGService()
+    cache = rag_service.embedding_cache
+    if cache is None:
+        logger.error("Embedding cache is disabled (EMBEDDING_CACHE_ENABLED=false)")
+        sys.exit(1)
+
+    failed = []
+    for query in queries:
+        embedding = rag_service.generate_embedding(query)
+        if embedding is None:
+            failed.append(query)
+
+    # 공유 테이블 쓰기 완료 대기
+    cache.flush()
+
+    seed = cache.export_seed(queries)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(seed, f, ensure_ascii=False)
+
+    logger.info(f"✅ Seed written: {args.output} ({len(seed['entries'])}/{len(queries)} queries)")
+    logger.info(f"Cache stats: {cache.stats}")
+
+    if failed:
+        logger.error(f"❌ Failed queries: {failed}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+카카오 콜백 URL 로컬 대역 서버
+
+콜백 모드(KAKAO_CALLBACK_MODE)에서 웹훅이 callbackUrl로 POST하는 최종 응답을 받아 출력합니다.
+카카오 콜백 API처럼 {"taskId": ..., "status": "SUCCESS"}로 응답합니다.
+
+사용법:
+    # 단독 실행 후 test_kakao_local.py의 callbackUrl을 http://127.0.0.1:8765/callback 으로
+    python scripts/kakao_callback_server.py --port 8765
+
+    # 테스트 코드에서
+    server, received = start_callback_server()
+    url = f"http://127.0.0.1:{server.server_port}/callback"
+    body = received.get(timeout=30)
+"""
+import json
+import queue
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(received):
+    class CallbackHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            try:
+                body = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                body = {"_raw": raw.decode("utf-8", errors="replace")}
+            received.put({"path": self.path, "body": body})
+
+            payload = json.dumps({"taskId": self.path.rsplit("/", 1)[-1], "status": "SUCCESS"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CallbackHandler
+
+
+def start_callback_server(port=0):
+    """
+    백그라운드 스레드로 서버 시작
+
+    Args:
+        port: 포트 (0이면 빈 포트 자동 선택 → server.server_port)
+
+    Returns:
+        (server, received queue) - 종료는 server.shutdown()
+    """
+    received = queue.Queue()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(received))
+    threading.Thread(target=server.serve_forever, name="kakao-callback-server", daemon=True).start()
+    return server, received
+
+
+def summarize(body):
+    """스킬 응답 요약 (출력 종류 + 첫 텍스트/카드 제목)"""
+    outputs = body.get("template", {}).get("outputs", [])
+    lines = []
+    for output in outputs:
+        if "simpleText" in output:
+            lines.append(f"simpleText: {output['simpleText']['text'][:80]}")
+        elif "carousel" in output:
+            items = output["carousel"].get("items", [])
+            title = items[0].get("title", "") if items else ""
+            lines.append(f"carousel: {len(items)} items (첫 카드: {title})")
+        else:
+            lines.append(", ".join(output.keys()))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Kakao callback URL")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--once", action="store_true", help="Exit after the first callback")
+    args = parser.parse_args()
+
+    server, received = start_callback_server(args.port)
+    print(f"📭 Listening on http://127.0.0.1:{server.server_port}/callback")
+    try:
+        while True:
+            item = received.get()
+            print(f"📬 Callback received ({item['path']})")
+            for line in summarize(item["body"]):
+                print(f"   - {line}")
+            if args.once:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
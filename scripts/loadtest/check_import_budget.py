@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+kakao_webhook/app.py 모듈 import 시간 측정 + 예산 검사 (Cold Start 회귀 방지)
+
+새 인터프리터에서 `python -X importtime -c "import app"`을 여러 번 실행해
+app의 누적 import 시간(중앙값)과 무거운 하위 모듈을 보여주고, 아래 조건이면 종료 코드 1로 실패합니다.
+- 중앙값이 --budget-ms를 넘음
+- 모듈 로딩 시점에 무거운 SDK(supabase, openai, httpx, pydantic, numpy, boto3, requests ...)가 import됨
+  (이 SDK들은 실제로 필요한 경로에서 lazy import해야 함 - supabase_client.py / resources.py / vector_index.py 참고)
+
+측정값은 실행 환경(CPU, 디스크 캐시, .pyc 유무)에 따라 다르므로 같은 머신에서 변경 전후를 비교하세요.
+Lambda(256MB)는 CPU가 작아 로컬보다 몇 배 느립니다.
+
+사용법:
+    cd backend && ./build.sh
+    python scripts/loadtest/check_import_budget.py
+    python scripts/loadtest/check_import_budget.py --runs 10 --budget-ms 150 --top 15
+    python scripts/loadtest/check_import_budget.py --module rag_service --output import_time.json
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+KAKAO_WEBHOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../backend/functions/kakao_webhook")
+
+# 모듈 로딩 시점에 import되면 안 되는 패키지 (최상위 패키지 이름)
+FORBIDDEN_PACKAGES = [
+    "supabase", "gotrue", "realtime", "storage3", "postgrest", "supafunc", "supabase_auth", "supabase_functions",
+    "openai", "httpx", "httpcore", "pydantic", "numpy", "boto3", "botocore", "requests",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(깊이, 모듈, self us, cumulative us)]"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append(((len(indent) - 1) // 2, module, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_once(module, env):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=KAKAO_WEBHOOK_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        tail = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise SystemExit(f"❌ import {module} failed:\n{tail[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark and budget check for the Kakao webhook")
+    parser.add_argument("--module", default="app", help="Module to import from backend/functions/kakao_webhook")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="Fail if the median cumulative import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules to list")
+    parser.add_argument("--allow", action="append", default=[], metavar="PACKAGE", help="Do not fail on this forbidden package")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Environment variable for the import")
+    parser.add_argument("--output", help="Write the JSON result to this file")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(KAKAO_WEBHOOK_DIR, f"{args.module}.py")):
+        raise SystemExit("❌ build.sh를 먼저 실행하세요")
+
+    env = dict(os.environ)
+    for pair in args.env:
+        key, _, value = pair.partition("=")
+        env[key] = value
+
+    totals_ms = []
+    cumulative_by_module = defaultdict(list)
+    imported = set()
+    for _ in range(args.runs):
+        entries = measure_once(args.module, env)
+        for depth, module, _, cumulative_us in entries:
+            cumulative_by_module[module].append(cumulative_us / 1000)
+            imported.add(module)
+        target = [cumulative_us for depth, module, _, cumulative_us in entries if depth == 0 and module == args.module]
+        totals_ms.append(target[-1] / 1000 if target else 0.0)
+
+    median_ms = statistics.median(totals_ms)
+    heaviest = sorted(
+        ((module, statistics.median(values)) for module, values in cumulative_by_module.items() if module != args.module),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+    forbidden = sorted({
+        module for module in imported
+        if module.split(".")[0] in FORBIDDEN_PACKAGES and module.split(".")[0] not in args.allow
+    })
+
+    print(f"import {args.module}: median {median_ms:.1f}ms (runs={args.runs}, min {min(totals_ms):.1f}ms, max {max(totals_ms):.1f}ms, budget {args.budget_ms:.0f}ms)")
+    print("")
+    print(f"{'module':<40} {'cumulative ms':>14}")
+    print("-" * 55)
+    for module, ms in heaviest:
+        print(f"{module:<40} {ms:>14.1f}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.1f}ms > budget {args.budget_ms:.0f}ms")
+    if forbidden:
+        failures.append(f"heavy packages imported at module load: {', '.join(forbidden[:10])}{' ...' if len(forbidden) > 10 else ''}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "runs_ms": [round(ms, 1) for ms in totals_ms],
+                "median_ms": round(median_ms, 1),
+                "budget_ms": args.budget_ms,
+                "heaviest": [{"module": module, "cumulative_ms": round(ms, 1)} for module, ms in heaviest],
+                "forbidden_imports": forbidden,
+                "failures": failures,
+            }, f, ensure_ascii=False, indent=2)
+
+    print("")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Import budget OK")
+
+
+if __name__ == "__main__":
+    main()
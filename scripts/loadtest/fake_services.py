@@ -0,0 +1,507 @@
+"""
+부하 테스트용 Supabase / OpenAI 로컬 대역 (네트워크 없음, 지연시간 주입)
+
+웹훅이 실제로 호출하는 표면만 흉내 냅니다.
+- FakeSupabase: table().select/eq/.../execute() 쿼리 빌더 + rpc()
+  (advance_onboarding, get_eligible_benefits, match_benefits, match_benefits_reduced,
+   recommend_benefits, claim_webhook_request - supabase/schema.sql과 같은 입출력)
+- FakeOpenAI: embeddings.create() (발화별로 결정적인 1536차원 벡터), models.retrieve()
+
+각 호출은 Latency 모델(기본값 + 지터 + 꼬리 지연)만큼 sleep한 뒤 응답합니다.
+RPC/테이블 이름별로 다른 지연시간을 줄 수 있습니다 (예: {"match_benefits": Latency(120)}).
+
+사용법:
+    db = FakeSupabase(Latency(30), overrides={"match_benefits": Latency(120, tail_prob=0.02, tail_ms=800)})
+    openai_client = FakeOpenAI(Latency(250))
+    SupabaseClient._instance = db
+    ContainerResources._openai_client = openai_client
+"""
+import copy
+import math
+import time
+import random
+import hashlib
+import itertools
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# 스냅샷이 없을 때 웹훅이 쓰는 시/도 이름 (region_snapshot.DEFAULT_SIDO와 동일)
+SIDO_NAMES = [
+    "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시",
+    "울산광역시", "세종특별자치시", "경기도", "충청북도", "충청남도", "전라북도",
+    "전라남도", "경상북도", "경상남도", "제주특별자치도", "강원특별자치도",
+]
+SGG_NAMES = ["중구", "동구", "서구", "남구", "북구"]
+LIFE_CYCLES = ["영유아", "아동", "청소년", "청년", "중장년", "노년"]
+TARGET_GROUPS = ["저소득층", "장애인", "한부모가족", "다자녀가족", "다문화가족", "북한이탈주민", "국가유공자"]
+PROVISION_TYPES = ["현금지급", "현물지급", "서비스", "이용권", "정보제공"]
+
+EMBEDDING_DIMENSIONS = 1536
+
+# 테이블별 기본키 (upsert on_conflict 기본값)
+PRIMARY_KEYS = {
+    "users": "kakao_user_id",
+    "benefits": "id",
+    "regions": "region_code",
+    "query_embedding_cache": "cache_key",
+    "whitelist_cache": "segment_key",
+    "search_sessions": "kakao_user_id",
+    "webhook_requests": "request_key",
+    "data_versions": "name",
+}
+
+
+class Latency:
+    """호출 1회의 주입 지연시간 (ms): base ± jitter, tail_prob 확률로 tail_ms 추가"""
+
+    def __init__(self, base_ms: float = 0.0, jitter: float = 0.2, tail_prob: float = 0.0, tail_ms: float = 0.0):
+        self.base_ms = base_ms
+        self.jitter = jitter
+        self.tail_prob = tail_prob
+        self.tail_ms = tail_ms
+
+    def sample(self, rng: random.Random) -> float:
+        ms = self.base_ms * (1 + rng.uniform(-self.jitter, self.jitter)) if self.base_ms else 0.0
+        if self.tail_prob and rng.random() < self.tail_prob:
+            ms += self.tail_ms
+        return max(0.0, ms)
+
+    def scaled(self, base_ms: float) -> "Latency":
+        """같은 지터/꼬리 설정으로 기본값만 바꾼 복사본"""
+        return Latency(base_ms, self.jitter, self.tail_prob, self.tail_ms)
+
+
+class _LatencySource:
+    """스레드 안전한 지연시간 샘플링 + 호출 횟수 집계"""
+
+    def __init__(self, default: Latency, overrides: Optional[Dict[str, Latency]], seed: Optional[int]):
+        self.default = default
+        self.overrides = dict(overrides or {})
+        self.calls: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] += 1
+            ms = self.overrides.get(name, self.default).sample(self._rng)
+        if ms:
+            time.sleep(ms / 1000)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+# ------------------------------------------------
+# Supabase
+# ------------------------------------------------
+
+class FakeQuery:
+    """PostgREST 쿼리 빌더 흉내 (웹훅/공용 모듈이 쓰는 메서드만)"""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.filters: List = []
+        self.limit_count: Optional[int] = None
+        self.order_by: Optional[tuple] = None
+
+    # 동작
+    def select(self, *columns, **kwargs):
+        self.action = "select"
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: Optional[str] = None, **kwargs):
+        self.action, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload, **kwargs):
+        self.action, self.payload = "update", payload
+        return self
+
+    def delete(self, **kwargs):
+        self.action = "delete"
+        return self
+
+    # 필터
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) <= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def ilike(self, column, pattern):
+        prefix = pattern.rstrip("%").lower()
+        self.filters.append(lambda row: str(row.get(column) or "").lower().startswith(prefix))
+        return self
+
+    def order(self, column, desc: bool = False, **kwargs):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.limit_count = count
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.db.latency.wait(self.table)
+        with self.db.lock:
+            return FakeResponse(self._run(self.db.tables.setdefault(self.table, {})))
+
+    def _matches(self, row) -> bool:
+        return all(f(row) for f in self.filters)
+
+    def _run(self, rows: Dict[Any, Dict[str, Any]]):
+        if self.action in ("insert", "upsert"):
+            key = self.on_conflict or PRIMARY_KEYS.get(self.table, "id")
+            payloads = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = []
+            for payload in payloads:
+                row = dict(rows.get(payload.get(key), {})) if self.action == "upsert" else {}
+                if self.table == "search_sessions" and row.get("session_id") != payload.get("session_id"):
+                    row["session_seq"] = next(self.db.session_seq)  # schema.sql assign_search_session_seq 트리거
+                row.update(copy.deepcopy(payload))
+                rows[row.get(key)] = row
+                written.append(copy.deepcopy(row))
+            return written
+        matched = [row for row in rows.values() if self._matches(row)]
+        if self.action == "update":
+            for row in matched:
+                row.update(copy.deepcopy(self.payload))
+            return copy.deepcopy(matched)
+        if self.action == "delete":
+            key = PRIMARY_KEYS.get(self.table, "id")
+            for row in matched:
+                rows.pop(row.get(key), None)
+            return copy.deepcopy(matched)
+        if self.order_by:
+            column, desc = self.order_by
+            matched.sort(key=lambda row: row.get(column) or 0, reverse=desc)
+        if self.limit_count is not None:
+            matched = matched[:self.limit_count]
+        return copy.deepcopy(matched)
+
+
+class FakeRPC:
+    def __init__(self, db: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        handler = getattr(self.db, f"_rpc_{self.name}", None)
+        if handler is None:
+            raise RuntimeError(f"FakeSupabase: unsupported RPC '{self.name}'")
+        self.db.latency.wait(self.name)
+        return FakeResponse(handler(self.params))
+
+
+class FakeSupabase:
+    """
+    메모리 Supabase 대역
+
+    Args:
+        latency: 기본 호출 지연시간
+        overrides: RPC/테이블 이름별 지연시간
+        benefit_count: 합성 혜택 수 (전국/시도/시군구 혜택이 섞임)
+        seed: 카탈로그/지연시간 난수 시드
+    """
+
+    def __init__(self, latency: Optional[Latency] = None, overrides: Optional[Dict[str, Latency]] = None,
+                 benefit_count: int = 400, seed: Optional[int] = 42):
+        self.latency = _LatencySource(latency or Latency(), overrides, seed)
+        self.lock = threading.RLock()
+        self.session_seq = itertools.count(1)
+        self.tables: Dict[str, Dict[Any, Dict[str, Any]]] = {name: {} for name in PRIMARY_KEYS}
+        self.tables["data_versions"]["benefits"] = {"name": "benefits", "version": 1}
+        self._build_regions()
+        self._build_catalogue(benefit_count, random.Random(seed))
+
+    @property
+    def calls(self) -> Counter:
+        return self.latency.calls
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    # ------------------------------------------------
+    # 합성 데이터
+    # ------------------------------------------------
+
+    def _build_regions(self) -> None:
+        regions = self.tables["regions"]
+        for i, sido in enumerate(SIDO_NAMES):
+            code = f"{11 + i:02d}00000000"
+            regions[code] = {"region_code": code, "name": sido, "depth": 1}
+            for j, sgg in enumerate(SGG_NAMES):
+                sgg_code = f"{11 + i:02d}{j + 1:03d}00000"
+                regions[sgg_code] = {"region_code": sgg_code, "name": f"{sido} {sgg}", "depth": 2}
+
+    def _build_catalogue(self, count: int, rng: random.Random) -> None:
+        today = datetime.now(timezone(timedelta(hours=9))).date()
+        for benefit_id in range(1, count + 1):
+            scope = rng.random()
+            ctpv = rng.choice(SIDO_NAMES) if scope > 0.4 else None
+            sgg = rng.choice(SGG_NAMES) if ctpv and scope > 0.7 else None
+            life = rng.sample(LIFE_CYCLES, rng.randint(1, 3)) if rng.random() < 0.7 else []
+            target = rng.sample(TARGET_GROUPS, 1) if rng.random() < 0.3 else []
+            self.tables["benefits"][benefit_id] = {
+                "id": benefit_id,
+                "serv_nm": f"합성 혜택 {benefit_id}",
+                "srv_pvsn_nm": rng.choice(PROVISION_TYPES),
+                "ctpv_nm": ctpv,
+                "sgg_nm": sgg,
+                "life_nm_array": life,
+                "trgter_indvdl_nm_array": target,
+                "serv_dgst": f"부하 테스트용 합성 혜택 {benefit_id}번 설명입니다.",
+                "enfc_end_ymd": (today + timedelta(days=rng.randint(1, 365))).isoformat(),
+                "serv_dtl_link": f"https://example.com/benefits/{benefit_id}",
+                "render_card": None,
+                "is_active": True,
+            }
+
+    def _eligible(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """get_eligible_benefits와 같은 필터 (지역 + 생애주기/대상 겹침)"""
+        ctpv, sgg = params.get("p_ctpv"), params.get("p_sgg")
+        lives = set(params.get("p_life_array") or [])
+        targets = set(params.get("p_target_array") or [])
+        rows = []
+        for row in self.tables["benefits"].values():
+            if not row["is_active"]:
+                continue
+            if row["ctpv_nm"] and row["ctpv_nm"] != ctpv:
+                continue
+            if row["sgg_nm"] and row["sgg_nm"] != sgg:
+                continue
+            if row["life_nm_array"] and not lives & set(row["life_nm_array"]):
+                continue
+            if row["trgter_indvdl_nm_array"] and not targets & set(row["trgter_indvdl_nm_array"]):
+                continue
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _similarity(embedding: List[float], benefit_id: int) -> float:
+        """쿼리 벡터 + 혜택 id로 결정되는 유사도 (0.2~0.7, 같은 쿼리면 같은 순위)"""
+        seed = f"{embedding[0]:.6f}:{embedding[1]:.6f}:{benefit_id}".encode("utf-8")
+        return 0.2 + 0.5 * int.from_bytes(hashlib.sha256(seed).digest()[:4], "big") / 0xFFFFFFFF
+
+    def _vector_matches(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        embedding = params.get("rerank_embedding") or params.get("query_embedding")
+        if not embedding:
+            return []
+        with self.lock:
+            eligible = self._eligible(params)
+        threshold = params.get("match_threshold", 0.0)
+        matches = []
+        for row in eligible:
+            similarity = self._similarity(embedding, row["id"])
+            if similarity >= threshold:
+                matches.append({**copy.deepcopy(row), "similarity": similarity})
+        matches.sort(key=lambda row: row["similarity"], reverse=True)
+        return matches[:params.get("match_count", 50)]
+
+    # ------------------------------------------------
+    # RPC (supabase/schema.sql과 같은 입출력)
+    # ------------------------------------------------
+
+    def _rpc_get_eligible_benefits(self, params):
+        with self.lock:
+            return copy.deepcopy(self._eligible(params))
+
+    def _rpc_match_benefits(self, params):
+        return self._vector_matches(params)
+
+    def _rpc_match_benefits_reduced(self, params):
+        return self._vector_matches(params)
+
+    def _rpc_recommend_benefits(self, params):
+        results = [{**row, "source_type": "VECTOR"} for row in self._vector_matches(params)]
+        seen = {row["id"] for row in results}
+        with self.lock:
+            rules = [row for row in self._eligible(params) if row["id"] not in seen]
+        rules.sort(key=lambda row: (0 if row["sgg_nm"] else 1 if row["ctpv_nm"] else 2, row["id"]))
+        results += [{**copy.deepcopy(row), "source_type": "RULES", "similarity": None} for row in rules]
+        return results[:params.get("top_k", 10)]
+
+    def _rpc_claim_webhook_request(self, params):
+        now = time.time()
+        key = params["p_request_key"]
+        with self.lock:
+            rows = self.tables["webhook_requests"]
+            row = rows.get(key)
+            if row is None or row["_expires"] < now or row["response"] is not None:
+                rows[key] = {
+                    "request_key": key,
+                    "response": None,
+                    "_expires": now + params.get("p_ttl_seconds", 60),
+                }
+                return {"claimed": True, "response": None}
+            return {"claimed": False, "response": copy.deepcopy(row["response"])}
+
+    def _rpc_advance_onboarding(self, params):
+        user_id = params["p_kakao_user_id"]
+        command = params.get("p_command")
+        candidates = params.get("p_candidates") or {}
+        expected_step = params.get("p_expected_step")
+
+        def result(status, step, applied, user):
+            return {"status": status, "step": step, "applied": applied, "user": copy.deepcopy(user)}
+
+        with self.lock:
+            users = self.tables["users"]
+            user = users.get(user_id)
+            if user is None or command == "reset":
+                status = "reset" if user is not None else "created"
+                user = {
+                    "id": user["id"] if user else len(users) + 1,
+                    "kakao_user_id": user_id,
+                    "ctpv_nm": "", "sgg_nm": "", "birth_year": 0, "gender": "",
+                    "target_group": None, "life_cycle": None,
+                    "region_code": "1100000000", "region_depth": 2, "is_active": False,
+                }
+                users[user_id] = user
+                return result(status, "ctpv_nm", None, user)
+            if command == "start":
+                return result("exists", None, None, user)
+
+            step = next((name for name, empty in (
+                ("ctpv_nm", not user["ctpv_nm"]),
+                ("sgg_nm", not user["sgg_nm"]),
+                ("birth_year", not user["birth_year"]),
+                ("gender", not user["gender"]),
+                ("target_group", user["target_group"] is None),
+            ) if empty), None)
+            if expected_step is not None and step != expected_step:
+                return result("conflict", step, None, user)
+            if step is None:
+                return result("complete", None, None, user)
+
+            value = candidates.get(step)
+            if value is None:
+                return result("invalid", step, None, user)
+            if step == "sgg_nm" and isinstance(value, dict):
+                region = value.get(user["ctpv_nm"])
+                if not region:
+                    return result("invalid", step, None, user)
+                user["sgg_nm"] = region["sgg_nm"]
+                user["region_code"] = region.get("region_code") or user["region_code"]
+            elif step == "birth_year":
+                if not 1900 <= int(value) <= 2030:
+                    return result("invalid", step, None, user)
+                user["birth_year"] = int(value)
+            elif step == "gender":
+                if value not in ("M", "F"):
+                    return result("invalid", step, None, user)
+                user["gender"] = value
+            elif step == "target_group":
+                user["target_group"] = list(value)
+                user["life_cycle"] = _life_cycle(user["birth_year"])
+                user["is_active"] = True
+            else:
+                user[step] = value
+
+            order = ["ctpv_nm", "sgg_nm", "birth_year", "gender", "target_group"]
+            next_index = order.index(step) + 1
+            return result("advanced", order[next_index] if next_index < len(order) else None, step, user)
+
+
+def _life_cycle(birth_year: int) -> List[str]:
+    """birth_year_to_life_cycle (schema.sql) / RAGService.convert_birth_year_to_life_cycle와 같은 구간"""
+    age = datetime.now().year - birth_year
+    if age < 0:
+        return []
+    for limit, name in ((5, "영유아"), (12, "아동"), (18, "청소년"), (34, "청년"), (64, "중장년")):
+        if age <= limit:
+            return [name]
+    return ["노년"]
+
+
+# ------------------------------------------------
+# OpenAI
+# ------------------------------------------------
+
+class _EmbeddingItem:
+    def __init__(self, embedding: List[float]):
+        self.embedding = embedding
+
+
+class _EmbeddingResponse:
+    def __init__(self, embedding: List[float]):
+        self.data = [_EmbeddingItem(embedding)]
+
+
+class _Embeddings:
+    def __init__(self, client: "FakeOpenAI"):
+        self.client = client
+
+    def create(self, model: str, input: str, dimensions: int = EMBEDDING_DIMENSIONS, **kwargs) -> _EmbeddingResponse:
+        self.client.latency.wait("embeddings")
+        return _EmbeddingResponse(fake_embedding(input, dimensions))
+
+
+class _Models:
+    def __init__(self, client: "FakeOpenAI"):
+        self.client = client
+
+    def retrieve(self, model: str, **kwargs) -> Dict[str, Any]:
+        self.client.latency.wait("models")
+        return {"id": model, "object": "model"}
+
+
+class FakeOpenAI:
+    """OpenAI 클라이언트 대역 (embeddings.create / models.retrieve)"""
+
+    def __init__(self, latency: Optional[Latency] = None, overrides: Optional[Dict[str, Latency]] = None, seed: Optional[int] = 7):
+        self.latency = _LatencySource(latency or Latency(), overrides, seed)
+        self.embeddings = _Embeddings(self)
+        self.models = _Models(self)
+
+    @property
+    def calls(self) -> Counter:
+        return self.latency.calls
+
+
+def fake_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """발화별로 결정적인 단위 벡터"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+카카오 웹훅 오프라인 부하 테스트
+
+가상 유저 여러 명이 온보딩(시작하기 → 시/도 → 시/군/구 → 연대 → 연도 → 성별 → 대상) →
+검색 → "더보기" 순서로 대화하는 카카오 이벤트를 만들어 lambda_handler를 동시에 호출합니다.
+온보딩/페이지 이동은 직전 응답의 Quick Reply 버튼을 눌러 진행합니다.
+Supabase/OpenAI는 fake_services.py의 로컬 대역(주입 지연시간)을 사용하므로 네트워크가 필요 없습니다.
+
+리포트:
+- 처리량 (req/s), 요청 응답시간 p50/p95/p99 (전체 + Path별: onboarding/search/page/command/duplicate)
+- 단계별(tracing.py span) p50/p95/p99 (whitelist_rpc, embedding, vector_rpc, state_transition ...)
+- Cold start: app 모듈 import 시간, 첫 호출 / 첫 검색 소요시간 (클라이언트·RAGService 생성 포함)
+- 대역 서비스 호출 수 (RPC/테이블/임베딩별)
+
+주의:
+- 한 프로세스 = 컨테이너 1개 (컨테이너 캐시/세션/프로필 캐시를 모든 스레드가 공유)
+  실제 Lambda는 컨테이너당 동시 1요청이므로 --concurrency는 "동시에 처리 중인 요청 수"로 해석
+- Cold start는 프로세스당 1회만 측정됨
+- 웹훅 환경변수(WRITE_BEHIND_ENABLED, RAG_SEARCH_MODE 등)는 --env로 지정 (app import 전에 적용)
+- 비교할 때는 같은 --seed / 지연시간 설정으로 실행
+
+사용법:
+    cd backend && ./build.sh   # common 모듈을 functions/kakao_webhook으로 복사
+    python scripts/loadtest/run_webhook_loadtest.py
+    python scripts/loadtest/run_webhook_loadtest.py --users 200 --concurrency 20 --db-latency-ms 40 --openai-latency-ms 300
+    python scripts/loadtest/run_webhook_loadtest.py --rpc-latency match_benefits=150 --tail-prob 0.01 --tail-ms 1500
+    python scripts/loadtest/run_webhook_loadtest.py --env RAG_SEARCH_MODE=server --env WRITE_BEHIND_ENABLED=true --output server.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import contextlib
+import importlib.util
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+KAKAO_WEBHOOK_DIR = os.path.join(LOADTEST_DIR, "../../backend/functions/kakao_webhook")
+
+sys.path.insert(0, LOADTEST_DIR)
+
+from fake_services import FakeSupabase, FakeOpenAI, Latency
+
+# 자유 질문 (같은 질문이 반복될수록 임베딩 캐시 적중률이 올라감 → --query-pool로 조절)
+QUERY_TOPICS = ["일자리", "주거비", "의료비", "교육비", "육아", "돌봄", "생활비", "교통비", "문화생활", "에너지 바우처"]
+QUERY_FORMS = ["{} 지원 알려줘", "{} 혜택 있어?", "{} 받을 수 있는 거", "{} 신청 방법", "우리 동네 {} 지원"]
+
+# 하네스 기본 환경변수 (--env로 덮어쓸 수 있음)
+DEFAULT_ENV = {
+    "TRACE_SAMPLE_RATE": "1.0",  # 모든 요청의 단계별 시간 수집
+    "TRACE_DEBUG": "false",
+    "KAKAO_CALLBACK_MODE": "off",
+}
+
+_last_record = threading.local()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def parse_key_values(pairs, convert=str):
+    result = {}
+    for pair in pairs or []:
+        if "=" not in pair:
+            raise SystemExit(f"❌ KEY=VALUE 형식이 아닙니다: {pair}")
+        key, value = pair.split("=", 1)
+        result[key.strip()] = convert(value.strip())
+    return result
+
+
+def make_event(user_id, utterance):
+    """카카오 스킬 요청 이벤트 (API Gateway 프록시 형식)"""
+    return {
+        "body": json.dumps({
+            "bot": {"id": "loadtest-bot"},
+            "userRequest": {"user": {"id": user_id}, "utterance": utterance},
+            "action": {"params": {}},
+        }, ensure_ascii=False)
+    }
+
+
+def quick_replies(response):
+    """스킬 응답의 Quick Reply messageText 목록"""
+    try:
+        body = json.loads(response.get("body") or "{}")
+    except (TypeError, ValueError):
+        return []
+    return [reply.get("messageText") for reply in body.get("template", {}).get("quickReplies", [])]
+
+
+def load_app():
+    """빌드된 kakao_webhook/app.py import (소요시간 = 모듈 로딩 cold start)"""
+    missing = [f for f in ("app.py", "tracing.py", "resources.py") if not os.path.exists(os.path.join(KAKAO_WEBHOOK_DIR, f))]
+    if missing:
+        raise SystemExit(f"❌ build.sh를 먼저 실행하세요 (누락: {', '.join(missing)})")
+    sys.path.insert(0, KAKAO_WEBHOOK_DIR)
+    start = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("kakao_app", os.path.join(KAKAO_WEBHOOK_DIR, "app.py"))
+    app = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app)
+    return app, (time.perf_counter() - start) * 1000
+
+
+class LoadTest:
+    def __init__(self, app, args):
+        self.app = app
+        self.args = args
+        self.samples = []
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def send(self, user_id, utterance, kind):
+        """lambda_handler 1회 호출 → (응답, 샘플)"""
+        _last_record.value = None
+        start = time.perf_counter()
+        try:
+            response = self.app.lambda_handler(make_event(user_id, utterance), None)
+        except Exception as e:
+            with self._lock:
+                self.errors[type(e).__name__] += 1
+            return None, None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        record = _last_record.value or {}
+        sample = {
+            "kind": kind,
+            "path": record.get("Path", "unknown"),
+            "latency_ms": elapsed_ms,
+            "stages": {key[:-3]: value for key, value in record.items() if key.endswith("_ms")},
+        }
+        if response.get("statusCode") != 200:
+            with self._lock:
+                self.errors[f"status_{response.get('statusCode')}"] += 1
+        with self._lock:
+            self.samples.append(sample)
+        if self.args.think_ms:
+            time.sleep(self.args.think_ms / 1000)
+        return response, sample
+
+    def run_user(self, index):
+        """가상 유저 1명: 온보딩 → 검색 N회 (각 검색 후 확률적으로 '더보기')"""
+        rng = random.Random(f"{self.args.seed}:{index}")
+        user_id = f"loadtest-{index:05d}"
+
+        response, _ = self.onboard(user_id, rng)
+        if response is None:
+            return
+        response = self._browse(user_id, response, rng)
+
+        for _ in range(self.args.searches_per_user):
+            replies = [r for r in quick_replies(response) if r not in ("처음으로", self.app.MORE_UTTERANCE)] if response else []
+            if replies and rng.random() < self.args.preset_prob:
+                query = rng.choice(replies)  # 예시 질문 버튼
+            else:
+                topic = rng.randrange(self.args.query_pool)
+                query = QUERY_FORMS[topic % len(QUERY_FORMS)].format(QUERY_TOPICS[topic // len(QUERY_FORMS) % len(QUERY_TOPICS)])
+                if topic >= len(QUERY_FORMS) * len(QUERY_TOPICS):
+                    query = f"{query} {topic}"
+            response, _ = self.send(user_id, query, "search")
+            if response and rng.random() < self.args.retry_prob:
+                self.send(user_id, query, "retry")  # 카카오 재전송 흉내 (같은 요청 즉시 재전송)
+            response = self._browse(user_id, response, rng) or response
+
+    def onboard(self, user_id, rng=None, kind="onboarding"):
+        """
+        시작하기 → Quick Reply 6번 (시/도, 시/군/구, 연대, 연도, 성별, 대상)
+
+        Args:
+            rng: 버튼 선택용 난수 (None이면 항상 첫 버튼, 대상은 '해당없음')
+
+        Returns:
+            (마지막 응답 = 자동 검색 결과, 마지막 샘플), 버튼이 없어 진행할 수 없으면 (None, None)
+        """
+        response, sample = self.send(user_id, "시작하기", "command" if kind == "onboarding" else kind)
+        for step in range(6):
+            replies = quick_replies(response) if response else []
+            if not replies:
+                with self._lock:
+                    self.errors["onboarding_stuck"] += 1
+                return None, None
+            if step == 5 and "해당없음" in replies and (rng is None or rng.random() < 0.7):
+                choice = "해당없음"
+            else:
+                choice = rng.choice(replies) if rng else replies[0]
+            response, sample = self.send(user_id, choice, kind)
+        return response, sample
+
+    def _browse(self, user_id, response, rng):
+        """'더보기' 버튼이 있는 동안 more_prob 확률로 다음 페이지"""
+        while response and self.app.MORE_UTTERANCE in quick_replies(response) and rng.random() < self.args.more_prob:
+            response, _ = self.send(user_id, self.app.MORE_UTTERANCE, "page")
+        return response
+
+
+def build_report(test, args, cold_start, elapsed_s, supabase, openai_client):
+    samples = test.samples
+    by_path = defaultdict(list)
+    by_stage = defaultdict(list)
+    for sample in samples:
+        by_path[sample["path"]].append(sample["latency_ms"])
+        for stage, value in sample["stages"].items():
+            by_stage[stage].append(value)
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "requests": len(samples),
+        "errors": dict(test.errors),
+        "elapsed_s": round(elapsed_s, 2),
+        "throughput_rps": round(len(samples) / elapsed_s, 1) if elapsed_s else 0.0,
+        "latency_ms": summarize([s["latency_ms"] for s in samples]),
+        "paths": {path: summarize(values) for path, values in sorted(by_path.items())},
+        "stages": {stage: summarize(values) for stage, values in sorted(by_stage.items())},
+        "cold_start": cold_start,
+        "service_calls": {
+            "supabase": dict(supabase.calls.most_common()),
+            "openai": dict(openai_client.calls.most_common()),
+        },
+    }
+
+
+def print_report(report):
+    def row(name, stats):
+        if not stats.get("count"):
+            return f"{name:<20} {0:>7}"
+        return f"{name:<20} {stats['count']:>7} {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['max']:>8.1f}"
+
+    header = f"{'':<20} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    cold = report["cold_start"]
+    print("")
+    print(f"Requests: {report['requests']} in {report['elapsed_s']}s → {report['throughput_rps']} req/s | errors: {report['errors'] or 'none'}")
+    print(f"Cold start: import {cold['import_ms']}ms, first invocation {cold['first_invocation_ms']}ms, first search {cold['first_search_ms']}ms")
+    print("")
+    print(header)
+    print("-" * len(header))
+    print(row("all requests", report["latency_ms"]))
+    for path, stats in report["paths"].items():
+        print(row(f"Path={path}", stats))
+    print("")
+    print(header.replace(" " * 20, f"{'stage':<20}", 1))
+    print("-" * len(header))
+    for stage, stats in report["stages"].items():
+        print(row(stage, stats))
+    print("")
+    print(f"Supabase calls: {report['service_calls']['supabase']}")
+    print(f"OpenAI calls: {report['service_calls']['openai']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the Kakao webhook lambda_handler")
+    parser.add_argument("--users", type=int, default=50, help="Simulated users")
+    parser.add_argument("--concurrency", type=int, default=10, help="Users driven in parallel")
+    parser.add_argument("--searches-per-user", type=int, default=3)
+    parser.add_argument("--more-prob", type=float, default=0.5, help="Probability of pressing '더보기' while pages remain")
+    parser.add_argument("--preset-prob", type=float, default=0.3, help="Probability a search is a quick-reply example question")
+    parser.add_argument("--retry-prob", type=float, default=0.0, help="Probability a search is redelivered (Kakao retry)")
+    parser.add_argument("--query-pool", type=int, default=50, help="Distinct free-text queries (smaller = more cache hits)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a user's messages")
+    parser.add_argument("--benefits", type=int, default=400, help="Synthetic benefits in the fake catalogue")
+    parser.add_argument("--db-latency-ms", type=float, default=30.0, help="Injected latency per Supabase call")
+    parser.add_argument("--openai-latency-ms", type=float, default=250.0, help="Injected latency per embedding call")
+    parser.add_argument("--rpc-latency", action="append", metavar="NAME=MS", help="Per RPC/table latency override")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Uniform ± fraction applied to every latency")
+    parser.add_argument("--tail-prob", type=float, default=0.0, help="Probability of a slow call")
+    parser.add_argument("--tail-ms", type=float, default=0.0, help="Extra latency of a slow call")
+    parser.add_argument("--env", action="append", metavar="KEY=VALUE", help="Webhook environment variable (applied before import)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--verbose", action="store_true", help="Show webhook logs")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # 이전 실행의 /tmp 임베딩 캐시가 결과에 섞이지 않도록 실행마다 새 디렉토리
+    os.environ.setdefault("EMBEDDING_CACHE_DIR", tempfile.mkdtemp(prefix="loadtest-embeddings-"))
+    for key, value in {**DEFAULT_ENV, **parse_key_values(args.env)}.items():
+        os.environ[key] = value
+
+    base = Latency(args.db_latency_ms, args.jitter, args.tail_prob, args.tail_ms)
+    overrides = {name: base.scaled(ms) for name, ms in parse_key_values(args.rpc_latency, float).items()}
+    supabase = FakeSupabase(base, overrides, benefit_count=args.benefits, seed=args.seed)
+    openai_client = FakeOpenAI(base.scaled(args.openai_latency_ms), seed=args.seed)
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+    with quiet:
+        app, import_ms = load_app()
+        # 대역 주입 (클라이언트 생성 전이므로 실제 접속 없음)
+        sys.modules["supabase_client"].SupabaseClient._instance = supabase
+        app.ContainerResources._openai_client = openai_client
+        sys.modules["tracing"].add_trace_listener(lambda record: setattr(_last_record, "value", record))
+
+        test = LoadTest(app, args)
+
+        # Cold start: 첫 호출(모듈 상태 초기화) + 첫 검색(RAGService/캐시 생성) - 부하 구간과 분리해 순차 측정
+        _, first_search = test.onboard("loadtest-cold", kind="cold")
+        first = test.samples[0] if test.samples else None
+        cold_start = {
+            "import_ms": round(import_ms, 1),
+            "first_invocation_ms": round(first["latency_ms"], 1) if first else None,
+            "first_search_ms": round(first_search["latency_ms"], 1) if first_search else None,
+            "first_search_stages": first_search["stages"] if first_search else {},
+        }
+        test.samples.clear()
+        test.errors.clear()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="vuser") as executor:
+            list(executor.map(test.run_user, range(args.users)))
+        elapsed_s = time.perf_counter() - start
+
+    report = build_report(test, args, cold_start, elapsed_s, supabase, openai_client)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Report written: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
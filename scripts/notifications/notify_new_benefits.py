@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+신규 혜택 알림 스크립트 (파이프라인 마지막 단계)
+
+지난 실행 이후 새로 생기거나 바뀐 혜택(benefits.content_changed_at)을 사용자 세그먼트
+(시도/시군구/생애주기/대상)별로 한 번만 매칭하고, 세그먼트의 결과를 사용자별 요약으로 나눠 보냅니다.
+
+1. start_notification_run        - 워터마크(since) ~ 현재(until) 구간 확정
+2. match_new_benefits_by_segment - 세그먼트 × 변경 혜택 집합 조인 1회 (사용자 수와 무관)
+3. notification_recipients       - 신규 혜택이 있는 세그먼트의 수신자만 페이지 단위 조회
+4. 발송기(senders.py)로 사용자별 요약 발송 (토큰 버킷 속도 제한)
+5. record_notification_deliveries - 페이지마다 발송 이력 저장 (같은 혜택은 다시 알리지 않음)
+
+첫 실행은 기준점만 기록하고 발송하지 않습니다 (--since로 구간을 직접 지정 가능).
+발송 실패가 있으면 워터마크를 옮기지 않아 다음 실행에서 실패분만 다시 보냅니다.
+기본 발송기(log)는 dry run입니다 - 실제 발송은 NOTIFICATION_SENDER=kakao.
+
+사용법:
+    python scripts/notifications/notify_new_benefits.py                       # dry run (로그만)
+    python scripts/notifications/notify_new_benefits.py --sender kakao --rate 20
+    python scripts/notifications/notify_new_benefits.py --since 2026-10-01T00:00:00+09:00
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scripts.notifications.senders import load_sender, RateLimiter, NotificationSender
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+
+DIGEST_MAX_ITEMS = int(os.getenv("NOTIFICATION_DIGEST_MAX_ITEMS", "5"))
+BENEFIT_COLUMNS = "id, serv_nm, ctpv_nm, sgg_nm, serv_dgst, enfc_end_ymd, serv_dtl_link"
+FETCH_CHUNK_SIZE = 200
+
+
+def benefit_rank(benefit: Dict[str, Any]):
+    """요약 노출 순서: 시군구 혜택 → 시도 혜택 → 전국 혜택, 같은 범위는 최신(id 큰) 순"""
+    scope = 0 if benefit.get("sgg_nm") else 1 if benefit.get("ctpv_nm") else 2
+    return (scope, -benefit["id"])
+
+
+def build_digest(benefits: List[Dict[str, Any]], region_check: bool = False) -> Dict[str, Any]:
+    """
+    사용자 1명에게 보낼 요약 (benefits는 benefit_rank 순으로 정렬된 상태)
+
+    Returns:
+        {"count", "benefit_ids", "benefits", "text", "region_check"}
+    """
+    shown = benefits[:DIGEST_MAX_ITEMS]
+    lines = [f"🔔 새로 받을 수 있는 혜택 {len(benefits)}건이 있어요!", ""]
+    for i, benefit in enumerate(shown, 1):
+        region = " ".join(filter(None, [benefit.get("ctpv_nm"), benefit.get("sgg_nm")])) or "전국"
+        lines.append(f"{i}. {benefit['serv_nm']} ({region})")
+    if len(benefits) > len(shown):
+        lines.append(f"...외 {len(benefits) - len(shown)}건")
+    lines += ["", "궁금한 혜택 이름을 입력하면 자세히 알려드려요."]
+    if region_check:
+        lines.append("📍 이사하셨다면 '처음으로'를 입력해 거주지를 다시 설정해주세요.")
+
+    return {
+        "count": len(benefits),
+        "benefit_ids": [benefit["id"] for benefit in benefits],
+        "benefits": shown,
+        "text": "\n".join(lines),
+        "region_check": region_check,
+    }
+
+
+class NotificationMatcher:
+    """세그먼트 단위 신규 혜택 매칭 + 사용자별 발송"""
+
+    def __init__(
+        self,
+        supabase,
+        sender: NotificationSender,
+        rate_per_second: float = 10.0,
+        workers: int = 4,
+        page_size: int = 500,
+    ):
+        self.supabase = supabase
+        self.sender = sender
+        self.limiter = RateLimiter(rate_per_second)
+        self.workers = workers
+        self.page_size = page_size
+        self.dry_run = not sender.records_deliveries
+        self.stats = {
+            "segments": 0, "segment_users": 0, "benefits": 0,
+            "recipients": 0, "sent": 0, "failed": 0, "skipped": 0, "recorded": 0,
+        }
+
+    def run(self, since: Optional[str] = None) -> Dict[str, Any]:
+        run = self.supabase.rpc("start_notification_run", {"p_since": since}).execute().data
+        logger.info(f"🔖 Notification run #{run['id']}: {run['since']} ~ {run['until']}")
+
+        if run["since"] is None:
+            logger.info("📌 첫 실행: 기준점만 기록합니다 (발송 없음)")
+            return self._finish(run, "completed", baseline=True)
+
+        try:
+            segments = self.supabase.rpc(
+                "match_new_benefits_by_segment", {"p_since": run["since"], "p_until": run["until"]}
+            ).execute().data or []
+            self.stats["segments"] = len(segments)
+            self.stats["segment_users"] = sum(segment["user_count"] for segment in segments)
+            if not segments:
+                logger.info("✅ 신규/변경 혜택에 해당하는 세그먼트가 없습니다")
+                return self._finish(run, "dry_run" if self.dry_run else "completed")
+
+            benefit_ids = sorted({benefit_id for segment in segments for benefit_id in segment["benefit_ids"]})
+            benefits = self._fetch_benefits(benefit_ids)
+            self.stats["benefits"] = len(benefits)
+            logger.info(
+                f"🎯 {len(segments)} segments matched {len(benefits)} new benefits "
+                f"(~{self.stats['segment_users']} users)"
+            )
+
+            # 세그먼트별 정렬된 혜택 목록은 한 번만 계산 (사용자는 이미 받은 혜택만 빼서 사용)
+            ranked_by_segment = {
+                segment["segment_key"]: sorted(
+                    (benefits[benefit_id] for benefit_id in segment["benefit_ids"] if benefit_id in benefits),
+                    key=benefit_rank,
+                )
+                for segment in segments
+            }
+            self._deliver(run, ranked_by_segment, benefit_ids)
+        except Exception as e:
+            logger.error(f"❌ Notification run failed: {e}")
+            self._finish(run, "failed")
+            raise
+
+        if self.dry_run:
+            status = "dry_run"
+        else:
+            status = "completed" if self.stats["failed"] == 0 else "partial"
+        return self._finish(run, status)
+
+    def _deliver(self, run: Dict[str, Any], ranked_by_segment: Dict[str, List[Dict[str, Any]]], benefit_ids: List[int]) -> None:
+        segment_keys = list(ranked_by_segment)
+        after = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                page = self.supabase.rpc("notification_recipients", {
+                    "p_segment_keys": segment_keys,
+                    "p_benefit_ids": benefit_ids,
+                    "p_after": after,
+                    "p_limit": self.page_size,
+                }).execute().data or []
+                if not page:
+                    break
+                after = page[-1]["user_id"]
+                self.stats["recipients"] += len(page)
+
+                jobs = []
+                for recipient in page:
+                    delivered = set(recipient.get("delivered_ids") or [])
+                    pending = [b for b in ranked_by_segment.get(recipient["segment_key"], []) if b["id"] not in delivered]
+                    if not pending:
+                        self.stats["skipped"] += 1
+                        continue
+                    digest = build_digest(pending, region_check=bool(recipient.get("region_check_due")))
+                    jobs.append((recipient, digest, executor.submit(self._send, recipient, digest)))
+
+                deliveries = []
+                for recipient, digest, future in jobs:
+                    if future.result():
+                        self.stats["sent"] += 1
+                        deliveries.append({
+                            "user_id": recipient["user_id"],
+                            "benefit_ids": digest["benefit_ids"],
+                            "region_check": digest["region_check"],
+                        })
+                    else:
+                        self.stats["failed"] += 1
+
+                if deliveries and not self.dry_run:
+                    recorded = self.supabase.rpc(
+                        "record_notification_deliveries", {"p_run_id": run["id"], "p_deliveries": deliveries}
+                    ).execute().data
+                    self.stats["recorded"] += recorded or 0
+
+                logger.info(f"📨 Sent {self.stats['sent']} / failed {self.stats['failed']} (recipients so far: {self.stats['recipients']})")
+                if len(page) < self.page_size:
+                    break
+
+    def _send(self, recipient: Dict[str, Any], digest: Dict[str, Any]) -> bool:
+        self.limiter.acquire()
+        try:
+            return self.sender.send(recipient, digest)
+        except Exception as e:
+            logger.warning(f"⚠️ Send failed for {recipient['kakao_user_id'][:8]}...: {e}")
+            return False
+
+    def _fetch_benefits(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        benefits = {}
+        for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+            res = self.supabase.table("benefits").select(BENEFIT_COLUMNS) \
+                .in_("id", ids[start:start + FETCH_CHUNK_SIZE]) \
+                .eq("is_active", True) \
+                .execute()
+            benefits.update({row["id"]: row for row in res.data})
+        return benefits
+
+    def _finish(self, run: Dict[str, Any], status: str, baseline: bool = False) -> Dict[str, Any]:
+        result = {"run_id": run["id"], "status": status, "baseline": baseline, **self.stats}
+        try:
+            self.supabase.rpc("finish_notification_run", {
+                "p_run_id": run["id"], "p_status": status, "p_stats": result,
+            }).execute()
+        except Exception as e:
+            logger.error(f"Failed to finish notification run #{run['id']}: {e}")
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notify users about benefits that became available since the last run")
+    parser.add_argument("--sender", help="log | kakao | module:Class (default: NOTIFICATION_SENDER or log)")
+    parser.add_argument("--since", help="Override the watermark (ISO timestamp)")
+    parser.add_argument("--rate", type=float, default=float(os.getenv("NOTIFICATION_RATE_PER_SECOND", "10")), help="Max sends per second")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent send workers")
+    parser.add_argument("--page-size", type=int, default=500, help="Recipients fetched per RPC call")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        logger.error("Supabase credentials missing.")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    sender = load_sender(args.sender)
+
+    start = time.time()
+    matcher = NotificationMatcher(supabase, sender, rate_per_second=args.rate, workers=args.workers, page_size=args.page_size)
+    try:
+        result = matcher.run(since=args.since)
+    except Exception:
+        sys.exit(1)
+    finally:
+        sender.close()
+
+    logger.info(
+        f"✅ Notification run #{result['run_id']} {result['status']} in {time.time() - start:.1f}s "
+        f"(sender: {sender.name}, segments: {result['segments']}, benefits: {result['benefits']}, "
+        f"recipients: {result['recipients']}, sent: {result['sent']}, failed: {result['failed']}, skipped: {result['skipped']})"
+    )
+
+    # Output for pipeline parsing
+    print(f"\n__PIPELINE_RESULT__:{json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+신규 혜택 알림 발송기 (교체 가능) + 발송 속도 제한
+
+발송기는 NotificationSender.send(recipient, digest) -> bool 하나만 구현하면 됩니다.
+- log   : 발송하지 않고 로그만 남김 (기본값, dry run - 발송 이력/워터마크를 기록하지 않음)
+- kakao : 카카오 i 오픈빌더 이벤트 API (봇 이벤트 블록으로 메시지 발송)
+- 그 외 : "패키지.모듈:클래스" 형식으로 직접 구현한 발송기 지정
+
+사용법:
+    from scripts.notifications.senders import load_sender, RateLimiter
+
+    sender = load_sender("kakao")
+    limiter = RateLimiter(rate_per_second=20, burst=20)
+    limiter.acquire()
+    sender.send(recipient, digest)
+"""
+
+import os
+import time
+import logging
+import importlib
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+KAKAO_EVENT_API_URL = "https://bot-api.kakao.com/v2/bots/{bot_id}/talk"
+
+
+class RateLimiter:
+    """토큰 버킷 (스레드 안전) - 초당 rate_per_second건, 최대 burst건까지 몰아서 허용"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None):
+        self.rate = max(float(rate_per_second), 0.001)
+        self.capacity = float(burst or max(1, int(self.rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NotificationSender:
+    """발송기 기본 클래스"""
+
+    name = "base"
+    # False면 발송 이력/워터마크를 기록하지 않음 (dry run)
+    records_deliveries = True
+
+    def send(self, recipient: Dict[str, Any], digest: Dict[str, Any]) -> bool:
+        """
+        Args:
+            recipient: {"user_id", "kakao_user_id", "segment_key", "region_check_due"}
+            digest: {"count", "benefit_ids", "benefits", "text", "region_check"}
+
+        Returns:
+            발송 성공 여부 (False면 이력을 남기지 않아 다음 실행에서 다시 시도)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LogSender(NotificationSender):
+    """발송 없이 로그만 (dry run)"""
+
+    name = "log"
+    records_deliveries = False
+
+    def __init__(self, sample: int = 3):
+        self.sample = sample
+        self._logged = 0
+        self._lock = threading.Lock()
+
+    def send(self, recipient: Dict[str, Any], digest: Dict[str, Any]) -> bool:
+        with self._lock:
+            self._logged += 1
+            show = self._logged <= self.sample
+        if show:
+            logger.info(f"📨 [dry-run] {recipient['kakao_user_id'][:8]}... ({digest['count']}건)\n{digest['text']}")
+        return True
+
+
+class KakaoEventSender(NotificationSender):
+    """
+    카카오 i 오픈빌더 이벤트 API 발송기
+
+    오픈빌더에 이벤트 블록(KAKAO_EVENT_NAME, 기본 new_benefits)을 만들고
+    블록 응답에서 #{event.data.text} / #{event.data.count}를 사용합니다.
+    필요 환경변수: KAKAO_BOT_ID, KAKAO_REST_API_KEY
+    """
+
+    name = "kakao"
+
+    def __init__(
+        self,
+        bot_id: Optional[str] = None,
+        rest_api_key: Optional[str] = None,
+        event_name: Optional[str] = None,
+        timeout: float = 5.0,
+        max_retries: int = 3,
+    ):
+        self.bot_id = bot_id or os.environ.get("KAKAO_BOT_ID")
+        self.rest_api_key = rest_api_key or os.environ.get("KAKAO_REST_API_KEY")
+        if not self.bot_id or not self.rest_api_key:
+            raise ValueError("KAKAO_BOT_ID and KAKAO_REST_API_KEY must be set")
+        self.event_name = event_name or os.getenv("KAKAO_EVENT_NAME", "new_benefits")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # 워커 스레드마다 keep-alive 세션 1개
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"KakaoAK {self.rest_api_key}",
+                "Content-Type": "application/json",
+            })
+            self._local.session = session
+        return session
+
+    def send(self, recipient: Dict[str, Any], digest: Dict[str, Any]) -> bool:
+        payload = {
+            "event": {
+                "name": self.event_name,
+                "data": {"text": digest["text"], "count": digest["count"]},
+            },
+            "user": [{"type": "botUserKey", "id": recipient["kakao_user_id"]}],
+        }
+        url = KAKAO_EVENT_API_URL.format(bot_id=self.bot_id)
+
+        for attempt in range(self.max_retries):
+            try:
+                response = self._session().post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"⚠️ Kakao event request failed: {e} (Attempt {attempt+1}/{self.max_retries})")
+                time.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = response.headers.get("Retry-After")
+                wait = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                logger.warning(f"⚠️ Kakao event API {response.status_code}, retrying in {wait:.0f}s")
+                time.sleep(wait)
+                continue
+
+            if response.status_code != 200:
+                logger.error(f"❌ Kakao event API {response.status_code}: {response.text[:200]}")
+                return False
+
+            body = response.json() if response.content else {}
+            if body.get("status") not in (None, "SUCCESS"):
+                logger.error(f"❌ Kakao event rejected: {body}")
+                return False
+            return True
+
+        return False
+
+    def close(self) -> None:
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+
+
+SENDERS = {
+    LogSender.name: LogSender,
+    KakaoEventSender.name: KakaoEventSender,
+}
+
+
+def load_sender(spec: Optional[str] = None) -> NotificationSender:
+    """
+    발송기 생성
+
+    Args:
+        spec: "log" | "kakao" | "패키지.모듈:클래스" (없으면 NOTIFICATION_SENDER 환경변수, 기본 log)
+    """
+    spec = (spec or os.getenv("NOTIFICATION_SENDER", "log")).strip()
+    if spec in SENDERS:
+        return SENDERS[spec]()
+
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown notification sender: {spec} (use {', '.join(SENDERS)} or module:Class)")
+    sender_class = getattr(importlib.import_module(module_name), class_name)
+    return sender_class()
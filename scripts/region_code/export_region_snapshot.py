@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+행정구역 스냅샷 내보내기 스크립트 (배포 시 실행)
+
+regions 테이블의 활성 시/도·시/군/구(+읍/면/동 이름)를 region_snapshot.json으로 저장합니다.
+kakao_webhook은 이 파일로 온보딩 지역 메뉴 / 입력 검증 / 지역코드 조회를 DB 없이 처리합니다.
+
+사용법:
+    # build.sh가 common 모듈 복사 후 자동 실행
+    python scripts/region_code/export_region_snapshot.py
+
+    # load_region_codes.py는 적재 직후 자동으로 호출
+"""
+import os
+import sys
+import time
+import argparse
+import logging
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Add repo root to path for backend.common imports
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(REPO_ROOT)
+
+from backend.common.region_snapshot import build_region_snapshot, write_region_snapshot, SNAPSHOT_FILENAME
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "backend", "functions", "kakao_webhook", SNAPSHOT_FILENAME)
+PAGE_SIZE = 1000
+
+
+def fetch_regions(supabase):
+    """활성 시/도(depth=1)·시/군/구(depth=2)·읍/면/동(depth=3) 행"""
+    rows = []
+    page = 0
+    while True:
+        res = supabase.table("regions").select("region_code, name, depth, parent_code, is_active") \
+            .eq("is_active", True) \
+            .lte("depth", 3) \
+            .order("region_code") \
+            .range(page * PAGE_SIZE, (page + 1) * PAGE_SIZE - 1) \
+            .execute()
+        rows.extend(res.data)
+        if len(res.data) < PAGE_SIZE:
+            break
+        page += 1
+    return rows
+
+
+def fetch_data_version(supabase):
+    res = supabase.table("data_versions").select("version").eq("name", "regions").limit(1).execute()
+    return res.data[0]["version"] if res.data else 0
+
+
+def export_region_snapshot(supabase, output=DEFAULT_OUTPUT):
+    """regions 테이블 → 스냅샷 파일 (요약 dict 반환)"""
+    start = time.time()
+    snapshot = build_region_snapshot(fetch_regions(supabase), data_version=fetch_data_version(supabase))
+    summary = write_region_snapshot(output, snapshot)
+    logger.info(f"✅ Region snapshot written: {output} ({summary['sido']} sido / {summary['sgg']} sgg, {summary['bytes'] / 1024:.1f} KB, took {time.time() - start:.1f}s)")
+    return summary
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Export active sido/sgg regions to a bundled JSON snapshot")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Snapshot path bundled into the Lambda package")
+    args = parser.parse_args()
+
+    supabase_url = os.environ.get("SUPABASE_URL")
+    supabase_key = os.environ.get("SUPABASE_SERVICE_KEY")
+    if not supabase_url or not supabase_key:
+        logger.error("Supabase credentials missing.")
+        sys.exit(1)
+
+    summary = export_region_snapshot(create_client(supabase_url, supabase_key), args.output)
+    logger.info(f"Summary: {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,12 @@ from supabase import create_client, Client
 import xml.etree.ElementTree as ET
 from dotenv import load_dotenv
 
+# Add repo root to path for scripts.* imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from scripts.utils.data_version import bump_data_version
+from scripts.region_code.export_region_snapshot import export_region_snapshot
+
 # .env 파일 로드
 load_dotenv()
 
@@ -411,6 +417,16 @@ def main():
     print(f"  - Depth 3 (읍/면/동): {stats.get(3, 0)}개")
     print(f"  - Depth 4 (리): {stats.get(4, 0)}개")
 
+    # 웹훅 번들용 행정구역 스냅샷 갱신 (배포 시 반영)
+    print("\n🗺️  행정구역 스냅샷 생성 중...")
+    bump_data_version(supabase, 'regions')
+    try:
+        summary = export_region_snapshot(supabase)
+        print(f"  ✅ 스냅샷 생성 완료: 시/도 {summary['sido']}개, 시/군/구 {summary['sgg']}개 (version={summary['version']})")
+        print("  📦 kakao_webhook 재배포 시 반영됩니다 (./build.sh)")
+    except Exception as e:
+        print(f"  ⚠️  스냅샷 생성 실패: {e}")
+
 
 if __name__ == '__main__':
     main()
@@ -6,6 +6,8 @@
 1. 중앙부처 복지 데이터 수집
 2. 지자체 복지 데이터 수집
 3. 임베딩 생성 (변경된 항목만)
+4. 세그먼트 자격 인덱스 갱신 (사용자 세그먼트별 혜택 id 사전 계산)
+5. 신규 혜택 알림 (세그먼트별 신규 혜택 매칭 → 사용자별 요약 발송, 기본 dry run)
 
 사용법:
     python scripts/run_full_pipeline.py
@@ -14,6 +16,8 @@
     python scripts/run_full_pipeline.py --skip-national  # 중앙부처 스킵
     python scripts/run_full_pipeline.py --skip-local     # 지자체 스킵
     python scripts/run_full_pipeline.py --skip-embedding # 임베딩 스킵
+    python scripts/run_full_pipeline.py --skip-segments  # 세그먼트 인덱스 갱신 스킵
+    python scripts/run_full_pipeline.py --skip-notifications  # 신규 혜택 알림 스킵
 """
 
 import os
@@ -44,6 +48,8 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 NATIONAL_SCRIPT = os.path.join(SCRIPT_DIR, "data_collection", "collect_national_welfare.py")
 LOCAL_SCRIPT = os.path.join(SCRIPT_DIR, "data_collection", "collect_local_welfare.py")
 EMBEDDING_SCRIPT = os.path.join(SCRIPT_DIR, "embeddings", "generate_embeddings.py")
+SEGMENT_SCRIPT = os.path.join(SCRIPT_DIR, "segments", "refresh_segment_eligibility.py")
+NOTIFY_SCRIPT = os.path.join(SCRIPT_DIR, "notifications", "notify_new_benefits.py")
 
 
 def run_script(script_path, script_name):
@@ -111,6 +117,8 @@ def main():
     parser.add_argument("--skip-national", action="store_true", help="Skip national welfare collection")
     parser.add_argument("--skip-local", action="store_true", help="Skip local welfare collection")
     parser.add_argument("--skip-embedding", action="store_true", help="Skip embedding generation")
+    parser.add_argument("--skip-segments", action="store_true", help="Skip segment eligibility refresh")
+    parser.add_argument("--skip-notifications", action="store_true", help="Skip new benefit notifications")
     args = parser.parse_args()
     
     logger.info("")
@@ -167,6 +175,28 @@ def main():
         results["embedding"] = None
         stats["embedding"] = {}
     
+    # Step 4: Segment Eligibility Refresh
+    # 수집이 일부 실패해도 DB에 반영된 데이터 기준으로 인덱스를 맞춰둠 (버전이 같으면 건너뜀)
+    if not args.skip_segments:
+        success, data = run_script(SEGMENT_SCRIPT, "세그먼트 자격 인덱스 갱신")
+        results["segments"] = success
+        stats["segments"] = data
+    else:
+        logger.info("⏭️  Skipping: 세그먼트 자격 인덱스 갱신")
+        results["segments"] = None
+        stats["segments"] = {}
+    
+    # Step 5: New Benefit Notifications
+    # 워터마크 이후 실제로 바뀐 혜택만 대상 (발송기는 NOTIFICATION_SENDER, 기본 log = dry run)
+    if not args.skip_notifications:
+        success, data = run_script(NOTIFY_SCRIPT, "신규 혜택 알림")
+        results["notifications"] = success
+        stats["notifications"] = data
+    else:
+        logger.info("⏭️  Skipping: 신규 혜택 알림")
+        results["notifications"] = None
+        stats["notifications"] = {}
+    
     # Summary
     pipeline_elapsed = time.time() - pipeline_start
     
@@ -215,6 +245,31 @@ def main():
     else:
         logger.info(f"  임베딩 생성:   ❌ Failed")
     
+    # Segments
+    if results.get('segments') is None:
+        logger.info(f"  세그먼트 인덱스: ⏭️  Skipped")
+    elif results.get('segments'):
+        seg_data = stats.get('segments', {})
+        refreshed = seg_data.get('refreshed', 0)
+        skipped = seg_data.get('skipped', 0)
+        removed = seg_data.get('removed', 0)
+        logger.info(f"  세그먼트 인덱스: ✅ Success (갱신: {refreshed}개, 스킵: {skipped}개, 삭제: {removed}개)")
+    else:
+        logger.info(f"  세그먼트 인덱스: ❌ Failed")
+    
+    # Notifications
+    if results.get('notifications') is None:
+        logger.info(f"  신규 혜택 알림: ⏭️  Skipped")
+    elif results.get('notifications'):
+        noti_data = stats.get('notifications', {})
+        status = noti_data.get('status', '-')
+        sent = noti_data.get('sent', 0)
+        failed = noti_data.get('failed', 0)
+        segments = noti_data.get('segments', 0)
+        logger.info(f"  신규 혜택 알림: ✅ Success ({status}, 세그먼트: {segments}개, 발송: {sent}명, 실패: {failed}명)")
+    else:
+        logger.info(f"  신규 혜택 알림: ❌ Failed")
+    
 
     
     # Exit code
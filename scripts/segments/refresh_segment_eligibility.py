@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+세그먼트 자격 인덱스 갱신 스크립트
+
+수집/임베딩 파이프라인이 끝난 뒤 실행하여 활성 사용자 세그먼트
+(시도/시군구/생애주기/대상)별 자격 충족 혜택 id를 segment_eligibility에 미리 계산합니다.
+get_eligible_benefits/match_benefits는 인덱스가 최신 데이터 버전일 때 전체 스캔 대신 id 목록을 사용합니다.
+
+사용법:
+    python scripts/segments/refresh_segment_eligibility.py          # 버전이 바뀐 세그먼트만
+    python scripts/segments/refresh_segment_eligibility.py --full   # 전체 재계산
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from dotenv import load_dotenv
+from supabase import create_client
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh per-segment eligibility index")
+    parser.add_argument("--full", action="store_true", help="Recompute every segment even if up to date")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        logger.error("Supabase credentials missing.")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+    start = time.time()
+    try:
+        response = supabase.rpc("refresh_segment_eligibility", {"p_full": args.full}).execute()
+    except Exception as e:
+        logger.error(f"❌ Segment eligibility refresh failed: {e}")
+        sys.exit(1)
+
+    result = response.data or {}
+    logger.info(
+        f"✅ Segment eligibility refreshed in {time.time() - start:.1f}s "
+        f"(version: {result.get('version')}, refreshed: {result.get('refreshed', 0)}, "
+        f"skipped: {result.get('skipped', 0)}, removed: {result.get('removed', 0)})"
+    )
+
+    # Output for pipeline parsing
+    print(f"\n__PIPELINE_RESULT__:{json.dumps(result)}")
+
+
+if __name__ == "__main__":
+    main()
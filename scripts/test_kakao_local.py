@@ -41,16 +41,19 @@ spec.loader.exec_module(kakao_app)
 
 lambda_handler = kakao_app.lambda_handler
 
-def create_mock_event(user_id, utterance):
-    """카카오 웹훅 이벤트 시뮬레이션"""
+def create_mock_event(user_id, utterance, callback_url=None):
+    """카카오 웹훅 이벤트 시뮬레이션 (callback_url: 콜백이 켜진 블록)"""
+    user_request = {
+        'user': {
+            'id': user_id
+        },
+        'utterance': utterance
+    }
+    if callback_url:
+        user_request['callbackUrl'] = callback_url
     return {
         'body': json.dumps({
-            'userRequest': {
-                'user': {
-                    'id': user_id
-                },
-                'utterance': utterance
-            }
+            'userRequest': user_request
         }, ensure_ascii=False)
     }
 
@@ -208,6 +211,80 @@ def test_existing_user():
         except Exception as e:
             print(f"❌ 실패: {e}")
 
+def test_repeated_command():
+    """같은 명령어 재입력 테스트 ('처음으로' → 시/도 선택 → '처음으로'가 다시 초기화해야 함)"""
+    print("\n" + "=" * 60)
+    print("🧪 같은 명령어 재입력 테스트")
+    print("=" * 60)
+    
+    test_user_id = "test_user_repeat_" + str(os.getpid())
+    scenarios = ["처음으로", "서울특별시", "처음으로"]
+    
+    try:
+        for utterance in scenarios:
+            print(f"입력: '{utterance}'")
+            body = json.loads(lambda_handler(create_mock_event(test_user_id, utterance), {})['body'])
+            replies = [qr['label'] for qr in body.get('template', {}).get('quickReplies', [])]
+            print(f"🔘 Quick Reply: {replies[:5]}")
+        
+        # 마지막 '처음으로'는 시/도 선택 메뉴여야 함 (직전 '처음으로' 응답 재생이 아니라 다시 처리)
+        if '서울특별시' not in replies:
+            print(f"❌ 실패: 시/도 선택 메뉴가 아님 ({replies})")
+            return False
+        
+        # 쓰기 지연 모드면 백그라운드 RPC가 끝난 뒤 확인
+        if kakao_app.write_behind_enabled():
+            kakao_app.get_write_queue().flush(timeout=10)
+        supabase = kakao_app.ContainerResources.get_supabase()
+        rows = supabase.table('users').select('ctpv_nm, sgg_nm').eq('kakao_user_id', test_user_id).execute().data
+        if not rows or rows[0]['ctpv_nm']:
+            print(f"❌ 실패: 유저 정보가 초기화되지 않음 ({rows})")
+            return False
+        print("✅ 성공 (두 번째 '처음으로'가 유저 정보를 초기화)")
+        return True
+    except Exception as e:
+        print(f"❌ 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_callback_mode():
+    """콜백 모드 테스트 (useCallback 즉시 응답 → 로컬 대역 서버로 결과 POST)"""
+    print("\n" + "=" * 60)
+    print("🧪 콜백 모드 테스트")
+    print("=" * 60)
+    
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from kakao_callback_server import start_callback_server, summarize
+    
+    server, received = start_callback_server()
+    callback_url = f"http://127.0.0.1:{server.server_port}/callback/local-task"
+    previous_mode = kakao_app.KAKAO_CALLBACK_MODE
+    kakao_app.KAKAO_CALLBACK_MODE = 'always'
+    
+    try:
+        test_user_id = "test_user_local_" + str(os.getpid())
+        event = create_mock_event(test_user_id, "청년 일자리 지원금 알려줘", callback_url=callback_url)
+        body = json.loads(lambda_handler(event, {})['body'])
+        
+        if not body.get('useCallback'):
+            print(f"❌ 실패: useCallback 응답이 아님 ({body})")
+            return False
+        print(f"응답: {body['data']['text']} (useCallback)")
+        
+        item = received.get(timeout=60)
+        print("📬 콜백 수신:")
+        for line in summarize(item['body']):
+            print(f"   - {line}")
+        print("✅ 성공")
+        return True
+    except Exception as e:
+        print(f"❌ 실패: {e}")
+        return False
+    finally:
+        kakao_app.KAKAO_CALLBACK_MODE = previous_mode
+        server.shutdown()
+
 def main():
     """메인 테스트"""
     print("\n🚀 로컬 테스트 시작\n")
@@ -232,6 +309,12 @@ def main():
         
         # Test existing user scenarios
         test_existing_user()
+        
+        # Same command twice must be processed again (not replayed)
+        test_repeated_command()
+        
+        # Callback (async skill) mode
+        test_callback_mode()
     
     return success
 
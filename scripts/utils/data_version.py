@@ -0,0 +1,30 @@
+"""
+데이터 버전 워터마크 유틸리티
+
+수집/임베딩 스크립트가 실행을 마칠 때 호출하면 Lambda의 Whitelist 캐시 등이
+새 버전을 감지하고 이전 캐시를 버립니다.
+
+사용법:
+    from scripts.utils.data_version import bump_data_version
+
+    bump_data_version(supabase)             # 'benefits' 버전 +1
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BENEFITS_DATA_VERSION = "benefits"
+
+
+def bump_data_version(supabase, name: str = BENEFITS_DATA_VERSION) -> Optional[int]:
+    """data_versions 워터마크 증가. 실패해도 파이프라인은 계속 진행 (None 반환)"""
+    try:
+        response = supabase.rpc("bump_data_version", {"p_name": name}).execute()
+        version = response.data
+        logger.info(f"🔖 Data version bumped: {name} -> {version}")
+        return version
+    except Exception as e:
+        logger.error(f"Failed to bump data version ({name}): {e}")
+        return None
@@ -0,0 +1,92 @@
+-- ============================================
+-- benefit_embeddings → region_key LIST 파티션 전환 (기존 DB 1회 실행)
+-- ============================================
+--
+-- schema.sql은 새 DB에서 파티션 테이블을 만들지만, 이미 있는 일반 테이블은 바꾸지 않습니다.
+-- 이 스크립트는 기존 테이블을 옆으로 옮기고 schema.sql로 파티션 테이블을 만든 뒤 데이터를 복사합니다.
+--
+-- 1. 기존 테이블/인덱스 이름 변경 (*_unpartitioned)
+-- 2. schema.sql 실행 → 파티션 테이블 + 파티션 생성
+-- 3. 새 테이블의 HNSW 인덱스 삭제 (행마다 그래프 삽입하지 않도록)
+-- 4. 데이터 복사 (region_key 계산, 생성 컬럼 embedding_256/512/768은 자동 계산)
+-- 5. 기존 테이블 삭제
+-- 6. schema.sql 재실행 → 파티션별 HNSW 인덱스 일괄 생성
+--
+-- ⚠️ 복사 중에는 검색 결과가 비어 있을 수 있습니다. 임베딩 생성(generate_embeddings.py)이 돌지 않는 시간에 실행하세요.
+--
+-- 사용법 (저장소 루트에서):
+--    psql "$DATABASE_URL" -f supabase/migrations/20261017_partition_benefit_embeddings.sql
+--
+-- 확인:
+--    select tableoid::regclass, count(*) from benefit_embeddings group by 1 order by 2 desc;
+
+\set ON_ERROR_STOP on
+
+set maintenance_work_mem = '1GB';
+
+-- --------------------------------------------
+-- 1. 기존 테이블 이름 변경 (이미 파티션 테이블이면 중단)
+-- --------------------------------------------
+do $$
+declare
+  v_index record;
+begin
+  if (select c.relkind from pg_class c where c.oid = 'benefit_embeddings'::regclass) = 'p' then
+    raise exception 'benefit_embeddings is already partitioned';
+  end if;
+
+  alter table benefit_embeddings rename to benefit_embeddings_unpartitioned;
+
+  -- 인덱스 이름은 스키마 전역이므로 새 테이블과 겹치지 않게 변경 (PK 포함)
+  for v_index in
+    select indexname from pg_indexes
+    where schemaname = current_schema() and tablename = 'benefit_embeddings_unpartitioned'
+  loop
+    execute format('alter index %I rename to %I', v_index.indexname, v_index.indexname || '_unpartitioned');
+  end loop;
+
+  drop trigger if exists sync_benefit_embeddings_filter_columns on benefit_embeddings_unpartitioned;
+  drop trigger if exists fix_benefit_embeddings_region_key on benefit_embeddings_unpartitioned;
+end $$;
+
+-- --------------------------------------------
+-- 2. 파티션 테이블 생성
+-- --------------------------------------------
+\ir ../schema.sql
+
+-- --------------------------------------------
+-- 3~5. HNSW 인덱스 없이 복사 후 기존 테이블 삭제
+-- --------------------------------------------
+begin;
+
+drop index if exists idx_benefit_embeddings_vector_welfare;
+drop index if exists idx_benefit_embeddings_vector_job;
+drop index if exists idx_benefit_embeddings_vector_welfare_256;
+drop index if exists idx_benefit_embeddings_vector_welfare_512;
+drop index if exists idx_benefit_embeddings_vector_welfare_768;
+
+insert into benefit_embeddings (
+  id, category, benefit_id, job_posting_id, embedding, content_chunk, chunk_index, created_at,
+  region_key, is_active, enfc_end_ymd, source_api, ctpv_nm, sgg_nm, trgter_indvdl_nm_array, life_nm_array
+)
+select
+  id, category, benefit_id, job_posting_id, embedding, content_chunk, chunk_index, created_at,
+  embedding_region_key(source_api, ctpv_nm), is_active, enfc_end_ymd, source_api, ctpv_nm, sgg_nm,
+  trgter_indvdl_nm_array, life_nm_array
+from benefit_embeddings_unpartitioned;
+
+drop table benefit_embeddings_unpartitioned;
+
+commit;
+
+-- --------------------------------------------
+-- 6. 파티션별 인덱스 생성 + 통계
+-- --------------------------------------------
+\ir ../schema.sql
+
+analyze benefit_embeddings;
+
+select tableoid::regclass as partition, count(*) as chunks
+from benefit_embeddings
+group by 1
+order by 2 desc;
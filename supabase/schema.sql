@@ -6,6 +6,7 @@
 -- [1] 확장 및 환경 설정
 create extension if not exists vector;
 create extension if not exists "uuid-ossp";
+create extension if not exists pg_trgm;  -- 사업명 부분 일치 (hybrid_match_benefits)
 
 comment on extension vector is '시니어 혜택 문맥 검색을 위한 벡터 연산 확장';
 
@@ -175,6 +176,7 @@ create table if not exists benefits (
   inq_num integer default 0,                         -- 조회수
   is_active boolean default true,
   content_hash text,                                 -- 중복 제거용
+  render_card jsonb,                                 -- 사전 렌더링 응답 카드 (common/card_renderer.py)
   
   created_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul'),
   updated_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
@@ -188,6 +190,15 @@ comment on column benefits.content_for_embedding is 'target_detail + select_crit
 comment on column benefits.content_hash is '2단계 중복 제거: 1단계 문자열 해시 비교용';
 comment on column benefits.enfc_end_ymd is '마감일 (NULL = 상시, 99991231 = 무기한)';
 
+-- 기존 DB 마이그레이션용 (create table if not exists는 컬럼을 추가하지 않음)
+alter table benefits add column if not exists render_card jsonb;
+comment on column benefits.render_card is '수집 시점에 렌더링한 카카오 textCard + 텍스트 fallback ({v, card, text})';
+
+-- 수집기는 upsert마다 updated_at을 갱신하므로, 실제 변경 시각은 트리거(track_benefit_content_change)가 따로 기록
+alter table benefits add column if not exists content_changed_at timestamp with time zone;
+update benefits set content_changed_at = coalesce(created_at, updated_at) where content_changed_at is null;
+comment on column benefits.content_changed_at is '신규 등록/내용(content_hash)/자격 조건 변경/재활성화 시각 (신규 혜택 알림 기준)';
+
 -- 인덱스 생성
 create index if not exists idx_benefits_serv_id on benefits(serv_id);
 create index if not exists idx_benefits_source_api on benefits(source_api);
@@ -204,6 +215,7 @@ create index if not exists idx_benefits_trgter on benefits using gin(trgter_indv
 -- 기간 검색 인덱스
 create index if not exists idx_benefits_dates on benefits(enfc_end_ymd) where is_active = true;
 create index if not exists idx_benefits_updated_at on benefits(updated_at);
+create index if not exists idx_benefits_content_changed on benefits(content_changed_at) where is_active = true;
 
 -- 중복 제거 인덱스
 create index if not exists idx_benefits_hash on benefits(content_hash);
@@ -218,13 +230,18 @@ create index if not exists idx_benefits_content_search on benefits using gin(
   )
 );
 
+-- 사업명 트라이그램 인덱스 (hybrid_match_benefits: 검색어 토큰 <% serv_nm)
+create index if not exists idx_benefits_serv_nm_trgm on benefits using gin(serv_nm gin_trgm_ops);
+
 -- ============================================
 -- AI/RAG 데이터 테이블
 -- ============================================
 
 -- [6] 벡터 데이터 저장소 (복지 + 일자리 통합) 🔥
+-- region_key(시도명 | 'NATIONAL') 기준 LIST 파티션 → 검색은 사용자 시도 + 전국 파티션의 작은 HNSW 인덱스만 탐색
+-- 기존(파티션 이전) DB는 supabase/migrations/20261017_partition_benefit_embeddings.sql로 전환
 create table if not exists benefit_embeddings (
-  id uuid primary key default uuid_generate_v4(),
+  id uuid not null default uuid_generate_v4(),
   
   -- 카테고리 (네임스페이스 역할, Partial Index용)
   category varchar(20) not null default 'WELFARE'
@@ -242,12 +259,60 @@ create table if not exists benefit_embeddings (
   -- 타임스탬프 (한국 시간)
   created_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul'),
   
+  -- 파티션 키: embedding_region_key(source_api, ctpv_nm) (일자리/미지정은 'NATIONAL')
+  region_key text not null default 'NATIONAL',
+  
+  -- 파티션 테이블의 PK는 파티션 키를 포함해야 함
+  primary key (id, region_key),
+  
   -- 제약조건: benefit_id OR job_posting_id (둘 중 하나만)
   constraint check_single_reference check (
     (benefit_id is not null and job_posting_id is null) or
     (benefit_id is null and job_posting_id is not null)
   )
-);
+) partition by list (region_key);
+
+-- 파티션 (시도별 + 전국 + 그 외 이름은 default), 파티션 이전 DB에서는 건너뜀
+do $$
+declare
+  v_partition record;
+begin
+  if (select c.relkind from pg_class c where c.oid = 'benefit_embeddings'::regclass) <> 'p' then
+    raise notice '⚠️ benefit_embeddings is not partitioned - run supabase/migrations/20261017_partition_benefit_embeddings.sql';
+    return;
+  end if;
+
+  for v_partition in
+    select * from (values
+      ('national', array['NATIONAL']),
+      ('seoul', array['서울특별시']),
+      ('busan', array['부산광역시']),
+      ('daegu', array['대구광역시']),
+      ('incheon', array['인천광역시']),
+      ('gwangju', array['광주광역시']),
+      ('daejeon', array['대전광역시']),
+      ('ulsan', array['울산광역시']),
+      ('sejong', array['세종특별자치시']),
+      ('gyeonggi', array['경기도']),
+      ('gangwon', array['강원특별자치도', '강원도']),
+      ('chungbuk', array['충청북도']),
+      ('chungnam', array['충청남도']),
+      ('jeonbuk', array['전북특별자치도', '전라북도']),
+      ('jeonnam', array['전라남도']),
+      ('gyeongbuk', array['경상북도']),
+      ('gyeongnam', array['경상남도']),
+      ('jeju', array['제주특별자치도'])
+    ) as t(suffix, region_keys)
+  loop
+    execute format(
+      'create table if not exists %I partition of benefit_embeddings for values in (%s)',
+      'benefit_embeddings_' || v_partition.suffix,
+      (select string_agg(quote_literal(k), ', ') from unnest(v_partition.region_keys) k)
+    );
+  end loop;
+
+  create table if not exists benefit_embeddings_other partition of benefit_embeddings default;
+end $$;
 
 comment on table benefit_embeddings is '복지/일자리 통합 벡터 임베딩 (OpenAI text-embedding-3-small)';
 comment on column benefit_embeddings.category is '서비스 카테고리: WELFARE(복지), JOB(일자리) - Partial Index 최적화용';
@@ -255,8 +320,13 @@ comment on column benefit_embeddings.benefit_id is '복지 테이블 참조 (cat
 comment on column benefit_embeddings.job_posting_id is '일자리 테이블 참조 (category=JOB일 때)';
 comment on column benefit_embeddings.embedding is 'OpenAI text-embedding-3-small 모델 사용 (1536차원)';
 comment on column benefit_embeddings.chunk_index is '긴 공고문 분할 시 원본 순서 보존';
+comment on column benefit_embeddings.region_key is '파티션 키: 중앙부처/전국 혜택은 NATIONAL, 지자체 혜택은 시도명';
+
+-- 파티션 이전 DB용 (create table if not exists는 컬럼을 추가하지 않음)
+alter table benefit_embeddings add column if not exists region_key text not null default 'NATIONAL';
 
 -- 카테고리별 Partial HNSW 인덱스 (성능 최적화!) 🔥
+-- 파티션 테이블에서는 파티션마다 인덱스가 만들어짐 (시도별로 작은 그래프)
 -- WELFARE 전용 벡터 인덱스
 create index if not exists idx_benefit_embeddings_vector_welfare 
   on benefit_embeddings 
@@ -279,6 +349,169 @@ create index if not exists idx_benefit_embeddings_job_posting_id on benefit_embe
 comment on index idx_benefit_embeddings_vector_welfare is 'WELFARE 전용 HNSW 인덱스 (검색 속도 2배 향상)';
 comment on index idx_benefit_embeddings_vector_job is 'JOB 전용 HNSW 인덱스 (검색 속도 2배 향상)';
 
+-- [6-1] 검색 필터 컬럼 (benefits에서 복사, 벡터 검색이 benefits 조인 없이 필터링) ⚡
+-- 청크 삽입 시 sync_embedding_filter_columns 트리거가 채우고,
+-- benefits의 해당 컬럼이 바뀌면 propagate_benefit_filter_columns 트리거가 모든 청크에 반영
+alter table benefit_embeddings add column if not exists is_active boolean not null default true;
+alter table benefit_embeddings add column if not exists enfc_end_ymd date;
+alter table benefit_embeddings add column if not exists source_api varchar(20);
+alter table benefit_embeddings add column if not exists ctpv_nm varchar(50);
+alter table benefit_embeddings add column if not exists sgg_nm varchar(50);
+alter table benefit_embeddings add column if not exists trgter_indvdl_nm_array text[];
+alter table benefit_embeddings add column if not exists life_nm_array text[];
+
+comment on column benefit_embeddings.is_active is 'benefits.is_active 복사본 (트리거 동기화, 검색 필터용)';
+comment on column benefit_embeddings.ctpv_nm is 'benefits.ctpv_nm 복사본 (트리거 동기화, 검색 필터용)';
+
+-- [6-2] 축소 차원 임베딩 (Matryoshka) ⚡
+-- text-embedding-3-small은 앞쪽 N차원을 잘라 정규화해도 dimensions=N 임베딩과 동일
+-- 원본(1536)에서 자동 계산되므로 임베딩 생성기는 변경 없음 (pgvector >= 0.7 필요)
+-- 검색 차원은 Lambda 환경변수 EMBEDDING_DIMENSIONS (256/512/768/1536)로 선택
+alter table benefit_embeddings
+  add column if not exists embedding_256 vector(256)
+    generated always as (l2_normalize(subvector(embedding, 1, 256))::vector(256)) stored;
+alter table benefit_embeddings
+  add column if not exists embedding_512 vector(512)
+    generated always as (l2_normalize(subvector(embedding, 1, 512))::vector(512)) stored;
+alter table benefit_embeddings
+  add column if not exists embedding_768 vector(768)
+    generated always as (l2_normalize(subvector(embedding, 1, 768))::vector(768)) stored;
+
+comment on column benefit_embeddings.embedding_256 is 'embedding 앞 256차원 (L2 정규화, 자동 계산)';
+comment on column benefit_embeddings.embedding_512 is 'embedding 앞 512차원 (L2 정규화, 자동 계산)';
+comment on column benefit_embeddings.embedding_768 is 'embedding 앞 768차원 (L2 정규화, 자동 계산)';
+
+create index if not exists idx_benefit_embeddings_vector_welfare_256
+  on benefit_embeddings
+  using hnsw (embedding_256 vector_cosine_ops)
+  with (m = 16, ef_construction = 64)
+  where category = 'WELFARE';
+
+create index if not exists idx_benefit_embeddings_vector_welfare_512
+  on benefit_embeddings
+  using hnsw (embedding_512 vector_cosine_ops)
+  with (m = 16, ef_construction = 64)
+  where category = 'WELFARE';
+
+create index if not exists idx_benefit_embeddings_vector_welfare_768
+  on benefit_embeddings
+  using hnsw (embedding_768 vector_cosine_ops)
+  with (m = 16, ef_construction = 64)
+  where category = 'WELFARE';
+
+-- [7] 쿼리 임베딩 캐시 (RAGService 3단계 캐시의 공유 tier) ⚡
+-- 키: sha256(model:dimensions:정규화 발화)
+-- 배포 시 scripts/embeddings/seed_query_cache.py가 Quick Reply 발화를 미리 적재
+create table if not exists query_embedding_cache (
+  cache_key text primary key,
+  normalized_text text not null,
+  model varchar(100) not null,
+  dimensions int not null,
+  embedding real[] not null,                        -- 차원 무관 저장 (PostgREST에서 JSON 배열로 반환)
+  created_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+comment on table query_embedding_cache is '사용자 발화 임베딩 캐시 (OpenAI 호출 절감, 컨테이너 간 공유)';
+comment on column query_embedding_cache.cache_key is 'sha256(model:dimensions:normalized_text)';
+
+-- [8] 데이터 버전 워터마크 (캐시 무효화용)
+-- 수집기/임베딩 스크립트가 실행 종료 시 bump_data_version('benefits') 호출
+create table if not exists data_versions (
+  name text primary key,                            -- 'benefits' 등
+  version bigint not null default 0,
+  updated_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+comment on table data_versions is '데이터셋별 버전 워터마크 (Lambda 캐시 무효화 기준)';
+
+-- [9] 프로필 세그먼트 Whitelist 캐시 (RAGService WhitelistCache의 공유 tier, 선택)
+create table if not exists whitelist_cache (
+  segment_key text primary key,                     -- '시도|시군구|생애주기|대상#YYYY-MM-DD'
+  data_version bigint not null,
+  items jsonb not null,                             -- get_eligible_benefits 결과
+  created_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+comment on table whitelist_cache is 'get_eligible_benefits 결과 캐시 (세그먼트 키 + 데이터 버전)';
+
+-- [9-2] 프로필 세그먼트 자격 인덱스 (파이프라인 실행 후 refresh_segment_eligibility로 갱신) ⚡
+-- 실제 사용자 세그먼트(시도/시군구/생애주기/대상)별로 자격 충족 혜택 id를 미리 계산
+-- 기간 조건(enfc_end_ymd)은 날짜에 따라 바뀌므로 포함하지 않고 조회 시점에 적용
+create table if not exists segment_eligibility (
+  segment_key text primary key,                     -- make_segment_key() 결과 ('시도|시군구|생애주기|대상')
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  life_cycle text[],
+  target_group text[],
+  benefit_ids bigint[] not null default '{}',       -- 정렬된 혜택 id 목록
+  data_version bigint not null,                     -- 계산 당시 data_versions('benefits') 버전
+  refreshed_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+comment on table segment_eligibility is '세그먼트별 자격 충족 혜택 id (get_eligible_benefits/match_benefits가 최신 버전일 때 사용)';
+
+-- [9-3] 웹훅 요청 중복 억제 (처리 중인 요청의 카카오 재전송을 원 요청 결과로 응답, common/idempotency.py의 공유 tier)
+-- IDEMPOTENCY_TABLE_ENABLED=true일 때만 사용, 만료 행은 claim_webhook_request가 정리
+create table if not exists webhook_requests (
+  request_key text primary key,                     -- sha256(봇 + 유저 + 발화 + 블록/액션 파라미터)
+  response jsonb,                                   -- 처리 완료 전에는 null
+  expires_at timestamp with time zone not null,
+  created_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+create index if not exists idx_webhook_requests_expires on webhook_requests (expires_at);
+
+comment on table webhook_requests is '카카오 스킬 요청 선점/응답 (짧은 TTL, 컨테이너 간 중복 처리 방지)';
+
+-- [9-4] 유저별 검색 세션 ("더보기" 페이지 이동, common/search_session.py의 공유 tier)
+-- 유저당 1행 (새 검색 시 덮어씀), 카드는 저장하지 않고 benefits에서 id로 조회
+create sequence if not exists search_sessions_seq;
+
+create table if not exists search_sessions (
+  kakao_user_id text primary key,
+  session_id text not null,                         -- 검색마다 새 값 (컨테이너 세션과 같은 검색인지 판별)
+  session_seq bigint not null default nextval('search_sessions_seq'), -- DB가 매기는 세션 순서 (session_id가 바뀔 때마다 증가, 트리거)
+  query text not null,
+  profile_key text not null,                        -- '시도|시군구|생애주기|대상' (프로필이 바뀌면 무효)
+  results jsonb not null,                           -- 순위 순서 [{"id", "source_type", "similarity"}, ...]
+  next_offset int not null default 0,               -- 다음 페이지 시작 위치
+  auto_search boolean not null default false,
+  expires_at timestamp with time zone not null,
+  updated_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul')
+);
+
+alter table search_sessions add column if not exists session_seq bigint not null default nextval('search_sessions_seq');
+
+comment on table search_sessions is '마지막 검색의 순위 결과 id (더보기 시 임베딩/벡터 검색 없이 다음 페이지)';
+
+-- [9-5] 신규 혜택 알림 실행 기록 (scripts/notifications/notify_new_benefits.py)
+-- 마지막 completed 실행의 until이 다음 실행의 since (워터마크), partial/dry_run은 워터마크를 옮기지 않음
+create table if not exists notification_runs (
+  id bigint primary key generated always as identity,
+  since timestamp with time zone,                   -- null = 첫 실행 (기준점만 기록, 발송 없음)
+  until timestamp with time zone not null,
+  status text not null default 'running'
+    check (status in ('running', 'completed', 'partial', 'failed', 'dry_run')),
+  stats jsonb,                                      -- 세그먼트/대상자/발송/실패 건수
+  started_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul'),
+  finished_at timestamp with time zone
+);
+
+create index if not exists idx_notification_runs_completed on notification_runs (until desc) where status = 'completed';
+
+comment on table notification_runs is '신규 혜택 알림 실행 이력 (content_changed_at 워터마크)';
+
+-- [9-6] 신규 혜택 알림 발송 이력 (유저 × 혜택당 1회만 알림, 재실행/부분 실패 시 중복 발송 방지)
+create table if not exists notification_deliveries (
+  user_id uuid not null references users(id) on delete cascade,
+  benefit_id bigint not null references benefits(id) on delete cascade,
+  run_id bigint references notification_runs(id) on delete set null,
+  sent_at timestamp with time zone default (now() AT TIME ZONE 'Asia/Seoul'),
+  primary key (user_id, benefit_id)
+);
+
+comment on table notification_deliveries is '유저별로 이미 알린 혜택 (같은 혜택은 다시 알리지 않음)';
+
 -- ============================================
 -- 유틸리티 함수
 -- ============================================
@@ -306,93 +539,624 @@ drop trigger if exists update_regions_updated_at on regions;
 create trigger update_regions_updated_at before update on regions
   for each row execute function update_updated_at_column();
 
+drop trigger if exists update_search_sessions_updated_at on search_sessions;
+create trigger update_search_sessions_updated_at before update on search_sessions
+  for each row execute function update_updated_at_column();
+
+-- 검색 세션 순서 (upsert의 on conflict update에는 default가 적용되지 않으므로 트리거로 새 번호 부여)
+-- 어느 세션이 최신인지는 컨테이너 시계가 아니라 이 번호로 판단 (common/search_session.py)
+create or replace function assign_search_session_seq()
+returns trigger as $$
+begin
+  if new.session_id is distinct from old.session_id then
+    new.session_seq = nextval('search_sessions_seq');
+  else
+    new.session_seq = old.session_seq;
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+comment on function assign_search_session_seq() is '새 검색 세션으로 덮어쓸 때 session_seq 증가 (같은 세션의 offset 갱신은 유지)';
+
+drop trigger if exists assign_search_session_seq on search_sessions;
+create trigger assign_search_session_seq before update on search_sessions
+  for each row execute function assign_search_session_seq();
+
+-- [10-1] 혜택 실제 변경 시각 기록 (신규 혜택 알림용)
+-- 신규 등록, 내용 해시 변경, 자격 조건(지역/대상/생애주기) 변경, 비활성 → 활성 전환만 변경으로 봄
+create or replace function track_benefit_content_change()
+returns trigger as $$
+begin
+  if tg_op = 'INSERT' then
+    new.content_changed_at = coalesce(new.content_changed_at, now() AT TIME ZONE 'Asia/Seoul');
+  elsif new.content_hash is distinct from old.content_hash
+     or new.ctpv_nm is distinct from old.ctpv_nm
+     or new.sgg_nm is distinct from old.sgg_nm
+     or new.trgter_indvdl_nm_array is distinct from old.trgter_indvdl_nm_array
+     or new.life_nm_array is distinct from old.life_nm_array
+     or (new.is_active and not coalesce(old.is_active, false)) then
+    new.content_changed_at = now() AT TIME ZONE 'Asia/Seoul';
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+comment on function track_benefit_content_change() is '혜택이 실제로 바뀐 경우에만 content_changed_at 갱신';
+
+drop trigger if exists track_benefits_content_change on benefits;
+create trigger track_benefits_content_change before insert or update on benefits
+  for each row execute function track_benefit_content_change();
+
+-- [10-2] 임베딩 검색 필터 컬럼 동기화 (benefits → benefit_embeddings)
+-- 파티션 키 (backend/common/embedding_config.py의 embedding_region_key()와 동일)
+-- 지역 제한이 없는 혜택(중앙부처, 시도 미지정)은 어느 시도의 사용자든 받을 수 있으므로 NATIONAL
+create or replace function embedding_region_key(p_source_api text, p_ctpv text)
+returns text
+language sql
+immutable
+as $$
+  select case when p_source_api = 'NATIONAL' or coalesce(p_ctpv, '') = '' then 'NATIONAL' else p_ctpv end;
+$$;
+
+-- 청크 삽입/참조 변경 시: 원본 혜택의 필터 컬럼 복사 (generate_embeddings.py는 변경 없음)
+create or replace function sync_embedding_filter_columns()
+returns trigger as $$
+begin
+  if new.benefit_id is not null then
+    select b.is_active, b.enfc_end_ymd, b.source_api, b.ctpv_nm, b.sgg_nm, b.trgter_indvdl_nm_array, b.life_nm_array
+    into new.is_active, new.enfc_end_ymd, new.source_api, new.ctpv_nm, new.sgg_nm, new.trgter_indvdl_nm_array, new.life_nm_array
+    from benefits b
+    where b.id = new.benefit_id;
+  end if;
+  return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists sync_benefit_embeddings_filter_columns on benefit_embeddings;
+create trigger sync_benefit_embeddings_filter_columns before insert or update of benefit_id on benefit_embeddings
+  for each row execute function sync_embedding_filter_columns();
+
+-- BEFORE 트리거는 행이 들어갈 파티션을 바꿀 수 없으므로, region_key 없이 삽입된 청크는 삽입 후 UPDATE로 이동
+-- (generate_embeddings.py는 region_key를 직접 넣으므로 보통 실행되지 않음)
+create or replace function fix_embedding_region_key()
+returns trigger as $$
+begin
+  update benefit_embeddings
+  set region_key = embedding_region_key(new.source_api, new.ctpv_nm)
+  where id = new.id and region_key = new.region_key;
+  return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists fix_benefit_embeddings_region_key on benefit_embeddings;
+create trigger fix_benefit_embeddings_region_key after insert on benefit_embeddings
+  for each row
+  when (new.benefit_id is not null and new.region_key is distinct from embedding_region_key(new.source_api, new.ctpv_nm))
+  execute function fix_embedding_region_key();
+
+-- 혜택의 필터 컬럼이 실제로 바뀐 경우에만 청크 갱신 (수집기의 단순 upsert는 청크를 건드리지 않음)
+create or replace function propagate_benefit_filter_columns()
+returns trigger as $$
+begin
+  update benefit_embeddings be
+  set is_active = new.is_active,
+      enfc_end_ymd = new.enfc_end_ymd,
+      source_api = new.source_api,
+      ctpv_nm = new.ctpv_nm,
+      sgg_nm = new.sgg_nm,
+      trgter_indvdl_nm_array = new.trgter_indvdl_nm_array,
+      life_nm_array = new.life_nm_array,
+      region_key = embedding_region_key(new.source_api, new.ctpv_nm)  -- 지역이 바뀌면 파티션 이동
+  where be.benefit_id = new.id;
+  return null;
+end;
+$$ language plpgsql;
+
+drop trigger if exists propagate_benefits_filter_columns on benefits;
+create trigger propagate_benefits_filter_columns after update on benefits
+  for each row
+  when (
+    old.is_active is distinct from new.is_active
+    or old.enfc_end_ymd is distinct from new.enfc_end_ymd
+    or old.source_api is distinct from new.source_api
+    or old.ctpv_nm is distinct from new.ctpv_nm
+    or old.sgg_nm is distinct from new.sgg_nm
+    or old.trgter_indvdl_nm_array is distinct from new.trgter_indvdl_nm_array
+    or old.life_nm_array is distinct from new.life_nm_array
+  )
+  execute function propagate_benefit_filter_columns();
+
+-- 기존 청크 백필 (한 번만 의미 있음, 이후에는 트리거가 유지)
+update benefit_embeddings be
+set is_active = b.is_active,
+    enfc_end_ymd = b.enfc_end_ymd,
+    source_api = b.source_api,
+    ctpv_nm = b.ctpv_nm,
+    sgg_nm = b.sgg_nm,
+    trgter_indvdl_nm_array = b.trgter_indvdl_nm_array,
+    life_nm_array = b.life_nm_array
+from benefits b
+where b.id = be.benefit_id
+  and be.source_api is null;
+
+-- region_key 백필 (파티션 이전 DB에서 컬럼 추가 직후 또는 파티션 전환 전, 필요한 행만)
+update benefit_embeddings be
+set region_key = embedding_region_key(be.source_api, be.ctpv_nm)
+where be.region_key is distinct from embedding_region_key(be.source_api, be.ctpv_nm);
+
+-- [11] 데이터 버전 증가 (+ 이전 버전 Whitelist 캐시 정리)
+create or replace function bump_data_version(p_name text)
+returns bigint
+language plpgsql
+security definer
+as $$
+declare
+  v_version bigint;
+begin
+  insert into data_versions (name, version, updated_at)
+  values (p_name, 1, now() AT TIME ZONE 'Asia/Seoul')
+  on conflict (name) do update
+    set version = data_versions.version + 1,
+        updated_at = now() AT TIME ZONE 'Asia/Seoul'
+  returning version into v_version;
+
+  if p_name = 'benefits' then
+    delete from whitelist_cache where data_version < v_version;
+  end if;
+
+  return v_version;
+end;
+$$;
+
+comment on function bump_data_version(text) is '데이터셋 버전 증가 (수집/임베딩 파이프라인 종료 시 호출)';
+
 -- ============================================
 -- 하이브리드 RAG 검색 함수
 -- ============================================
 
--- [함수 1] 자격요건 Whitelist 조회
-create or replace function get_eligible_benefits(
-  p_ctpv text,          -- 예: '전라남도' (없으면 null)
-  p_sgg text,           -- 예: '진도군' (없으면 null)
-  p_life_array text[],  -- 예: ['노년', '중장년'] (빈배열이면 전체)
-  p_target_array text[] -- 예: ['저소득', '장애인'] (빈배열이면 전체)
-)
-returns table (
-  id bigint,
-  serv_nm varchar(500),
-  srv_pvsn_nm varchar(50),
-  ctpv_nm varchar(50),
-  sgg_nm varchar(50),
-  trgter_indvdl_nm_array text[],
-  life_nm_array text[],
-  serv_dgst text,
-  enfc_end_ymd date,
-  serv_dtl_link varchar(500)
+-- [함수 0-1] 자격 판정 (지역 + 대상 특성 + 생애주기, 기간 조건 제외)
+-- get_eligible_benefits와 세그먼트 인덱스 갱신이 같은 규칙을 쓰도록 한 곳에 정의
+create or replace function benefit_profile_match(
+  b_ctpv varchar,
+  b_sgg varchar,
+  b_target_array text[],
+  b_life_array text[],
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[]
 )
+returns boolean
 language sql
-security definer
+immutable
 as $$
-  select 
-    id,
-    serv_nm,
-    srv_pvsn_nm,
-    ctpv_nm,
-    sgg_nm,
-    trgter_indvdl_nm_array,
-    life_nm_array,
-    serv_dgst,
-    enfc_end_ymd,
-    serv_dtl_link
-  from benefits
-  where 
-    is_active = true
-    
-    -- 1. [기간] 종료일이 없거나(계속), 오늘 이후인 경우
-    and (enfc_end_ymd is null or enfc_end_ymd >= current_date)
-    
-    -- 2. [지역] 
+  select
+    -- 1. [지역]
     -- Case A: 전국 (둘 다 Null)
     -- Case B: 내 시/도 일치 + 시/군/구 Null (광역 혜택)
     -- Case C: 내 시/도 일치 + 내 시/군/구 일치 (기초 혜택)
-    and (
-        (ctpv_nm is null and sgg_nm is null) 
-        or (ctpv_nm = p_ctpv and sgg_nm is null)
-        or (ctpv_nm = p_ctpv and sgg_nm = p_sgg)
+    (
+        (b_ctpv is null and b_sgg is null) 
+        or (b_ctpv = p_ctpv and b_sgg is null)
+        or (b_ctpv = p_ctpv and b_sgg = p_sgg)
     )
 
-    -- 3. [대상] (Array Overlap && 연산자 사용)
+    -- 2. [대상] (Array Overlap && 연산자 사용)
     -- Case A: 서비스 대상이 없음(Null/Empty) → 전국민 대상 (포함)
     -- Case B: 서비스 대상 있음 + 사용자 대상 있음 + 겹침 → 포함
     -- Case C: 서비스 대상 있음 + 사용자 대상 없음 → 제외!
     and (
-        -- Case A: 서비스 대상이 없으면 전국민 대상
-        (trgter_indvdl_nm_array is null or cardinality(trgter_indvdl_nm_array) = 0)
+        (b_target_array is null or cardinality(b_target_array) = 0)
         or
-        -- Case B: 서비스 대상도 있고, 사용자 대상도 있고, 둘이 겹침
-        (trgter_indvdl_nm_array is not null 
-         and cardinality(trgter_indvdl_nm_array) > 0
+        (b_target_array is not null 
+         and cardinality(b_target_array) > 0
          and p_target_array is not null 
          and cardinality(p_target_array) > 0 
-         and trgter_indvdl_nm_array && p_target_array)
+         and b_target_array && p_target_array)
     )
 
-    -- 4. [생애주기] 
+    -- 3. [생애주기] 
     -- 혜택 생애주기가 없거나(Null/Empty) → 모든 연령대 대상
     -- 사용자가 생애주기를 선택하지 않았거나(Null/Empty) → 모든 혜택 검색
     -- 배열이 겹치면 → 해당 혜택 포함
     and (
-        life_nm_array is null 
-        or cardinality(life_nm_array) = 0
+        b_life_array is null 
+        or cardinality(b_life_array) = 0
         or p_life_array is null
         or cardinality(p_life_array) = 0
-        or life_nm_array && p_life_array
+        or b_life_array && p_life_array
     );
 $$;
 
-comment on function get_eligible_benefits(text, text, text[], text[]) is '자격요건 기반 Whitelist 조회 (지역+연령대+대상특성 필터)';
+comment on function benefit_profile_match(varchar, varchar, text[], text[], text, text, text[], text[]) is '혜택-프로필 자격 판정 (지역+대상+생애주기, 기간 제외)';
+
+-- [함수 0-2] 프로필 세그먼트 키
+-- backend/common/segment_cache.py의 segment_key()와 동일한 형식 (배열은 코드포인트 순 정렬)
+-- 예: '서울특별시|종로구|노년|저소득층,장애인'
+create or replace function make_segment_key(
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[]
+)
+returns text
+language sql
+immutable
+as $$
+  select coalesce(p_ctpv, '') || '|' || coalesce(p_sgg, '') || '|'
+    || coalesce(array_to_string(array(select x from unnest(p_life_array) x order by x collate "C"), ','), '') || '|'
+    || coalesce(array_to_string(array(select x from unnest(p_target_array) x order by x collate "C"), ','), '');
+$$;
+
+-- [함수 0-3] 세그먼트 자격 인덱스 조회 (최신 데이터 버전일 때만, 없으면 null)
+create or replace function segment_benefit_ids(
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[]
+)
+returns bigint[]
+language sql
+stable
+as $$
+  select s.benefit_ids
+  from segment_eligibility s
+  where s.segment_key = make_segment_key(p_ctpv, p_sgg, p_life_array, p_target_array)
+    and s.data_version = (select coalesce(max(v.version), 0) from data_versions v where v.name = 'benefits');
+$$;
+
+-- [함수 0-4] 세그먼트 자격 인덱스 갱신 (수집/임베딩 파이프라인 종료 후 호출)
+-- 활성 사용자의 세그먼트만 계산하고, 이미 최신 버전인 세그먼트는 건너뜀 (p_full=true면 전체 재계산)
+create or replace function refresh_segment_eligibility(p_full boolean default false)
+returns jsonb
+language plpgsql
+security definer
+as $$
+declare
+  v_version bigint;
+  v_refreshed int := 0;
+  v_skipped int := 0;
+  v_removed int := 0;
+  seg record;
+begin
+  select coalesce(max(version), 0) into v_version from data_versions where name = 'benefits';
+
+  for seg in
+    select distinct on (k.segment_key) k.*
+    from (
+      select
+        make_segment_key(u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group) as segment_key,
+        u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group
+      from users u
+      where u.is_active = true
+        and u.ctpv_nm <> ''
+    ) k
+    order by k.segment_key
+  loop
+    if not p_full and exists (
+      select 1 from segment_eligibility s
+      where s.segment_key = seg.segment_key and s.data_version = v_version
+    ) then
+      v_skipped := v_skipped + 1;
+      continue;
+    end if;
+
+    insert into segment_eligibility (segment_key, ctpv_nm, sgg_nm, life_cycle, target_group, benefit_ids, data_version, refreshed_at)
+    values (
+      seg.segment_key, seg.ctpv_nm, seg.sgg_nm, seg.life_cycle, seg.target_group,
+      array(
+        select b.id from benefits b
+        where b.is_active = true
+          and benefit_profile_match(
+                b.ctpv_nm, b.sgg_nm, b.trgter_indvdl_nm_array, b.life_nm_array,
+                seg.ctpv_nm, seg.sgg_nm, seg.life_cycle, seg.target_group)
+        order by b.id
+      ),
+      v_version,
+      now() AT TIME ZONE 'Asia/Seoul'
+    )
+    on conflict (segment_key) do update
+      set benefit_ids = excluded.benefit_ids,
+          data_version = excluded.data_version,
+          refreshed_at = excluded.refreshed_at;
+
+    v_refreshed := v_refreshed + 1;
+  end loop;
+
+  -- 더 이상 사용자가 없는 세그먼트 정리
+  delete from segment_eligibility s
+  where not exists (
+    select 1 from users u
+    where u.is_active = true
+      and u.ctpv_nm <> ''
+      and make_segment_key(u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group) = s.segment_key
+  );
+  get diagnostics v_removed = row_count;
+
+  return jsonb_build_object(
+    'version', v_version,
+    'refreshed', v_refreshed,
+    'skipped', v_skipped,
+    'removed', v_removed
+  );
+end;
+$$;
+
+comment on function refresh_segment_eligibility(boolean) is '사용자 세그먼트별 자격 충족 혜택 id 재계산 (파이프라인 종료 후 실행)';
+
+-- [함수 0-5] 신규 혜택 알림 실행 시작 (워터마크 = 마지막 completed 실행의 until)
+-- p_since를 주면 워터마크 대신 사용, 둘 다 없으면 첫 실행 (since = null)
+create or replace function start_notification_run(p_since timestamptz default null)
+returns jsonb
+language plpgsql
+security definer
+as $$
+declare
+  v_run notification_runs;
+begin
+  insert into notification_runs (since, until)
+  values (
+    coalesce(p_since, (select r.until from notification_runs r where r.status = 'completed' order by r.until desc limit 1)),
+    now() AT TIME ZONE 'Asia/Seoul'
+  )
+  returning * into v_run;
+
+  return jsonb_build_object('id', v_run.id, 'since', v_run.since, 'until', v_run.until);
+end;
+$$;
+
+create or replace function finish_notification_run(p_run_id bigint, p_status text, p_stats jsonb default null)
+returns void
+language sql
+security definer
+as $$
+  update notification_runs
+  set status = p_status, stats = p_stats, finished_at = now() AT TIME ZONE 'Asia/Seoul'
+  where id = p_run_id;
+$$;
+
+-- [함수 0-6] 세그먼트별 신규 자격 혜택 (집합 연산 1회, 비용 = 세그먼트 수 × 변경 혜택 수)
+-- 알림을 켠 활성 사용자를 세그먼트로 묶고, (since, until]에 바뀐 혜택과 benefit_profile_match로 조인
+-- 신규 혜택이 하나라도 있는 세그먼트만 반환
+create or replace function match_new_benefits_by_segment(p_since timestamptz, p_until timestamptz)
+returns table (
+  segment_key text,
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  life_cycle text[],
+  target_group text[],
+  user_count bigint,
+  benefit_ids bigint[]
+)
+language sql
+stable
+security definer
+as $$
+  with changed as (
+    select b.id, b.ctpv_nm, b.sgg_nm, b.trgter_indvdl_nm_array, b.life_nm_array
+    from benefits b
+    where b.is_active = true
+      and b.content_changed_at > p_since
+      and b.content_changed_at <= p_until
+      and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date)
+  ),
+  segment_users as (
+    select
+      make_segment_key(u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group) as segment_key,
+      u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group
+    from users u
+    where u.is_active = true
+      and u.notification_enabled = true
+      and u.ctpv_nm <> ''
+      and exists (select 1 from changed)
+  ),
+  segments as (
+    select distinct on (su.segment_key)
+      su.segment_key, su.ctpv_nm, su.sgg_nm, su.life_cycle, su.target_group,
+      count(*) over (partition by su.segment_key) as user_count
+    from segment_users su
+    order by su.segment_key
+  )
+  select
+    s.segment_key, s.ctpv_nm, s.sgg_nm, s.life_cycle, s.target_group, s.user_count,
+    array_agg(c.id order by c.id) as benefit_ids
+  from segments s
+  join changed c
+    on benefit_profile_match(
+         c.ctpv_nm, c.sgg_nm, c.trgter_indvdl_nm_array, c.life_nm_array,
+         s.ctpv_nm, s.sgg_nm, s.life_cycle, s.target_group)
+  group by s.segment_key, s.ctpv_nm, s.sgg_nm, s.life_cycle, s.target_group, s.user_count;
+$$;
+
+comment on function match_new_benefits_by_segment(timestamptz, timestamptz) is '세그먼트별 신규/변경 자격 혜택 id (알림 대상 계산, 사용자 수와 무관)';
+
+-- [함수 0-7] 알림 수신자 페이지 (세그먼트 키 목록 → 사용자, id 기준 keyset 페이지)
+-- delivered_ids: p_benefit_ids 중 이미 알린 혜택, region_check_due: 6개월 거주지 확인 시점 도래
+create or replace function notification_recipients(
+  p_segment_keys text[],
+  p_benefit_ids bigint[],
+  p_after uuid default null,
+  p_limit int default 500
+)
+returns table (
+  user_id uuid,
+  kakao_user_id text,
+  segment_key text,
+  delivered_ids bigint[],
+  region_check_due boolean
+)
+language sql
+stable
+security definer
+as $$
+  select
+    u.id,
+    u.kakao_user_id,
+    make_segment_key(u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group),
+    array(
+      select d.benefit_id from notification_deliveries d
+      where d.user_id = u.id and d.benefit_id = any(p_benefit_ids)
+    ),
+    coalesce(u.last_region_check_at, u.created_at) < (now() AT TIME ZONE 'Asia/Seoul') - interval '6 months'
+  from users u
+  where u.is_active = true
+    and u.notification_enabled = true
+    and u.ctpv_nm <> ''
+    and make_segment_key(u.ctpv_nm, u.sgg_nm, u.life_cycle, u.target_group) = any(p_segment_keys)
+    and (p_after is null or u.id > p_after)
+  order by u.id
+  limit p_limit;
+$$;
+
+-- 세그먼트 키로 수신자를 바로 찾기 위한 식 인덱스 (make_segment_key는 immutable)
+create index if not exists idx_users_notification_segment
+  on users (make_segment_key(ctpv_nm, sgg_nm, life_cycle, target_group))
+  where is_active = true and notification_enabled = true;
+
+comment on function notification_recipients(text[], bigint[], uuid, int) is '세그먼트 키 목록에 속한 알림 수신자 (이미 알린 혜택 id 포함)';
+
+-- [함수 0-8] 발송 결과 기록 (페이지 단위 1회)
+-- p_deliveries: [{"user_id", "benefit_ids": [...], "region_check": bool}, ...]
+create or replace function record_notification_deliveries(p_run_id bigint, p_deliveries jsonb)
+returns int
+language plpgsql
+security definer
+as $$
+declare
+  v_inserted int;
+begin
+  insert into notification_deliveries (user_id, benefit_id, run_id)
+  select (d->>'user_id')::uuid, b::bigint, p_run_id
+  from jsonb_array_elements(p_deliveries) d,
+       jsonb_array_elements_text(d->'benefit_ids') b
+  on conflict (user_id, benefit_id) do nothing;
+  get diagnostics v_inserted = row_count;
+
+  -- 거주지 확인 문구를 함께 보낸 사용자는 다음 6개월 주기부터 다시 확인
+  update users u
+  set last_region_check_at = now() AT TIME ZONE 'Asia/Seoul'
+  from jsonb_array_elements(p_deliveries) d
+  where u.id = (d->>'user_id')::uuid
+    and coalesce((d->>'region_check')::boolean, false);
+
+  return v_inserted;
+end;
+$$;
+
+comment on function record_notification_deliveries(bigint, jsonb) is '알림 발송 이력 저장 + 거주지 확인 시각 갱신';
+
+-- [함수 1] 자격요건 Whitelist 조회
+-- 세그먼트 인덱스(segment_eligibility)가 최신이면 id 목록으로 바로 조회 (O(결과 수))
+-- 없으면 전체 benefits에 자격 조건을 평가
+-- 두 경로를 if로 나눠 각자 계획을 갖게 함 (한 WHERE에 OR로 두면 캐시된 일반 계획이 전체 행 필터가 됨)
+create or replace function get_eligible_benefits(
+  p_ctpv text,          -- 예: '전라남도' (없으면 null)
+  p_sgg text,           -- 예: '진도군' (없으면 null)
+  p_life_array text[],  -- 예: ['노년', '중장년'] (빈배열이면 전체)
+  p_target_array text[] -- 예: ['저소득', '장애인'] (빈배열이면 전체)
+)
+returns table (
+  id bigint,
+  serv_nm varchar(500),
+  srv_pvsn_nm varchar(50),
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  trgter_indvdl_nm_array text[],
+  life_nm_array text[],
+  serv_dgst text,
+  enfc_end_ymd date,
+  serv_dtl_link varchar(500)
+)
+language plpgsql
+security definer
+as $$
+declare
+  v_ids bigint[];
+begin
+  v_ids := segment_benefit_ids(p_ctpv, p_sgg, p_life_array, p_target_array);
+
+  if v_ids is not null then
+    -- [자격] 세그먼트 인덱스: PK 조회
+    return query
+    select 
+      b.id,
+      b.serv_nm,
+      b.srv_pvsn_nm,
+      b.ctpv_nm,
+      b.sgg_nm,
+      b.trgter_indvdl_nm_array,
+      b.life_nm_array,
+      b.serv_dgst,
+      b.enfc_end_ymd,
+      b.serv_dtl_link
+    from benefits b
+    where 
+      b.id = any(v_ids)
+      and b.is_active = true
+      
+      -- [기간] 종료일이 없거나(계속), 오늘 이후인 경우 (세그먼트 인덱스는 기간 미포함 → 항상 재확인)
+      and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date);
+  else
+    -- [자격] 세그먼트 인덱스 없음: 지역/대상/생애주기 조건 평가
+    return query
+    select 
+      b.id,
+      b.serv_nm,
+      b.srv_pvsn_nm,
+      b.ctpv_nm,
+      b.sgg_nm,
+      b.trgter_indvdl_nm_array,
+      b.life_nm_array,
+      b.serv_dgst,
+      b.enfc_end_ymd,
+      b.serv_dtl_link
+    from benefits b
+    where 
+      b.is_active = true
+      and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date)
+      and benefit_profile_match(
+            b.ctpv_nm, b.sgg_nm, b.trgter_indvdl_nm_array, b.life_nm_array,
+            p_ctpv, p_sgg, p_life_array, p_target_array);
+  end if;
+end;
+$$;
+
+comment on function get_eligible_benefits(text, text, text[], text[]) is '자격요건 기반 Whitelist 조회 (세그먼트 인덱스 우선, 지역+연령대+대상특성 필터)';
+
+-- [함수 2-0] 필터 벡터 검색 옵션 (pgvector HNSW, 현재 트랜잭션에만 적용)
+-- HNSW는 기본적으로 ef_search(40)개 후보만 보고 끝나므로, 자격 필터로 후보가 걸러지면 LIMIT보다 적게 반환됨
+--   - hnsw.ef_search: 후보 리스트 크기 (LIMIT 이상)
+--   - hnsw.iterative_scan (pgvector >= 0.8): LIMIT을 채울 때까지 인덱스를 이어서 탐색
+--     relaxed_order는 순서가 약간 어긋날 수 있으므로 호출하는 쪽에서 거리로 다시 정렬
+create or replace function set_vector_scan_options(p_limit int)
+returns void
+language plpgsql
+as $$
+begin
+  perform set_config('hnsw.ef_search', least(greatest(p_limit * 2, 40), 1000)::text, true);
+  begin
+    perform set_config('hnsw.iterative_scan', 'relaxed_order', true);
+  exception when others then
+    null;  -- pgvector 0.8 미만: ef_search만 적용
+  end;
+end;
+$$;
+
+comment on function set_vector_scan_options(int) is 'HNSW ef_search + iterative scan 설정 (필터 벡터 검색이 LIMIT을 채우도록)';
 
 -- [함수 2] 벡터 검색 (의미 유사도 기반)
 -- 참고: 연령대 필터 없음 (get_eligible_benefits와 교집합으로 처리)
+-- ORDER BY 거리 + LIMIT 형태라 WELFARE partial HNSW 인덱스(idx_benefit_embeddings_vector_welfare)를 순서대로 탐색
+-- (similarity > threshold를 WHERE에 두면 인덱스 정렬 탐색을 못 쓰고 전체 거리 계산 + 정렬이 됨)
+-- 후보 탐색은 benefit_embeddings의 필터 컬럼만 사용하고, 화면 컬럼은 최종 match_count개만 benefits에서 조회
+-- region_key 파티션 중 사용자 시도 + NATIONAL만 탐색 (파티션 프루닝)
+-- 혜택 단위 결과: 혜택당 가장 가까운 청크 1개 (match_count = 서로 다른 혜택 수)
+--   청크 후보를 match_count × 3개부터 가져오고, 서로 다른 혜택이 모자라면 후보 수를 2배씩 늘림 (최대 × 24)
+-- threshold는 순위를 정한 뒤 적용 (상위 match_count개 중 threshold 초과만 반환)
+-- 반환 컬럼(render_card, matched_chunk) 변경 시 create or replace가 불가하므로 먼저 삭제
+drop function if exists match_benefits(vector, float, int, text, text, text[], text[]);
+drop function if exists match_benefits(vector, float, int, text, text, text[], text[], boolean);
 create or replace function match_benefits(
   query_embedding vector(1536),  -- OpenAI text-embedding-3-small (1536차원)
   match_threshold float,
@@ -400,7 +1164,8 @@ create or replace function match_benefits(
   p_ctpv text,
   p_sgg text,
   p_life_array text[],
-  p_target_array text[]
+  p_target_array text[],
+  include_chunk boolean default false  -- true면 가장 가까운 청크 본문(matched_chunk)도 반환
 )
 returns table (
   id bigint,
@@ -413,13 +1178,124 @@ returns table (
   serv_dgst text,
   enfc_end_ymd date,
   serv_dtl_link varchar(500),
-  similarity float  -- 🆕 유사도 점수 추가!
+  similarity float,  -- 🆕 유사도 점수 추가! (혜택의 청크 중 최고값)
+  render_card jsonb, -- 사전 렌더링 카드
+  matched_chunk text -- include_chunk=true일 때만 (아니면 null)
 )
 language plpgsql
 security definer
 as $$
+declare
+  v_ids bigint[];
+  v_region_keys text[] := array['NATIONAL', embedding_region_key(null, p_ctpv)];
+  v_chunk_limit int := greatest(match_count, 1) * 3;
+  v_benefit_ids bigint[];
+  v_distances float8[];
+  v_chunk_ids uuid[];
 begin
+  -- 세그먼트 인덱스가 최신이면 자격 판정을 id 목록 조회로 대체
+  v_ids := segment_benefit_ids(p_ctpv, p_sgg, p_life_array, p_target_array);
+
+  loop
+    perform set_vector_scan_options(v_chunk_limit);
+
+    -- 자격 필터 경로(세그먼트 인덱스 / 프로필 조건)를 if로 나눠 경로별 계획 사용 (OR로 합치면 일반 계획에서 두 조건을 모두 평가)
+    if v_ids is not null then
+      -- 1. 인덱스 순서 탐색: 필터를 통과한 청크를 거리 순으로 v_chunk_limit개
+      select
+        coalesce(array_agg(c.benefit_id order by c.distance), '{}'),
+        coalesce(array_agg(c.distance order by c.distance), '{}'),
+        coalesce(array_agg(c.chunk_id order by c.distance), '{}')
+      into v_benefit_ids, v_distances, v_chunk_ids
+      from (
+        select
+          be.id as chunk_id,
+          be.benefit_id,
+          be.embedding <=> query_embedding as distance
+        from benefit_embeddings be  -- 필터 컬럼은 청크에 복사되어 있음 (benefits 조인 없음, [6-1])
+        where 
+          -- 0. 카테고리 필터 (복지만 검색, partial 인덱스 조건)
+          be.category = 'WELFARE'
+        
+          -- 1. 파티션: 사용자 시도 + 전국만 탐색 (두 파티션의 거리순 결과를 Merge Append로 병합)
+          -- 자격 필터상 다른 시도 혜택은 어차피 제외되므로 결과는 같음
+          and be.region_key = any(v_region_keys)
+        
+          -- 2. 유효 기간 체크 (만료된 혜택 제외)
+          -- enfc_end_ymd가 NULL이면 계속 진행 중인 것으로 간주(또는 9999-12-31)
+          and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+          and be.is_active = true
+
+          -- 3. 자격 필터: 세그먼트 인덱스 (중앙부처 혜택은 지역과 무관하게 포함, get_eligible_benefits와 다른 점)
+          and (
+              be.benefit_id = any(v_ids)
+              or (be.source_api = 'NATIONAL' and benefit_profile_match(
+                    null, null, be.trgter_indvdl_nm_array, be.life_nm_array,
+                    p_ctpv, p_sgg, p_life_array, p_target_array))
+          )
+        order by be.embedding <=> query_embedding  -- 인덱스 연산자 그대로 (similarity 별칭으로 정렬하면 인덱스 미사용)
+        limit v_chunk_limit
+      ) c;
+    else
+      -- 1. (세그먼트 인덱스 없음) 같은 탐색, 자격은 프로필 조건으로 판정
+      select
+        coalesce(array_agg(c.benefit_id order by c.distance), '{}'),
+        coalesce(array_agg(c.distance order by c.distance), '{}'),
+        coalesce(array_agg(c.chunk_id order by c.distance), '{}')
+      into v_benefit_ids, v_distances, v_chunk_ids
+      from (
+        select
+          be.id as chunk_id,
+          be.benefit_id,
+          be.embedding <=> query_embedding as distance
+        from benefit_embeddings be  -- 필터 컬럼은 청크에 복사되어 있음 (benefits 조인 없음, [6-1])
+        where 
+          -- 0. 카테고리 필터 (복지만 검색, partial 인덱스 조건)
+          be.category = 'WELFARE'
+        
+          -- 1. 파티션: 사용자 시도 + 전국만 탐색 (두 파티션의 거리순 결과를 Merge Append로 병합)
+          -- 자격 필터상 다른 시도 혜택은 어차피 제외되므로 결과는 같음
+          and be.region_key = any(v_region_keys)
+        
+          -- 2. 유효 기간 체크 (만료된 혜택 제외)
+          -- enfc_end_ymd가 NULL이면 계속 진행 중인 것으로 간주(또는 9999-12-31)
+          and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+          and be.is_active = true
+
+          -- 3. 자격 필터: 지역/대상/생애주기 조건 (중앙부처 혜택은 지역 무관)
+          and benefit_profile_match(
+                case when be.source_api = 'NATIONAL' then null else be.ctpv_nm end,
+                case when be.source_api = 'NATIONAL' then null else be.sgg_nm end,
+                be.trgter_indvdl_nm_array, be.life_nm_array,
+                p_ctpv, p_sgg, p_life_array, p_target_array)
+        order by be.embedding <=> query_embedding  -- 인덱스 연산자 그대로 (similarity 별칭으로 정렬하면 인덱스 미사용)
+        limit v_chunk_limit
+      ) c;
+    end if;
+
+    -- 후보가 더 없음 / 서로 다른 혜택이 충분함 / 마지막 후보가 이미 threshold 이하 / 상한 도달이면 종료
+    exit when cardinality(v_distances) < v_chunk_limit
+      or (select count(distinct x) from unnest(v_benefit_ids) x) >= match_count
+      or 1 - v_distances[cardinality(v_distances)] <= match_threshold
+      or v_chunk_limit >= greatest(match_count, 1) * 24;
+    v_chunk_limit := v_chunk_limit * 2;
+  end loop;
+
   return query
+  with best as (
+    -- 혜택당 가장 가까운 청크
+    select distinct on (h.benefit_id) h.benefit_id, h.distance, h.chunk_id
+    from unnest(v_benefit_ids, v_distances, v_chunk_ids) as h(benefit_id, distance, chunk_id)
+    order by h.benefit_id, h.distance
+  ),
+  ranked as (
+    select r.benefit_id, r.distance, r.chunk_id
+    from best r
+    -- 4. 임베딩 유사도 threshold (순위 결정 후 적용)
+    where 1 - r.distance > match_threshold
+    order by r.distance
+    limit match_count
+  )
   select 
     b.id,
     b.serv_nm,
@@ -431,59 +1307,656 @@ begin
     b.serv_dgst,
     b.enfc_end_ymd,
     b.serv_dtl_link,
-    (1 - (be.embedding <=> query_embedding))::float as similarity  -- 🆕 유사도 계산!
-  from benefit_embeddings be
-  join benefits b on be.benefit_id = b.id
-  where 
-    -- 0. 카테고리 필터 (복지만 검색)
-    be.category = 'WELFARE'
-    
-    -- 1. 임베딩 유사도 (Threshold 복구)
-    and 1 - (be.embedding <=> query_embedding) > match_threshold
-    
-    -- 2. 유효 기간 체크 (만료된 혜택 제외)
-    -- enfc_end_ymd가 NULL이면 계속 진행 중인 것으로 간주(또는 9999-12-31)
-    and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date)
-    and b.is_active = true
-
-    -- 3. 지역 필터 (내 지역 + 중앙부처)
-    and (
-       b.source_api = 'NATIONAL'
-       or (
-           (b.ctpv_nm is null and b.sgg_nm is null) 
-           or (b.ctpv_nm = p_ctpv and b.sgg_nm is null)
-           or (b.ctpv_nm = p_ctpv and b.sgg_nm = p_sgg)
-       )
-    )
-    
-    -- 4. 대상 특성 필터 (get_eligible_benefits와 동일 로직)
-    and (
-        -- Case A: 서비스 대상이 없으면 전국민 대상
-        (b.trgter_indvdl_nm_array is null or cardinality(b.trgter_indvdl_nm_array) = 0)
-        or
-        -- Case B: 서비스 대상도 있고, 사용자 대상도 있고, 둘이 겹침
-        (b.trgter_indvdl_nm_array is not null 
-         and cardinality(b.trgter_indvdl_nm_array) > 0
-         and p_target_array is not null 
-         and cardinality(p_target_array) > 0 
-         and b.trgter_indvdl_nm_array && p_target_array)
-    )
-    
-    -- 5. 생애주기 필터 (get_eligible_benefits와 동일 로직)
-    and (
-        b.life_nm_array is null 
-        or cardinality(b.life_nm_array) = 0
-        or p_life_array is null
-        or cardinality(p_life_array) = 0
-        or b.life_nm_array && p_life_array
+    (1 - r.distance)::float as similarity,
+    b.render_card,
+    be.content_chunk as matched_chunk
+  from ranked r
+  join benefits b on b.id = r.benefit_id
+  left join benefit_embeddings be on include_chunk and be.id = r.chunk_id
+  order by r.distance;  -- relaxed_order 보정 (유사도 높은 순)
+end;
+$$;
+
+comment on function match_benefits(vector, float, int, text, text, text[], text[], boolean) is '벡터 검색 (혜택 단위, 최고 청크 similarity, 지역+생애주기+대상 필터링)';
+
+-- [함수 2-2] 축소 차원 벡터 검색 (+ 전체 차원 재정렬)
+-- RAGService(EMBEDDING_DIMENSIONS < 1536)가 사용
+--   1) query_embedding 차원(256/512/768)의 컬럼/HNSW 인덱스로 candidate_count개 후보 검색
+--   2) rerank_embedding(1536)이 있으면 원본 embedding으로 유사도를 다시 계산해 정렬
+-- 필터 조건은 match_benefits와 동일, threshold는 최종 similarity 기준, 결과는 혜택 단위 (후보는 청크 단위)
+drop function if exists match_benefits_reduced(vector, float, int, text, text, text[], text[], vector, int);
+create or replace function match_benefits_reduced(
+  query_embedding vector,         -- 축소 차원 쿼리 (앞 N차원 + L2 정규화)
+  match_threshold float,
+  match_count int,
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[],
+  rerank_embedding vector(1536) default null,
+  candidate_count int default 150
+)
+returns table (
+  id bigint,
+  serv_nm varchar(500),
+  srv_pvsn_nm varchar(50),
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  trgter_indvdl_nm_array text[],
+  life_nm_array text[],
+  serv_dgst text,
+  enfc_end_ymd date,
+  serv_dtl_link varchar(500),
+  similarity float,
+  render_card jsonb
+)
+language plpgsql
+security definer
+as $$
+declare
+  v_dims int := vector_dims(query_embedding);
+  v_column text;
+  v_ids bigint[];
+  v_eligibility text;
+begin
+  if v_dims not in (256, 512, 768) then
+    raise exception 'match_benefits_reduced: unsupported dimensions %', v_dims;
+  end if;
+  v_column := 'embedding_' || v_dims;
+
+  v_ids := segment_benefit_ids(p_ctpv, p_sgg, p_life_array, p_target_array);
+
+  -- 자격 필터: match_benefits와 같은 두 경로 중 하나만 SQL에 넣음 (OR로 합치지 않음)
+  if v_ids is not null then
+    v_eligibility := $f$(
+            be.benefit_id = any($8)
+            or (be.source_api = 'NATIONAL' and benefit_profile_match(
+                  null, null, be.trgter_indvdl_nm_array, be.life_nm_array,
+                  $4, $5, $6, $7))
+        )$f$;
+  else
+    v_eligibility := $f$benefit_profile_match(
+              case when be.source_api = 'NATIONAL' then null else be.ctpv_nm end,
+              case when be.source_api = 'NATIONAL' then null else be.sgg_nm end,
+              be.trgter_indvdl_nm_array, be.life_nm_array,
+              $4, $5, $6, $7)$f$;
+  end if;
+
+  perform set_vector_scan_options(greatest(candidate_count, match_count));
+
+  -- 컬럼명이 차원에 따라 바뀌므로 동적 SQL (ORDER BY 거리 + LIMIT → HNSW 인덱스 사용)
+  return query execute format($q$
+    with candidates as materialized (
+      select
+        be.benefit_id,
+        be.embedding,
+        (1 - (be.%1$I <=> $1::vector(%2$s)))::float as reduced_similarity
+      from benefit_embeddings be
+      where
+        be.category = 'WELFARE'
+        and be.region_key = any($11)
+        and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+        and be.is_active = true
+        and %3$s
+      order by be.%1$I <=> $1::vector(%2$s)
+      limit $3
+    ),
+    scored as (
+      -- 혜택당 가장 유사한 청크 1개 (match_benefits와 같은 혜택 단위 결과)
+      select distinct on (x.benefit_id) x.benefit_id, x.similarity
+      from (
+        select
+          c.benefit_id,
+          case
+            when $9 is null then c.reduced_similarity
+            else (1 - (c.embedding <=> $9))::float
+          end as similarity
+        from candidates c
+      ) x
+      order by x.benefit_id, x.similarity desc
     )
-    
-  order by similarity desc  -- 유사도 높은 순으로 정렬
-  limit match_count;
+    select
+      b.id,
+      b.serv_nm,
+      b.srv_pvsn_nm,
+      b.ctpv_nm,
+      b.sgg_nm,
+      b.trgter_indvdl_nm_array,
+      b.life_nm_array,
+      b.serv_dgst,
+      b.enfc_end_ymd,
+      b.serv_dtl_link,
+      s.similarity,
+      b.render_card
+    from scored s
+    join benefits b on b.id = s.benefit_id
+    where s.similarity > $2
+    order by s.similarity desc
+    limit $10
+  $q$, v_column, v_dims, v_eligibility)
+  using query_embedding, match_threshold, greatest(candidate_count, match_count),
+        p_ctpv, p_sgg, p_life_array, p_target_array, v_ids, rerank_embedding, match_count,
+        array['NATIONAL', embedding_region_key(null, p_ctpv)];
+end;
+$$;
+
+comment on function match_benefits_reduced(vector, float, int, text, text, text[], text[], vector, int) is '축소 차원(256/512/768) 벡터 검색 + 1536차원 재정렬 (EMBEDDING_DIMENSIONS)';
+
+-- [함수 2-3] 벡터 인덱스 크기 조회 (scripts/embeddings/benchmark_dimensions.py)
+-- 파티션 테이블의 인덱스는 크기가 0이므로 파티션별 인덱스 크기를 합산
+create or replace function embedding_index_sizes()
+returns table (index_name text, size_bytes bigint)
+language sql
+stable
+security definer
+as $$
+  select c.relname::text, (select coalesce(sum(pg_relation_size(t.relid)), 0) from pg_partition_tree(c.oid) t)::bigint
+  from pg_class c
+  join pg_index i on i.indexrelid = c.oid
+  where i.indrelid = 'benefit_embeddings'::regclass
+    and c.relname like 'idx_benefit_embeddings_vector_%'
+  order by c.relname;
+$$;
+
+-- [함수 2-4] 하이브리드 검색 (전문검색 + 트라이그램 + 벡터, RRF 결합) ⚡
+-- "기초연금", "에너지바우처"처럼 정확한 사업명은 임베딩만으로는 순위가 밀리는 경우가 있어
+-- 후보 목록 3개를 한 문장에서 만들고 Reciprocal Rank Fusion으로 합침: score = Σ weight / (rrf_k + 순위)
+--   1) fulltext: idx_benefits_content_search (to_tsvector 식이 인덱스와 같아야 함), 검색어 토큰 접두 일치(OR) + ts_rank_cd
+--   2) trigram : idx_benefits_serv_nm_trgm, 3글자 이상 토큰이 사업명에 포함(word_similarity) - 조사/띄어쓰기 차이 보완
+--   3) vector  : match_benefits와 같은 파티션/필터 + HNSW 거리 순 (혜택 단위, threshold 적용)
+-- 자격 조건(활성/기간/세그먼트 또는 지역·대상·생애주기)은 세 목록 모두 match_benefits와 동일
+-- weight가 0인 목록은 실행하지 않음, query_embedding이 null이면 전문검색/트라이그램만 사용
+-- similarity는 벡터 목록에 있을 때만 값이 있음 (matched_by로 어느 목록에서 찾았는지 확인)
+create or replace function hybrid_match_benefits(
+  query_text text,
+  query_embedding vector(1536),
+  match_count int,
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[],
+  match_threshold float default 0.35,  -- 벡터 목록에만 적용
+  vector_weight float default 1.0,
+  fulltext_weight float default 1.0,
+  trigram_weight float default 1.0,
+  rrf_k int default 60,
+  candidate_count int default 50,      -- 목록별 후보 수
+  trigram_threshold float default 0.5  -- pg_trgm.word_similarity_threshold
+)
+returns table (
+  id bigint,
+  serv_nm varchar(500),
+  srv_pvsn_nm varchar(50),
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  trgter_indvdl_nm_array text[],
+  life_nm_array text[],
+  serv_dgst text,
+  enfc_end_ymd date,
+  serv_dtl_link varchar(500),
+  similarity float,
+  render_card jsonb,
+  rrf_score float,
+  matched_by text[]  -- 'fulltext' | 'trigram' | 'vector'
+)
+language plpgsql
+security definer
+-- 자격 조건의 (v_ids is not null and ...) or (v_ids is null and ...)을 호출마다 상수로 접어
+-- 사용하는 경로만 남기도록 항상 custom plan (일반 계획이면 두 경로를 모두 평가)
+set plan_cache_mode = force_custom_plan
+as $$
+declare
+  v_ids bigint[];
+  v_region_keys text[] := array['NATIONAL', embedding_region_key(null, p_ctpv)];
+  v_terms text[];
+  v_tsquery tsquery;
+begin
+  v_ids := segment_benefit_ids(p_ctpv, p_sgg, p_life_array, p_target_array);
+
+  -- 검색어 토큰 (문자/숫자 외 구분자 제거, 2글자 이상, 최대 8개)
+  select coalesce(array_agg(t.term), '{}')
+  into v_terms
+  from (
+    select distinct x as term
+    from regexp_split_to_table(lower(regexp_replace(coalesce(query_text, ''), '[^[:alnum:]가-힣]+', ' ', 'g')), '\s+') x
+    where char_length(x) >= 2
+    limit 8
+  ) t;
+
+  if cardinality(v_terms) > 0 then
+    v_tsquery := to_tsquery('simple', array_to_string(array(select quote_literal(t) || ':*' from unnest(v_terms) t), ' | '));
+  end if;
+
+  perform set_vector_scan_options(candidate_count * 3);
+  perform set_config('pg_trgm.word_similarity_threshold', trigram_threshold::text, true);
+
+  return query
+  with eligible as not materialized (
+    -- 자격 조건 (각 목록에 인라인되어 목록별 인덱스 사용)
+    select b.*
+    from benefits b
+    where b.is_active = true
+      and (b.enfc_end_ymd is null or b.enfc_end_ymd >= current_date)
+      and (
+          (v_ids is not null and (
+              b.id = any(v_ids)
+              or (b.source_api = 'NATIONAL' and benefit_profile_match(
+                    null, null, b.trgter_indvdl_nm_array, b.life_nm_array,
+                    p_ctpv, p_sgg, p_life_array, p_target_array))
+          ))
+          or (v_ids is null and benefit_profile_match(
+                case when b.source_api = 'NATIONAL' then null else b.ctpv_nm end,
+                case when b.source_api = 'NATIONAL' then null else b.sgg_nm end,
+                b.trgter_indvdl_nm_array, b.life_nm_array,
+                p_ctpv, p_sgg, p_life_array, p_target_array))
+      )
+  ),
+  fulltext as (
+    select f.benefit_id, row_number() over (order by f.score desc, f.benefit_id) as rank
+    from (
+      select
+        e.id as benefit_id,
+        ts_rank_cd(
+          to_tsvector('simple',
+            coalesce(e.serv_nm, '') || ' ' ||
+            coalesce(e.serv_dgst, '') || ' ' ||
+            coalesce(e.target_detail, '') || ' ' ||
+            coalesce(e.service_content, '')
+          ), v_tsquery) as score
+      from eligible e
+      where fulltext_weight > 0
+        and to_tsvector('simple',
+              coalesce(e.serv_nm, '') || ' ' ||
+              coalesce(e.serv_dgst, '') || ' ' ||
+              coalesce(e.target_detail, '') || ' ' ||
+              coalesce(e.service_content, '')
+            ) @@ v_tsquery
+      order by score desc, e.id
+      limit candidate_count
+    ) f
+  ),
+  trigram as (
+    select g.benefit_id, row_number() over (order by g.score desc, g.benefit_id) as rank
+    from (
+      select e.id as benefit_id, max(word_similarity(q.term, e.serv_nm)) as score
+      from unnest(v_terms) as q(term)
+      join eligible e on q.term <% e.serv_nm
+      where trigram_weight > 0
+        and char_length(q.term) >= 3
+      group by e.id
+      order by score desc, e.id
+      limit candidate_count
+    ) g
+  ),
+  chunks as (
+    -- match_benefits와 같은 청크 후보 탐색 (benefits 조인 없음, 파티션 프루닝)
+    select be.benefit_id, be.embedding <=> query_embedding as distance
+    from benefit_embeddings be
+    where vector_weight > 0
+      and query_embedding is not null
+      and be.category = 'WELFARE'
+      and be.region_key = any(v_region_keys)
+      and (be.enfc_end_ymd is null or be.enfc_end_ymd >= current_date)
+      and be.is_active = true
+      and (
+          (v_ids is not null and (
+              be.benefit_id = any(v_ids)
+              or (be.source_api = 'NATIONAL' and benefit_profile_match(
+                    null, null, be.trgter_indvdl_nm_array, be.life_nm_array,
+                    p_ctpv, p_sgg, p_life_array, p_target_array))
+          ))
+          or (v_ids is null and benefit_profile_match(
+                case when be.source_api = 'NATIONAL' then null else be.ctpv_nm end,
+                case when be.source_api = 'NATIONAL' then null else be.sgg_nm end,
+                be.trgter_indvdl_nm_array, be.life_nm_array,
+                p_ctpv, p_sgg, p_life_array, p_target_array))
+      )
+    order by be.embedding <=> query_embedding
+    limit candidate_count * 3
+  ),
+  vector_ranked as (
+    select v.benefit_id, v.distance, row_number() over (order by v.distance, v.benefit_id) as rank
+    from (
+      select c.benefit_id, min(c.distance) as distance
+      from chunks c
+      group by c.benefit_id
+    ) v
+    where 1 - v.distance > match_threshold
+    order by v.distance
+    limit candidate_count
+  ),
+  fused as (
+    select
+      u.benefit_id,
+      sum(u.weight / (rrf_k + u.rank))::float as score,
+      max(u.similarity)::float as best_similarity,
+      array_agg(u.source order by u.source) as sources
+    from (
+      select v.benefit_id, v.rank, vector_weight as weight, 1 - v.distance as similarity, 'vector' as source from vector_ranked v
+      union all
+      select f.benefit_id, f.rank, fulltext_weight, null, 'fulltext' from fulltext f
+      union all
+      select g.benefit_id, g.rank, trigram_weight, null, 'trigram' from trigram g
+    ) u
+    group by u.benefit_id
+    order by score desc, u.benefit_id
+    limit match_count
+  )
+  select
+    b.id,
+    b.serv_nm,
+    b.srv_pvsn_nm,
+    b.ctpv_nm,
+    b.sgg_nm,
+    b.trgter_indvdl_nm_array,
+    b.life_nm_array,
+    b.serv_dgst,
+    b.enfc_end_ymd,
+    b.serv_dtl_link,
+    f.best_similarity,
+    b.render_card,
+    f.score,
+    f.sources
+  from fused f
+  join benefits b on b.id = f.benefit_id
+  order by f.score desc, f.benefit_id;
+end;
+$$;
+
+comment on function hybrid_match_benefits(text, vector, int, text, text, text[], text[], float, float, float, float, int, int, float) is '하이브리드 검색 (전문검색 + 사업명 트라이그램 + 벡터, RRF 결합, match_benefits와 같은 자격 필터)';
+
+-- [함수 3] 서버측 하이브리드 추천 (벡터 + 자격기반 병합, top_k만 반환) ⚡
+-- RAGService(search_mode='server')가 사용: Lambda로 전체 Whitelist를 보내지 않음
+-- 순서:
+--   1) VECTOR: match_benefits 결과 (혜택 단위, 유사도 내림차순)
+--   2) RULES : 나머지 자격 충족 혜택
+--      - 지역 구체성: 시군구 일치(0) > 시도 일치(1) > 전국/기타(2)
+--      - 제공유형: 현금/현물(0) > 기타(1)
+drop function if exists recommend_benefits(vector, text, text, text[], text[], float, int, int);
+create or replace function recommend_benefits(
+  query_embedding vector(1536),     -- null이면 자격기반(RULES) 결과만 반환
+  p_ctpv text,
+  p_sgg text,
+  p_life_array text[],
+  p_target_array text[],
+  match_threshold float default 0.35,
+  match_count int default 50,
+  top_k int default 30
+)
+returns table (
+  id bigint,
+  serv_nm varchar(500),
+  srv_pvsn_nm varchar(50),
+  ctpv_nm varchar(50),
+  sgg_nm varchar(50),
+  trgter_indvdl_nm_array text[],
+  life_nm_array text[],
+  serv_dgst text,
+  enfc_end_ymd date,
+  serv_dtl_link varchar(500),
+  similarity float,
+  source_type text,
+  render_card jsonb
+)
+language sql
+security definer
+as $$
+  with vector_hits as (
+    -- match_benefits가 혜택 단위로 반환 (중복 제거 불필요)
+    select m.id, m.serv_nm, m.srv_pvsn_nm, m.ctpv_nm, m.sgg_nm, m.trgter_indvdl_nm_array, m.life_nm_array,
+           m.serv_dgst, m.enfc_end_ymd, m.serv_dtl_link, m.similarity, m.render_card
+    from match_benefits(
+      query_embedding, match_threshold, match_count,
+      p_ctpv, p_sgg, p_life_array, p_target_array
+    ) m
+    where query_embedding is not null
+  ),
+  vector_ranked as (
+    select v.*, 'VECTOR'::text as source_type, 0 as source_rank,
+           row_number() over (order by v.similarity desc, v.id) as item_rank
+    from vector_hits v
+  ),
+  rules_ranked as (
+    select e.*, null::float as similarity, null::jsonb as render_card, 'RULES'::text as source_type, 1 as source_rank,
+           row_number() over (
+             order by
+               case
+                 when e.sgg_nm is not null and e.sgg_nm = p_sgg then 0
+                 when e.ctpv_nm is not null and e.ctpv_nm = p_ctpv then 1
+                 else 2
+               end,
+               case
+                 when position('현금' in coalesce(e.srv_pvsn_nm, '')) > 0
+                   or position('현물' in coalesce(e.srv_pvsn_nm, '')) > 0 then 0
+                 else 1
+               end,
+               e.id
+           ) as item_rank
+    from get_eligible_benefits(p_ctpv, p_sgg, p_life_array, p_target_array) e
+    where not exists (select 1 from vector_hits v where v.id = e.id)
+  )
+  select merged.id, merged.serv_nm, merged.srv_pvsn_nm, merged.ctpv_nm, merged.sgg_nm,
+         merged.trgter_indvdl_nm_array, merged.life_nm_array, merged.serv_dgst, merged.enfc_end_ymd,
+         merged.serv_dtl_link, merged.similarity, merged.source_type,
+         b.render_card  -- 최종 top_k만 카드 조회
+  from (
+    select * from vector_ranked
+    union all
+    select * from rules_ranked where item_rank <= top_k
+  ) merged
+  join benefits b on b.id = merged.id
+  order by merged.source_rank, merged.item_rank
+  limit top_k;
+$$;
+
+comment on function recommend_benefits(vector, text, text, text[], text[], float, int, int) is '서버측 하이브리드 추천 (VECTOR+RULES 병합/정렬/중복제거 후 top_k만 반환)';
+
+-- [함수 4-1] 출생연도 → 생애주기 배열
+-- backend/common/rag_service.py의 RAGService.convert_birth_year_to_life_cycle()과 동일한 구간
+create or replace function birth_year_to_life_cycle(p_birth_year int)
+returns text[]
+language sql
+stable
+as $$
+  select case
+    when p_birth_year is null or p_birth_year = 0 then null
+    when age < 0 then array[]::text[]
+    when age <= 5 then array['영유아']
+    when age <= 12 then array['아동']
+    when age <= 18 then array['청소년']
+    when age <= 34 then array['청년']
+    when age <= 64 then array['중장년']
+    else array['노년']
+  end
+  from (select extract(year from now() AT TIME ZONE 'Asia/Seoul')::int - p_birth_year as age) a;
+$$;
+
+-- [함수 4-2] 온보딩 상태 전이 (카카오 웹훅 1턴 = DB 호출 1회) ⚡
+-- 유저 조회 + 생성/초기화 + 입력값 검증/저장 + 지역코드 조회 + 갱신된 프로필 반환을 한 트랜잭션으로 처리
+--
+-- p_command: 'start'(시작하기/안녕) | 'reset'(처음으로/리셋) | null
+-- p_candidates: 발화를 각 단계 값으로 해석한 후보 (웹훅이 상태와 무관하게 파싱)
+--   {"ctpv_nm": "...", "sgg_nm": "...", "birth_year": 1953, "gender": "M", "target_group": [...]}
+--   현재 단계(처음으로 비어 있는 항목)의 후보만 저장하고 나머지는 무시
+--   sgg_nm은 행정구역 스냅샷 기준 시/도별 후보도 가능: {"서울특별시": {"sgg_nm": "중구", "region_code": "..."}, ...}
+--   (시/도에 없는 시/군/구면 invalid, 지역코드는 이 단계에서 저장)
+--
+-- p_expected_step: 웹훅이 캐시된 프로필로 응답을 먼저 보내고 쓰기를 나중에 할 때(write-behind) 기대한 단계
+--   실제 단계와 다르면 아무것도 저장하지 않고 conflict 반환 (웹훅은 프로필 캐시를 버림)
+--
+-- 반환: {"status", "step", "applied", "user"}
+--   status: created | reset | exists | advanced | invalid | complete | conflict
+--   step: 저장 후 다음으로 입력받을 항목 (ctpv_nm/sgg_nm/birth_year/gender/target_group, 완료 시 null)
+drop function if exists advance_onboarding(text, text, jsonb);
+create or replace function advance_onboarding(
+  p_kakao_user_id text,
+  p_command text default null,
+  p_candidates jsonb default '{}'::jsonb,
+  p_expected_step text default null
+)
+returns jsonb
+language plpgsql
+security definer
+as $$
+declare
+  v_user users%rowtype;
+  v_exists boolean;
+  v_status text;
+  v_step text;
+  v_applied text := null;
+  v_default_region varchar(10);
+  v_candidate jsonb;
+  v_birth_year int;
+  v_target text[];
+  v_now timestamp with time zone := now() AT TIME ZONE 'Asia/Seoul';
+begin
+  select * into v_user from users where kakao_user_id = p_kakao_user_id for update;
+  v_exists := found;
+
+  if not v_exists or p_command = 'reset' then
+    -- 신규 가입 / 정보 초기화: 기본 지역코드는 FK 충족용 (온보딩 완료 시 실제 코드로 교체)
+    v_status := case when v_exists then 'reset' else 'created' end;
+    select region_code into v_default_region from regions order by region_code limit 1;
+    v_default_region := coalesce(v_default_region, '1100000000');
+
+    insert into users as u (kakao_user_id, ctpv_nm, sgg_nm, birth_year, gender, target_group, life_cycle, region_code, region_depth, is_active)
+    values (p_kakao_user_id, '', '', 0, '', null, null, v_default_region, 2, false)
+    on conflict (kakao_user_id) do update
+      set ctpv_nm = '', sgg_nm = '', birth_year = 0, gender = '',
+          target_group = null, life_cycle = null,
+          region_code = excluded.region_code, region_depth = 2,
+          is_active = false, updated_at = v_now
+    returning * into v_user;
+
+    return jsonb_build_object('status', v_status, 'step', 'ctpv_nm', 'applied', null, 'user', to_jsonb(v_user));
+  end if;
+
+  if p_command = 'start' then
+    return jsonb_build_object('status', 'exists', 'step', null, 'applied', null, 'user', to_jsonb(v_user));
+  end if;
+
+  -- 현재 단계: 순서대로 처음 비어 있는 항목 (시/도 → 시/군/구 → 출생연도 → 성별 → 대상 특성)
+  v_step := case
+    when coalesce(v_user.ctpv_nm, '') = '' then 'ctpv_nm'
+    when coalesce(v_user.sgg_nm, '') = '' then 'sgg_nm'
+    when coalesce(v_user.birth_year, 0) = 0 then 'birth_year'
+    when coalesce(v_user.gender, '') = '' then 'gender'
+    when v_user.target_group is null then 'target_group'
+    else null
+  end;
+
+  if p_expected_step is not null and v_step is distinct from p_expected_step then
+    return jsonb_build_object('status', 'conflict', 'step', v_step, 'applied', null, 'user', to_jsonb(v_user));
+  end if;
+
+  if v_step is null then
+    return jsonb_build_object('status', 'complete', 'step', null, 'applied', null, 'user', to_jsonb(v_user));
+  end if;
+
+  v_candidate := p_candidates -> v_step;
+  if v_candidate is null or jsonb_typeof(v_candidate) = 'null' then
+    return jsonb_build_object('status', 'invalid', 'step', v_step, 'applied', null, 'user', to_jsonb(v_user));
+  end if;
+
+  if v_step = 'ctpv_nm' then
+    update users set ctpv_nm = v_candidate #>> '{}', updated_at = v_now
+    where id = v_user.id returning * into v_user;
+  elsif v_step = 'sgg_nm' then
+    if jsonb_typeof(v_candidate) = 'object' then
+      v_candidate := v_candidate -> v_user.ctpv_nm;
+      if v_candidate is null then
+        return jsonb_build_object('status', 'invalid', 'step', v_step, 'applied', null, 'user', to_jsonb(v_user));
+      end if;
+      update users
+      set sgg_nm = v_candidate ->> 'sgg_nm',
+          region_code = coalesce(v_candidate ->> 'region_code', region_code),
+          updated_at = v_now
+      where id = v_user.id returning * into v_user;
+    else
+      update users set sgg_nm = v_candidate #>> '{}', updated_at = v_now
+      where id = v_user.id returning * into v_user;
+    end if;
+  elsif v_step = 'birth_year' then
+    v_birth_year := (v_candidate #>> '{}')::int;
+    if v_birth_year not between 1900 and 2030 then
+      return jsonb_build_object('status', 'invalid', 'step', v_step, 'applied', null, 'user', to_jsonb(v_user));
+    end if;
+    update users set birth_year = v_birth_year, updated_at = v_now
+    where id = v_user.id returning * into v_user;
+  elsif v_step = 'gender' then
+    if (v_candidate #>> '{}') not in ('M', 'F') then
+      return jsonb_build_object('status', 'invalid', 'step', v_step, 'applied', null, 'user', to_jsonb(v_user));
+    end if;
+    update users set gender = v_candidate #>> '{}', updated_at = v_now
+    where id = v_user.id returning * into v_user;
+  else
+    -- 마지막 단계: 생애주기 계산 + 지역코드 조회 + 활성화 (온보딩 완료)
+    v_target := array(select jsonb_array_elements_text(v_candidate));
+    update users u
+    set target_group = v_target,
+        life_cycle = birth_year_to_life_cycle(u.birth_year),
+        is_active = true,
+        -- 스냅샷으로 시/군/구 단계에서 저장한 코드가 있으면 유지
+        region_code = coalesce(
+          (select r.region_code from regions r where r.name = u.ctpv_nm || ' ' || u.sgg_nm limit 1),
+          u.region_code
+        ),
+        updated_at = v_now
+    where u.id = v_user.id returning * into v_user;
+  end if;
+
+  v_applied := v_step;
+  v_step := case v_applied
+    when 'ctpv_nm' then 'sgg_nm'
+    when 'sgg_nm' then 'birth_year'
+    when 'birth_year' then 'gender'
+    when 'gender' then 'target_group'
+    else null
+  end;
+
+  return jsonb_build_object('status', 'advanced', 'step', v_step, 'applied', v_applied, 'user', to_jsonb(v_user));
+end;
+$$;
+
+comment on function advance_onboarding(text, text, jsonb, text) is '온보딩 1턴 처리 (조회+검증+저장+지역코드 조회를 한 번에, 갱신된 프로필 반환)';
+
+-- [함수 4-3] 웹훅 요청 선점 (중복 전달 억제) ⚡
+-- 처음 보는 키(또는 만료/완료된 키)면 선점 후 claimed=true, 처리 중이면 claimed=false (response는 null)
+-- 반환: {"claimed": bool, "response": jsonb}
+create or replace function claim_webhook_request(
+  p_request_key text,
+  p_ttl_seconds int default 60
+)
+returns jsonb
+language plpgsql
+security definer
+as $$
+declare
+  v_response jsonb;
+begin
+  insert into webhook_requests (request_key, response, expires_at)
+  values (p_request_key, null, now() + make_interval(secs => p_ttl_seconds))
+  on conflict (request_key) do update
+    set response = null,
+        expires_at = excluded.expires_at,
+        created_at = now() AT TIME ZONE 'Asia/Seoul'
+    -- 처리가 끝난 요청(응답 기록됨)은 재사용하지 않고 새로 선점 (처리 중일 때만 중복으로 판정)
+    where webhook_requests.expires_at < now() or webhook_requests.response is not null;
+
+  if found then
+    -- 선점한 요청이 만료 행도 가끔 정리 (테이블이 짧은 TTL 행만 유지)
+    if random() < 0.05 then
+      delete from webhook_requests where expires_at < now();
+    end if;
+    return jsonb_build_object('claimed', true, 'response', null);
+  end if;
+
+  select response into v_response from webhook_requests where request_key = p_request_key;
+  return jsonb_build_object('claimed', false, 'response', v_response);
 end;
 $$;
 
-comment on function match_benefits(vector, float, int, text, text, text[], text[]) is '벡터 검색 (similarity 점수 포함, 지역+생애주기+대상 필터링)';
+comment on function claim_webhook_request(text, int) is '카카오 스킬 요청 선점 (같은 요청이 처리 중이면 claimed=false, 완료된 요청은 다시 선점)';
 
 -- ============================================
 -- Row Level Security (RLS) 정책
@@ -513,16 +1986,34 @@ do $$
 begin
   raise notice '✅ 똑순이 데이터베이스 스키마 설치 완료! (MVP 버전)';
   raise notice '';
-  raise notice '📊 생성된 테이블: 4개';
+  raise notice '📊 생성된 테이블: 12개';
   raise notice '  - regions (지역코드 마스터, depth 1-4 계층)';
   raise notice '  - users (사용자 프로필)';
   raise notice '  - benefits (복지 혜택 통합 마스터)';
-  raise notice '  - benefit_embeddings (RAG 벡터 저장소)';
+  raise notice '  - benefit_embeddings (RAG 벡터 저장소, region_key LIST 파티션)';
+  raise notice '  - query_embedding_cache (쿼리 임베딩 캐시)';
+  raise notice '  - data_versions / whitelist_cache (캐시 무효화 워터마크 / Whitelist 캐시)';
+  raise notice '  - segment_eligibility (세그먼트별 자격 인덱스)';
+  raise notice '  - webhook_requests (웹훅 중복 전달 억제)';
+  raise notice '  - search_sessions (검색 결과 페이지 이동)';
+  raise notice '  - notification_runs / notification_deliveries (신규 혜택 알림 워터마크 / 발송 이력)';
   raise notice '';
-  raise notice '🔧 생성된 함수: 3개';
+  raise notice '🔧 생성된 함수: 28개';
   raise notice '  - update_updated_at_column (자동 타임스탬프)';
+  raise notice '  - bump_data_version (캐시 무효화 워터마크)';
+  raise notice '  - benefit_profile_match / make_segment_key / segment_benefit_ids (자격 판정 / 세그먼트 인덱스)';
+  raise notice '  - refresh_segment_eligibility (세그먼트 자격 인덱스 갱신)';
   raise notice '  - get_eligible_benefits (자격요건 Whitelist)';
-  raise notice '  - match_benefits (벡터 검색)';
+  raise notice '  - set_vector_scan_options / match_benefits (HNSW iterative scan 설정 / 벡터 검색)';
+  raise notice '  - match_benefits_reduced / embedding_index_sizes (축소 차원 검색 + 재정렬 / 인덱스 크기)';
+  raise notice '  - hybrid_match_benefits (전문검색 + 트라이그램 + 벡터 RRF 검색)';
+  raise notice '  - recommend_benefits (서버측 하이브리드 추천, top_k 반환)';
+  raise notice '  - birth_year_to_life_cycle / advance_onboarding (생애주기 변환 / 온보딩 1턴 상태 전이)';
+  raise notice '  - claim_webhook_request (웹훅 요청 선점 / 중복 전달 억제)';
+  raise notice '  - assign_search_session_seq (검색 세션 순서)';
+  raise notice '  - track_benefit_content_change (혜택 실제 변경 시각)';
+  raise notice '  - sync_embedding_filter_columns / propagate_benefit_filter_columns / embedding_region_key / fix_embedding_region_key (임베딩 필터 컬럼 + 파티션 키 동기화)';
+  raise notice '  - start/finish_notification_run / match_new_benefits_by_segment / notification_recipients / record_notification_deliveries (신규 혜택 알림)';
   raise notice '';
   raise notice '🔐 RLS 정책: 1개';
   raise notice '  - users 테이블 보호';